@@ -1,105 +1,105 @@
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 import time
-from utils import Pair, make_2d_array, get_neighbors
+from collections import deque
+from grid import Grid, reconstruct_path, new_parent_array
+from instrumentation import elapsed_ms
 
-def bfs(start: Pair, end: Pair, blocks: List[List[bool]], size: int, directions: int, dx: List[int], dy: List[int]) -> Dict[str, Any]:
+def bfs(start: int, end: int, grid: Grid, directions: int, trace: Optional[List[int]] = None) -> Dict[str, Any]:
     """Implements the Breadth-First Search (BFS) algorithm for pathfinding.
-    
+
     BFS explores all nodes at the current depth before moving to nodes at the next depth level.
     It guarantees the shortest path in terms of number of steps when all steps have equal cost.
-    
+
     Args:
-        start (Pair): Starting position coordinates (x, y)
-        end (Pair): Goal position coordinates (x, y)
-        blocks (List[List[bool]]): 2D grid representing obstacles (True for blocked cells)
-        size (int): Size of the grid (assuming square grid)
+        start (int): Starting cell id
+        end (int): Goal cell id
+        grid (Grid): Flattened maze (blocked cells and optional weights)
         directions (int): Number of possible movement directions (4 or 8)
-        dx (List[int]): List of x-direction movements
-        dy (List[int]): List of y-direction movements
-    
+        trace (List[int], optional): List that receives the explored cell ids. Defaults to None
+
     Returns:
         Dict[str, Any]: A dictionary containing:
-            - path: List of Pair objects representing the found path, or None if no path exists
-            - exploration_order: List of coordinates showing the order of exploration
+            - path: List of cell ids representing the found path, or None if no path exists
+            - exploration_order: List of cell ids showing the order of exploration
             - metrics: Dictionary containing performance metrics:
                 - explored_size: Number of nodes explored
                 - frontier_size: Size of the frontier (queue)
                 - time_taken_ms: Time taken to find the path in milliseconds
                 - path_length: Length of the found path (0 if no path found)
     """
+    start_time = time.perf_counter_ns()
+
     # Special case: if start and end are the same
-    if start.first == end.first and start.second == end.second:
+    if start == end:
         return {
             "path": [start],
-            "exploration_order": [[start.first, start.second]],
+            "exploration_order": [start],
             "metrics": {
                 "explored_size": 1,
                 "frontier_size": 0,
-                "time_taken_ms": 0,
+                "time_taken_ms": elapsed_ms(start_time),
                 "path_length": 0,
                 "total_cost": 0
             }
         }
-    
-    start_time = time.time()
-    visited = make_2d_array(size, False)
-    parent = make_2d_array(size, Pair(-1, -1))
-    queue = [start]
-    visited[start.first][start.second] = True
-    exploration_order = [[start.first, start.second]]
-    
+
+    blocked = grid.blocked
+    offsets = grid.offsets(directions)
+    visited = bytearray(len(blocked))
+    parent = new_parent_array(grid)
+    queue = deque([start])
+    visited[start] = 1
+    exploration_order = trace if trace is not None else []
+    exploration_order.append(start)
+
     while queue:
-        current = queue.pop(0)
-        
-        if current.first == end.first and current.second == end.second:
+        current = queue.popleft()
+
+        if current == end:
             # Reconstruct path
-            path = []
-            total_cost = 0
-            while current.first != -1:
-                path.insert(0, current)
-                if parent[current.first][current.second].first != -1:
-                    total_cost += 1  # Each step has a cost of 1
-                current = parent[current.first][current.second]
-            
+            path = reconstruct_path(parent, end)
+
             # Calculate metrics
-            explored_size = sum(sum(row) for row in visited)
+            explored_size = visited.count(1)
             frontier_size = len(queue)
-            time_taken_ms = (time.time() - start_time) * 1000
+            time_taken_ms = elapsed_ms(start_time)
             path_length = len(path) - 1  # Subtract 1 to not count the start node
-            
+
             return {
                 "path": path,
                 "exploration_order": exploration_order,
                 "metrics": {
                     "explored_size": explored_size,
                     "frontier_size": frontier_size,
+                    "counters": {"pushes": explored_size, "pops": explored_size - frontier_size},
                     "time_taken_ms": time_taken_ms,
                     "path_length": path_length,
-                    "total_cost": total_cost
+                    "total_cost": path_length  # Each step has a cost of 1
                 }
             }
-        
-        neighbors = get_neighbors(current, blocks, size, directions, dx, dy)
-        for neighbor in neighbors:
-            if not visited[neighbor.first][neighbor.second]:
-                visited[neighbor.first][neighbor.second] = True
-                parent[neighbor.first][neighbor.second] = current
+
+        for offset in offsets:
+            neighbor = current + offset
+            if not visited[neighbor] and not blocked[neighbor]:
+                visited[neighbor] = 1
+                parent[neighbor] = current
                 queue.append(neighbor)
-                exploration_order.append([neighbor.first, neighbor.second])
-    
+                exploration_order.append(neighbor)
+
     # Calculate metrics for no path found
-    explored_size = sum(sum(row) for row in visited)
+    explored_size = visited.count(1)
     frontier_size = len(queue)
-    time_taken_ms = (time.time() - start_time) * 1000
-    
+    time_taken_ms = elapsed_ms(start_time)
+
     return {
         "path": None,
         "exploration_order": exploration_order,
         "metrics": {
             "explored_size": explored_size,
             "frontier_size": frontier_size,
+            "counters": {"pushes": explored_size, "pops": explored_size - frontier_size},
             "time_taken_ms": time_taken_ms,
             "path_length": 0,
             "total_cost": 0
         }
-    } 
\ No newline at end of file
+    }
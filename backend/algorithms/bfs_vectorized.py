@@ -0,0 +1,59 @@
+from typing import Dict, Any, List, Optional
+import time
+from grid import Grid
+from distance_field import distance_field, path_from_field
+from instrumentation import elapsed_ms
+
+def bfs_vectorized(start: int, end: int, grid: Grid, directions: int, trace: Optional[List[int]] = None) -> Dict[str, Any]:
+    """Implements a level-synchronous Breadth-First Search on top of distance_field.
+
+    Instead of dequeuing one cell at a time, every BFS level is expanded at once with
+    NumPy array operations (see distance_field). The search stops at the level that
+    reaches the goal, and the path is recovered by walking the distance field back
+    downhill. Like bfs, it finds the path with the fewest steps and ignores weights.
+
+    Args:
+        start (int): Starting cell id
+        end (int): Goal cell id
+        grid (Grid): Flattened maze (blocked cells and optional weights)
+        directions (int): Number of possible movement directions (4 or 8)
+        trace (List[int], optional): List that receives the explored cell ids. Defaults to None
+
+    Returns:
+        Dict[str, Any]: A dictionary containing:
+            - path: List of cell ids representing the found path, or None if no path exists
+            - exploration_order: List of cell ids, level by level
+            - metrics: Dictionary containing performance metrics:
+                - explored_size: Number of nodes labelled
+                - frontier_size: Size of the last level expanded
+                - time_taken_ms: Time taken to find the path in milliseconds
+                - path_length: Length of the found path (0 if no path found)
+    """
+    start_time = time.perf_counter_ns()
+    exploration_order = trace if trace is not None else []
+    levels = []
+
+    def on_level(cells: List[int]) -> None:
+        levels.append(len(cells))
+        exploration_order.extend(cells)
+
+    distance = distance_field(grid, start, directions, targets=(end,), on_level=on_level)
+    path = path_from_field(grid, distance, start, end, directions)
+
+    # Calculate metrics
+    explored_size = sum(levels)
+    frontier_size = levels[-1] if path is not None and start != end else 0
+    time_taken_ms = elapsed_ms(start_time)
+    path_length = len(path) - 1 if path is not None else 0
+
+    return {
+        "path": path,
+        "exploration_order": exploration_order,
+        "metrics": {
+            "explored_size": explored_size,
+            "frontier_size": frontier_size,
+            "time_taken_ms": time_taken_ms,
+            "path_length": path_length,
+            "total_cost": path_length  # Each step has a cost of 1
+        }
+    }
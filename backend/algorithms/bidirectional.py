@@ -1,161 +1,160 @@
 from typing import Dict, Any, List, Optional
 import time
-from collections import deque
-from utils import Pair, make_2d_array, get_neighbors
+from array import array
+from grid import Grid, new_parent_array
+from instrumentation import elapsed_ms
 
-def bidirectional_search(start: Pair, end: Pair, blocks: List[List[bool]], size: int, directions: int, dx: List[int], dy: List[int]) -> Dict[str, Any]:
+def bidirectional_search(start: int, end: int, grid: Grid, directions: int, trace: Optional[List[int]] = None) -> Dict[str, Any]:
     """Implements the Bidirectional Search algorithm for pathfinding.
     
-    Bidirectional Search performs two simultaneous breadth-first searches - one from the start
-    node and one from the goal node. The algorithm terminates when the two searches meet at
-    an intersection point. This approach can be significantly faster than a single BFS as it
-    reduces the search space by exploring from both ends.
+    Bidirectional Search performs two breadth-first searches - one from the start
+    node and one from the goal node - until they meet. The searches advance one whole
+    level at a time, always on the side whose frontier is smaller, so a side that starts
+    in a dead end or a narrow corridor does most of the work while the other side waits.
+    Meetings are detected while generating neighbors, as soon as a side reaches a cell
+    the other side has reached: the level that finds the first one is finished and the
+    shortest of its meetings is kept, which makes the path a shortest one (in steps).
     
     Args:
-        start (Pair): Starting position coordinates (x, y)
-        end (Pair): Goal position coordinates (x, y)
-        blocks (List[List[bool]]): 2D grid representing obstacles (True for blocked cells)
-        size (int): Size of the grid (assuming square grid)
+        start (int): Starting cell id
+        end (int): Goal cell id
+        grid (Grid): Flattened maze (blocked cells and optional weights)
         directions (int): Number of possible movement directions (4 or 8)
-        dx (List[int]): List of x-direction movements
-        dy (List[int]): List of y-direction movements
+        trace (List[int], optional): List that receives the explored cell ids. Defaults to None
     
     Returns:
         Dict[str, Any]: A dictionary containing:
-            - path: List of Pair objects representing the found path, or None if no path exists
-            - exploration_order: List of coordinates showing the order of exploration
+            - path: List of cell ids representing the found path, or None if no path exists
+            - exploration_order: List of cell ids showing the order of exploration
             - metrics: Dictionary containing performance metrics:
                 - explored_size: Total number of nodes explored in both directions
                 - frontier_size: Total size of both forward and backward frontiers
                 - time_taken_ms: Time taken to find the path in milliseconds
                 - path_length: Length of the found path (0 if no path found)
+                - forward_expanded: Number of nodes expanded by the forward search
+                - backward_expanded: Number of nodes expanded by the backward search
+                - forward_levels: Number of levels expanded by the forward search
+                - backward_levels: Number of levels expanded by the backward search
     """
+    start_time = time.perf_counter_ns()
+
     # Special case: if start and end are the same
-    if start.first == end.first and start.second == end.second:
+    if start == end:
         return {
             "path": [start],
-            "exploration_order": [[start.first, start.second]],
+            "exploration_order": [start],
             "metrics": {
                 "explored_size": 1,
                 "frontier_size": 0,
-                "time_taken_ms": 0,
+                "time_taken_ms": elapsed_ms(start_time),
                 "path_length": 0,
-                "total_cost": 0
+                "total_cost": 0,
+                "forward_expanded": 0,
+                "backward_expanded": 0,
+                "forward_levels": 0,
+                "backward_levels": 0
             }
         }
     
-    start_time = time.time()
-    
-    # Initialize data structures for forward search
-    visited_forward = make_2d_array(size, False)
-    parent_forward = make_2d_array(size, Pair(-1, -1))
-    
-    # Initialize data structures for backward search
-    visited_backward = make_2d_array(size, False)
-    parent_backward = make_2d_array(size, Pair(-1, -1))
+    blocked = grid.blocked
+    offsets = grid.offsets(directions)
     
-    # Initialize queues
-    queue_forward = deque([start])
-    queue_backward = deque([end])
+    # Steps from start (forward) and to end (backward), -1 for cells not reached yet
+    distance_forward = array('i', [-1]) * len(blocked)
+    distance_backward = array('i', [-1]) * len(blocked)
+    parent_forward = new_parent_array(grid)
+    parent_backward = new_parent_array(grid)
+    distance_forward[start] = 0
+    distance_backward[end] = 0
     
-    # Mark start and end as visited
-    visited_forward[start.first][start.second] = True
-    visited_backward[end.first][end.second] = True
+    # Current level of each search
+    frontier_forward = [start]
+    frontier_backward = [end]
+    expanded = [0, 0]
+    levels = [0, 0]
+    reached = 2
     
     # Track exploration order
-    exploration_order = []
+    exploration_order = trace if trace is not None else []
     
-    # Track intersection point
-    intersection = None
+    # Best meeting so far: (path length, cell reached by both searches)
+    best = None
     
-    while queue_forward and queue_backward:
-        # Forward search step
-        if queue_forward:
-            current_forward = queue_forward.popleft()
-            exploration_order.append([current_forward.first, current_forward.second])
-            
-            # Check if we've found an intersection
-            if visited_backward[current_forward.first][current_forward.second]:
-                intersection = current_forward
-                break
-                
-            # Explore neighbors in forward direction
-            neighbors = get_neighbors(current_forward, blocks, size, directions, dx, dy)
-            for neighbor in neighbors:
-                if not visited_forward[neighbor.first][neighbor.second]:
-                    visited_forward[neighbor.first][neighbor.second] = True
-                    parent_forward[neighbor.first][neighbor.second] = current_forward
-                    queue_forward.append(neighbor)
+    while frontier_forward and frontier_backward and best is None:
+        # Expand a whole level of the smaller frontier
+        side = 0 if len(frontier_forward) <= len(frontier_backward) else 1
+        if side == 0:
+            frontier, distance, other, parent = frontier_forward, distance_forward, distance_backward, parent_forward
+        else:
+            frontier, distance, other, parent = frontier_backward, distance_backward, distance_forward, parent_backward
         
-        # Backward search step
-        if queue_backward and not intersection:
-            current_backward = queue_backward.popleft()
-            exploration_order.append([current_backward.first, current_backward.second])
-            
-            # Check if we've found an intersection
-            if visited_forward[current_backward.first][current_backward.second]:
-                intersection = current_backward
-                break
-                
-            # Explore neighbors in backward direction
-            neighbors = get_neighbors(current_backward, blocks, size, directions, dx, dy)
-            for neighbor in neighbors:
-                if not visited_backward[neighbor.first][neighbor.second]:
-                    visited_backward[neighbor.first][neighbor.second] = True
-                    parent_backward[neighbor.first][neighbor.second] = current_backward
-                    queue_backward.append(neighbor)
+        next_level = []
+        depth = distance[frontier[0]] + 1
+        for current in frontier:
+            exploration_order.append(current)
+            for offset in offsets:
+                neighbor = current + offset
+                if distance[neighbor] == -1 and not blocked[neighbor]:
+                    distance[neighbor] = depth
+                    parent[neighbor] = current
+                    next_level.append(neighbor)
+                    # The other search already reached this cell: the two trees meet here. A cell
+                    # reached by both sides is always found by the side that reaches it second
+                    if other[neighbor] != -1:
+                        length = depth + other[neighbor]
+                        if best is None or length < best[0]:
+                            best = (length, neighbor)
+        
+        expanded[side] += len(frontier)
+        levels[side] += 1
+        reached += len(next_level)
+        if side == 0:
+            frontier_forward = next_level
+        else:
+            frontier_backward = next_level
     
     # Calculate metrics
-    explored_size = sum(sum(row) for row in visited_forward) + sum(sum(row) for row in visited_backward)
-    frontier_size = len(queue_forward) + len(queue_backward)
-    time_taken_ms = (time.time() - start_time) * 1000
+    metrics = {
+        "explored_size": reached,
+        "frontier_size": len(frontier_forward) + len(frontier_backward),
+        "forward_expanded": expanded[0],
+        "backward_expanded": expanded[1],
+        "forward_levels": levels[0],
+        "backward_levels": levels[1]
+    }
     
-    if intersection:
-        # Reconstruct path from start to intersection
-        path_forward = []
-        current = intersection
-        total_cost = 0
-        while current.first != -1:
-            path_forward.insert(0, current)
-            if parent_forward[current.first][current.second].first != -1:
-                total_cost += 1  # Each step has a cost of 1
-            current = parent_forward[current.first][current.second]
-        
-        # Reconstruct path from intersection to end (excluding intersection)
-        path_backward = []
-        current = parent_backward[intersection.first][intersection.second]
-        while current.first != -1:
-            path_backward.insert(0, current)  # Insert at beginning to properly reverse
-            if parent_backward[current.first][current.second].first != -1:
-                total_cost += 1  # Each step has a cost of 1
-            current = parent_backward[current.first][current.second]
-        
-        # Reverse the backward path and append to forward path
-        path_backward.reverse()
-        path = path_forward + path_backward
-        path_length = len(path) - 1  # Subtract 1 to not count the start node
-        
+    if best is None:
+        # No path found
+        metrics.update({"time_taken_ms": elapsed_ms(start_time), "path_length": 0, "total_cost": 0})
         return {
-            "path": path,
+            "path": None,
             "exploration_order": exploration_order,
-            "metrics": {
-                "explored_size": explored_size,
-                "frontier_size": frontier_size,
-                "time_taken_ms": time_taken_ms,
-                "path_length": path_length,
-                "total_cost": total_cost
-            }
+            "metrics": metrics
         }
     
-    # No path found
+    # Reconstruct path from start to the meeting cell
+    intersection = best[1]
+    path = []
+    cell = intersection
+    while cell != -1:
+        path.append(cell)
+        cell = parent_forward[cell]
+    path.reverse()
+    
+    # Append path from the meeting cell to end (excluding the meeting cell)
+    cell = parent_backward[intersection]
+    while cell != -1:
+        path.append(cell)
+        cell = parent_backward[cell]
+    
+    path_length = len(path) - 1  # Subtract 1 to not count the start node
+    metrics.update({
+        "time_taken_ms": elapsed_ms(start_time),
+        "path_length": path_length,
+        "total_cost": path_length  # Each step has a cost of 1
+    })
     return {
-        "path": None,
+        "path": path,
         "exploration_order": exploration_order,
-        "metrics": {
-            "explored_size": explored_size,
-            "frontier_size": frontier_size,
-            "time_taken_ms": time_taken_ms,
-            "path_length": 0,
-            "total_cost": 0
-        }
-    } 
\ No newline at end of file
+        "metrics": metrics
+    }
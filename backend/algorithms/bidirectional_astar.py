@@ -0,0 +1,198 @@
+from typing import Dict, Any, List, Optional, Callable
+import time
+from frontier import IndexedHeap
+from grid import Grid, new_parent_array
+from instrumentation import elapsed_ms
+from landmarks import landmark_heuristic
+from utils import LANDMARK_HEURISTIC
+
+def _bidirectional(start: int, end: int, grid: Grid, directions: int, potential: Optional[Callable[[int], float]],
+                   trace: Optional[List[int]]) -> Dict[str, Any]:
+    """Shared engine of bidirectional_dijkstra and bidirectional_astar.
+
+    Two Dijkstra searches run at once, forward from start and backward from end,
+    and the side with the smaller frontier is expanded next. Moving into a cell
+    costs its weight (1 without weights), so the backward search pays the weight
+    of the cell it comes from. Every relaxed edge whose cell has been reached by
+    both searches offers a path of cost forward + backward distance; the best
+    one is kept. The search stops once the smallest forward key plus the
+    smallest backward key reaches that cost, since no path still to be found
+    can be cheaper.
+
+    With a potential p, forward keys are g + p(cell) and backward keys g - p(cell),
+    which is Dijkstra on reduced costs in both directions. The stopping rule stays
+    the same because the potentials of the two sides cancel out.
+    """
+    start_time = time.perf_counter_ns()
+
+    # Special case: if start and end are the same
+    if start == end:
+        return {
+            "path": [start],
+            "exploration_order": [start],
+            "metrics": {
+                "explored_size": 1,
+                "frontier_size": 0,
+                "time_taken_ms": elapsed_ms(start_time),
+                "path_length": 0,
+                "total_cost": 0,
+                "forward_expanded": 1,
+                "backward_expanded": 0
+            }
+        }
+
+    blocked = grid.blocked
+    weights = grid.weights
+    offsets = grid.offsets(directions)
+    count = len(blocked)
+    exploration_order = trace if trace is not None else []
+    # Solvers may leave a blocked start but never enter a blocked goal
+    goal_open = not blocked[end]
+    inf = float('inf')
+    distances = ([inf] * count, [inf] * count)
+    parents = (new_parent_array(grid), new_parent_array(grid))
+    closed = (bytearray(count), bytearray(count))
+    heaps = (IndexedHeap(count), IndexedHeap(count))
+    expanded = [0, 0]
+    distances[0][start] = 0
+    distances[1][end] = 0
+    heaps[0].push(start, potential(start) if potential is not None else 0)
+    if goal_open:
+        heaps[1].push(end, -potential(end) if potential is not None else 0)
+    best = inf
+    meeting = -1
+
+    while heaps[0] and heaps[1]:
+        if heaps[0].peek()[0] + heaps[1].peek()[0] >= best:
+            break
+        side = 0 if len(heaps[0]) <= len(heaps[1]) else 1
+        heap, distance, parent, done = heaps[side], distances[side], parents[side], closed[side]
+        other = distances[1 - side]
+        sign = 1 if side == 0 else -1
+
+        current = heap.pop()
+        done[current] = 1
+        expanded[side] += 1
+        exploration_order.append(current)
+        g = distance[current]
+        # The backward search walks edges in reverse: stepping from neighbor into current
+        current_cost = weights[current] if weights is not None else 1
+
+        for offset in offsets:
+            neighbor = current + offset
+            if blocked[neighbor] or done[neighbor]:
+                continue
+            if side == 0:
+                new_g = g + (weights[neighbor] if weights is not None else 1)
+            else:
+                new_g = g + current_cost
+            if new_g < distance[neighbor]:
+                distance[neighbor] = new_g
+                parent[neighbor] = current
+                heap.push(neighbor, new_g + sign * potential(neighbor) if potential is not None else new_g)
+                through = new_g + other[neighbor]
+                if through < best:
+                    best = through
+                    meeting = neighbor
+
+    if meeting != -1:
+        path = []
+        current = meeting
+        while current != -1:
+            path.append(current)
+            current = parents[0][current]
+        path.reverse()
+        current = parents[1][meeting]
+        while current != -1:
+            path.append(current)
+            current = parents[1][current]
+    else:
+        path = None
+
+    counters = heaps[0].counters()
+    for key, value in heaps[1].counters().items():
+        counters[key] += value
+
+    return {
+        "path": path,
+        "exploration_order": exploration_order,
+        "metrics": {
+            "explored_size": expanded[0] + expanded[1],
+            "frontier_size": len(heaps[0]) + len(heaps[1]),
+            "counters": counters,
+            "time_taken_ms": elapsed_ms(start_time),
+            "path_length": len(path) - 1 if path is not None else 0,
+            "total_cost": best if path is not None else 0,
+            "forward_expanded": expanded[0],
+            "backward_expanded": expanded[1]
+        }
+    }
+
+def bidirectional_dijkstra(start: int, end: int, grid: Grid, directions: int,
+                           trace: Optional[List[int]] = None) -> Dict[str, Any]:
+    """Implements bidirectional Dijkstra for weighted grids.
+
+    Searches forward from the start and backward from the goal at the same time,
+    always expanding the side with the smaller frontier, and stops as soon as the
+    best meeting found so far cannot be improved. On long queries each side only
+    has to cover a disc of about half the distance, so roughly half the area that
+    dijkstra explores. When the grid carries weights, they are the step costs and
+    the path has minimum total cost.
+
+    Args:
+        start (int): Starting cell id
+        end (int): Goal cell id
+        grid (Grid): Flattened maze (blocked cells and optional weights)
+        directions (int): Number of possible movement directions (4 or 8)
+        trace (List[int], optional): List that receives the explored cell ids. Defaults to None
+
+    Returns:
+        Dict[str, Any]: A dictionary containing:
+            - path: List of cell ids representing the found path, or None if no path exists
+            - exploration_order: List of cell ids showing the order of exploration (both sides interleaved)
+            - metrics: Dictionary containing performance metrics:
+                - explored_size: Number of nodes expanded by both searches
+                - frontier_size: Total size of both frontiers
+                - time_taken_ms: Time taken to find the path in milliseconds
+                - path_length: Length of the found path (0 if no path found)
+                - total_cost: Total cost of the path (sum of weights)
+                - forward_expanded: Number of nodes expanded by the forward search
+                - backward_expanded: Number of nodes expanded by the backward search
+    """
+    return _bidirectional(start, end, grid, directions, None, trace)
+
+def bidirectional_astar(start: int, end: int, grid: Grid, directions: int, heuristic_type: int = 0,
+                        trace: Optional[List[int]] = None) -> Dict[str, Any]:
+    """Implements bidirectional A* with averaged potentials.
+
+    Like bidirectional_dijkstra, but both searches are guided by the average of the
+    heuristic towards the goal and the negated heuristic towards the start:
+    p(cell) = (h_goal(cell) - h_start(cell)) / 2. Each side then sees the costs
+    reduced by the same potential, so the two searches stay consistent with
+    each other and the usual bidirectional stopping rule still holds. The path
+    is optimal whenever the heuristic is consistent for the move costs, e.g.
+    manhattan with 4 directions or chebyshev with 8.
+
+    Args:
+        start (int): Starting cell id
+        end (int): Goal cell id
+        grid (Grid): Flattened maze (blocked cells and optional weights)
+        directions (int): Number of possible movement directions (4 or 8)
+        heuristic_type (int, optional): Index of the heuristic to use. Defaults to 0 (manhattan).
+        trace (List[int], optional): List that receives the explored cell ids. Defaults to None
+
+    Returns:
+        Dict[str, Any]: Same structure as bidirectional_dijkstra
+    """
+    to_goal = grid.heuristic(heuristic_type, end, directions)
+    if heuristic_type == LANDMARK_HEURISTIC:
+        # The backward search needs bounds on the cost from the start to a cell, which landmark
+        # bounds tell apart from the cost back to the start (entering a cell costs its weight)
+        to_start = landmark_heuristic(grid, start, directions, reverse=True)
+    else:
+        to_start = grid.heuristic(heuristic_type, start, directions)
+
+    def potential(cell: int) -> float:
+        return (to_goal(cell) - to_start(cell)) / 2
+
+    return _bidirectional(start, end, grid, directions, potential, trace)
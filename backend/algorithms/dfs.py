@@ -1,113 +1,69 @@
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 import time
-import sys
-from utils import Pair, make_2d_array, get_neighbors
+from array import array
+from grid import Grid, reconstruct_path, new_parent_array
+from instrumentation import elapsed_ms
 
-def dfs(start: Pair, end: Pair, blocks: List[List[bool]], size: int, directions: int, dx: List[int], dy: List[int], max_depth: int = None) -> Dict[str, Any]:
+def dfs(start: int, end: int, grid: Grid, directions: int, max_depth: int = None, trace: Optional[List[int]] = None) -> Dict[str, Any]:
     """Implements the Depth-First Search (DFS) algorithm for pathfinding.
-    
-    DFS explores as far as possible along each branch before backtracking. It uses recursion
-    with a maximum depth limit to prevent stack overflow. While it may not find the shortest
-    path, it can be more memory efficient than BFS for certain types of mazes.
-    
+
+    DFS explores as far as possible along each branch before backtracking. The branch being
+    explored is kept on an explicit stack (see depth_limited_dfs), so deep mazes need neither
+    Python recursion nor a raised recursion limit. While it may not find the shortest path,
+    it can be more memory efficient than BFS for certain types of mazes.
+
     Args:
-        start (Pair): Starting position coordinates (x, y)
-        end (Pair): Goal position coordinates (x, y)
-        blocks (List[List[bool]]): 2D grid representing obstacles (True for blocked cells)
-        size (int): Size of the grid (assuming square grid)
+        start (int): Starting cell id
+        end (int): Goal cell id
+        grid (Grid): Flattened maze (blocked cells and optional weights)
         directions (int): Number of possible movement directions (4 or 8)
-        dx (List[int]): List of x-direction movements
-        dy (List[int]): List of y-direction movements
-        max_depth (int, optional): Maximum recursion depth. Defaults to size * size
-    
+        max_depth (int, optional): Maximum number of cells on the explored branch. Defaults to size * size
+        trace (List[int], optional): List that receives the explored cell ids. Defaults to None
+
     Returns:
         Dict[str, Any]: A dictionary containing:
-            - path: List of Pair objects representing the found path, or None if no path exists
-            - exploration_order: List of coordinates showing the order of exploration
+            - path: List of cell ids representing the found path, or None if no path exists
+            - exploration_order: List of cell ids showing the order of exploration
             - metrics: Dictionary containing performance metrics:
                 - explored_size: Number of nodes explored
                 - frontier_size: Always 0 as DFS doesn't maintain a frontier
                 - time_taken_ms: Time taken to find the path in milliseconds
                 - path_length: Length of the found path (0 if no path found)
     """
+    start_time = time.perf_counter_ns()
+
     # Special case: if start and end are the same
-    if start.first == end.first and start.second == end.second:
+    if start == end:
         return {
             "path": [start],
-            "exploration_order": [[start.first, start.second]],
+            "exploration_order": [start],
             "metrics": {
                 "explored_size": 1,
                 "frontier_size": 0,
-                "time_taken_ms": 0,
+                "time_taken_ms": elapsed_ms(start_time),
                 "path_length": 0
             }
         }
-    
-    start_time = time.time()
-    
-    # Set default max depth to avoid excessive recursion
+
+
     if max_depth is None:
-        max_depth = size * size  # Default max depth
-    
-    # Get current recursion limit and set a higher one if needed
-    current_limit = sys.getrecursionlimit()
-    if max_depth > current_limit:
-        sys.setrecursionlimit(max_depth + 100)  # Add some buffer
-    
-    visited = make_2d_array(size, False)
-    parent = make_2d_array(size, Pair(-1, -1))
-    exploration_order = []
-    
-    def dfs_recursive(current: Pair, depth: int) -> bool:
-        """Helper function that performs the recursive DFS search.
-        
-        Args:
-            current (Pair): Current position being explored
-            depth (int): Current depth in the recursion
-            
-        Returns:
-            bool: True if path to goal is found, False otherwise
-        """
-        if depth <= 0:
-            return False
-            
-        visited[current.first][current.second] = True
-        exploration_order.append([current.first, current.second])
-        
-        if current.first == end.first and current.second == end.second:
-            return True
-            
-        neighbors = get_neighbors(current, blocks, size, directions, dx, dy)
-        for neighbor in neighbors:
-            if not visited[neighbor.first][neighbor.second]:
-                parent[neighbor.first][neighbor.second] = current
-                if dfs_recursive(neighbor, depth - 1):
-                    return True
-                    
-        return False
-    
+        max_depth = grid.size * grid.size  # Default max depth
+
+    visited = bytearray(len(grid.blocked))
+    parent = new_parent_array(grid)
+    exploration_order = trace if trace is not None else []
+
     # Start DFS from the start position with limited depth
-    if dfs_recursive(start, max_depth):
+    if depth_limited_dfs(start, end, grid, directions, max_depth - 1, visited, parent, exploration_order):
         # Reconstruct path
-        path = []
-        current = end
-        total_cost = 0
-        while current.first != -1:
-            path.insert(0, current)
-            if parent[current.first][current.second].first != -1:
-                total_cost += 1  # Each step has a cost of 1
-            current = parent[current.first][current.second]
-        
+        path = reconstruct_path(parent, end)
+
         # Calculate metrics
-        explored_size = sum(sum(row) for row in visited)
+        explored_size = visited.count(1)
         frontier_size = 0  # DFS doesn't maintain a frontier
-        time_taken_ms = (time.time() - start_time) * 1000
+        time_taken_ms = elapsed_ms(start_time)
         path_length = len(path) - 1  # Subtract 1 to not count the start node
-        
-        # Reset recursion limit if we changed it
-        if max_depth > current_limit:
-            sys.setrecursionlimit(current_limit)
-        
+
         return {
             "path": path,
             "exploration_order": exploration_order,
@@ -116,19 +72,15 @@ def dfs(start: Pair, end: Pair, blocks: List[List[bool]], size: int, directions:
                 "frontier_size": frontier_size,
                 "time_taken_ms": time_taken_ms,
                 "path_length": path_length,
-                "total_cost": total_cost
+                "total_cost": path_length  # Each step has a cost of 1
             }
         }
-    
+
     # Calculate metrics for no path found
-    explored_size = sum(sum(row) for row in visited)
+    explored_size = visited.count(1)
     frontier_size = 0  # DFS doesn't maintain a frontier
-    time_taken_ms = (time.time() - start_time) * 1000
-    
-    # Reset recursion limit if we changed it
-    if max_depth > current_limit:
-        sys.setrecursionlimit(current_limit)
-    
+    time_taken_ms = elapsed_ms(start_time)
+
     return {
         "path": None,
         "exploration_order": exploration_order,
@@ -139,4 +91,70 @@ def dfs(start: Pair, end: Pair, blocks: List[List[bool]], size: int, directions:
             "path_length": 0,
             "total_cost": 0
         }
-    } 
\ No newline at end of file
+    }
+
+def depth_limited_dfs(start: int, end: int, grid: Grid, directions: int, limit: int, visited: bytearray,
+                      parent: array, exploration_order: List[int], boundary: Optional[List[int]] = None) -> bool:
+    """Depth-first search from start that visits cells at most limit steps down the current branch.
+
+    The branch is kept on an explicit stack of cell ids together with the index of the
+    next direction to try at every level, so memory grows with the branch length only
+    and neighbors are visited in the same order as a recursive search would.
+
+    A start cell that is already visited is expanded without being recorded again,
+    which lets a search resume from the boundary of an earlier one.
+
+    Args:
+        start (int): Starting cell id
+        end (int): Goal cell id
+        grid (Grid): Flattened maze (blocked cells and optional weights)
+        directions (int): Number of possible movement directions (4 or 8)
+        limit (int): Maximum number of steps from start; nothing is visited when negative
+        visited (bytearray): Flat array tracking visited cells, updated in place
+        parent (array): Flat array of parent cell ids for path reconstruction, updated in place
+        exploration_order (List[int]): List that receives the visited cell ids
+        boundary (List[int], optional): Receives the cells reached at the limit, which were not expanded. Defaults to None
+
+    Returns:
+        bool: True if end was reached within the limit, False otherwise
+    """
+    if limit < 0:
+        return False
+    if not visited[start]:
+        visited[start] = 1
+        exploration_order.append(start)
+        if start == end:
+            return True
+
+    blocked = grid.blocked
+    offsets = grid.offsets(directions)
+    count = len(offsets)
+    branch = array('i', [start])
+    next_direction = bytearray(1)
+    while branch:
+        current = branch[-1]
+        k = next_direction[-1]
+        # Cells at the limit are visited but not expanded
+        if len(branch) > limit:
+            if boundary is not None:
+                boundary.append(current)
+            k = count
+        while k < count:
+            neighbor = current + offsets[k]
+            k += 1
+            if not visited[neighbor] and not blocked[neighbor]:
+                break
+        else:
+            branch.pop()
+            next_direction.pop()
+            continue
+
+        next_direction[-1] = k
+        parent[neighbor] = current
+        visited[neighbor] = 1
+        exploration_order.append(neighbor)
+        if neighbor == end:
+            return True
+        branch.append(neighbor)
+        next_direction.append(0)
+    return False
@@ -0,0 +1,311 @@
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+from array import array
+import time
+from frontier import IndexedHeap
+from grid import Grid
+from instrumentation import elapsed_ms
+from utils import LANDMARK_HEURISTIC
+
+INF = float('inf')
+# Expansions between two looks at the clock when compute has a deadline
+DEADLINE_CHECK_INTERVAL = 1024
+# Largest weight the unsigned 16-bit weight buffer holds
+MAX_WEIGHT = 0xFFFF
+
+def consistent_heuristic(heuristic_type: int, directions: int) -> int:
+    """Returns heuristic_type if it is consistent for moves costing at least 1, otherwise one that is.
+
+    D* Lite only repairs its search correctly with a consistent heuristic: one that never
+    drops by more than the cost of a step. With 4 directions every heuristic bounded by the
+    Manhattan distance qualifies, which leaves out only squared Euclidean (replaced by
+    Manhattan). With 8 directions a diagonal step costs the same as a straight one, so only
+    Chebyshev qualifies and replaces the others. The landmark heuristic is left for
+    Grid.heuristic to reject.
+    """
+    if heuristic_type == LANDMARK_HEURISTIC:
+        return heuristic_type
+    if directions == 8:
+        return 3
+    return 0 if heuristic_type == 5 else heuristic_type
+
+class DStarLite:
+    """Incremental shortest-path planner (D* Lite) that repairs its search after maze edits.
+
+    D* Lite searches backwards from the goal, keeping for every cell its cost-to-goal g
+    and a one-step lookahead rhs. Cells whose two values disagree are queued; after an
+    edit only the cells whose costs actually changed are re-queued, so a replan touches
+    the affected region instead of repeating the whole search. With a fixed start it is
+    Lifelong Planning A* run from the goal, and the start may also move between plans.
+
+    Moves cost the weight of the cell being entered (1 without weights), as in the other
+    solvers. The planner works on its own copy of the maze, which is edited through
+    update_cells; the grid attribute is replaced by a new Grid after every edit.
+
+    Args:
+        grid (Grid): Flattened maze (blocked cells and optional weights)
+        start (int): Starting cell id
+        end (int): Goal cell id
+        directions (int): Number of possible movement directions (4 or 8)
+        heuristic_type (int, optional): Index of the heuristic to use. Defaults to 0 (manhattan).
+            Heuristics that are not consistent for the directions are replaced, see
+            consistent_heuristic; the heuristic_type attribute holds the one in use.
+
+    Raises:
+        ValueError: If a cell of the maze weighs 0. Free moves break the repair of the search
+            (cells joined by them keep vouching for each other's outdated costs), so, as in
+            update_cells, every weight must be at least 1
+    """
+    def __init__(self, grid: Grid, start: int, end: int, directions: int, heuristic_type: int = 0):
+        self.blocked = bytearray(grid.blocked)
+        self.weights = array('H', grid.weights) if grid.weights is not None else None
+        self.grid = Grid(grid.size, self.blocked, self.weights)
+        self.start = start
+        self.end = end
+        self.directions = directions
+        if self.weights is not None and _has_zero_weight(grid):
+            raise ValueError("D* Lite needs every cell weight to be at least 1")
+        self.heuristic_type = consistent_heuristic(heuristic_type, directions)
+        self.offsets = grid.offsets(directions)
+        count = len(self.blocked)
+        self.g = [INF] * count
+        self.rhs = [INF] * count
+        self.queue = IndexedHeap(count)
+        # Heuristic distances are measured to the start, which the search is heading for. The start
+        # moves as the agent advances, so a table per start would rarely be reused
+        self._h = self.grid.heuristic(self.heuristic_type, start, tabulate=False)
+        self.key_modifier = 0
+        self.rhs[end] = 0
+        self.queue.push(end, self._h(end), 0)
+        if self.blocked[start]:
+            self._refresh(start)
+
+    def _key(self, cell: int) -> Tuple[float, float]:
+        best = min(self.g[cell], self.rhs[cell])
+        return best + self._h(cell) + self.key_modifier, best
+
+    def _update_vertex(self, cell: int) -> None:
+        if self.g[cell] != self.rhs[cell]:
+            key = self._key(cell)
+            self.queue.update(cell, key[0], key[1])
+        elif cell in self.queue:
+            self.queue.remove(cell)
+
+    def _cost(self, cell: int) -> float:
+        """Cost of entering a cell."""
+        if self.blocked[cell]:
+            return INF
+        return self.weights[cell] if self.weights is not None else 1
+
+    def _best_successor(self, cell: int) -> Tuple[float, int]:
+        g = self.g
+        best, best_cell = INF, -1
+        for offset in self.offsets:
+            neighbor = cell + offset
+            value = self._cost(neighbor) + g[neighbor]
+            if value < best:
+                best, best_cell = value, neighbor
+        return best, best_cell
+
+    def _refresh(self, cell: int) -> None:
+        """Recomputes rhs of a cell from its successors."""
+        if cell != self.end:
+            self.rhs[cell] = self._best_successor(cell)[0]
+        self._update_vertex(cell)
+
+    def compute(self, trace: Optional[List[int]] = None, deadline_ns: Optional[int] = None) -> int:
+        """Expands inconsistent cells until the start is consistent.
+
+        Args:
+            trace (List[int], optional): List that receives the expanded cell ids. Defaults to None
+            deadline_ns (int, optional): time.perf_counter_ns() value after which the search stops.
+                It stops between two expansions, so the planner stays usable and the next call
+                carries on where this one left off. Defaults to None (no deadline)
+
+        Returns:
+            int: Number of cells expanded
+
+        Raises:
+            TimeoutError: If the deadline passed before the start became consistent
+        """
+        g, rhs, queue = self.g, self.rhs, self.queue
+        blocked, end, start = self.blocked, self.end, self.start
+        offsets = self.offsets
+        expanded = 0
+        while queue:
+            top_key, top_second, cell = queue.peek()
+            start_key = self._key(start)
+            if (top_key, top_second) >= start_key and rhs[start] <= g[start]:
+                break
+            if deadline_ns is not None and expanded % DEADLINE_CHECK_INTERVAL == 0 \
+                    and time.perf_counter_ns() > deadline_ns:
+                raise TimeoutError(f"D* Lite stopped after expanding {expanded} cells")
+            new_key = self._key(cell)
+            if (top_key, top_second) < new_key:
+                # Queued before the start moved; requeue with the current key modifier
+                queue.update(cell, new_key[0], new_key[1])
+                continue
+            expanded += 1
+            if trace is not None:
+                trace.append(cell)
+            entry_cost = self._cost(cell)
+            if g[cell] > rhs[cell]:
+                # Overconsistent: settle the cell and offer it to its predecessors
+                g[cell] = rhs[cell]
+                queue.remove(cell)
+                through = entry_cost + g[cell]
+                for offset in offsets:
+                    neighbor = cell - offset
+                    if neighbor != end and (not blocked[neighbor] or neighbor == start) and through < rhs[neighbor]:
+                        rhs[neighbor] = through
+                        self._update_vertex(neighbor)
+            else:
+                # Underconsistent: the cell got more expensive; predecessors that relied on it re-evaluate
+                old_through = entry_cost + g[cell]
+                g[cell] = INF
+                self._refresh(cell)
+                for offset in offsets:
+                    neighbor = cell - offset
+                    if neighbor != end and (not blocked[neighbor] or neighbor == start) and rhs[neighbor] == old_through:
+                        self._refresh(neighbor)
+        return expanded
+
+    def update_cells(self, changes: Sequence[Tuple[int, Optional[bool], Optional[int]]]) -> int:
+        """Applies maze edits and re-queues the cells whose cost-to-goal may have changed.
+
+        Args:
+            changes (Sequence[Tuple[int, Optional[bool], Optional[int]]]): (cell id, blocked, weight)
+                edits; None leaves that property unchanged
+
+        Returns:
+            int: Number of cells whose cost of entry changed
+
+        Raises:
+            ValueError: If an edit is invalid, in which case none of the edits is applied
+        """
+        # Validate everything first, so a bad edit cannot leave the maze half updated
+        size = self.grid.size
+        for cell, _, weight in changes:
+            x, y = divmod(cell, self.grid.width)
+            if not (1 <= x <= size and 1 <= y <= size):
+                raise ValueError(f"Cell {cell} is outside the {size}x{size} grid")
+            if weight is None:
+                continue
+            if self.weights is None:
+                raise ValueError("Cannot set weights on an unweighted maze")
+            if not 1 <= weight <= MAX_WEIGHT:
+                raise ValueError(f"Weight {weight} of cell ({x - 1}, {y - 1}) is not between 1 and {MAX_WEIGHT}")
+        changed = 0
+        for cell, blocked, weight in changes:
+            old_cost = self._cost(cell)
+            if blocked is not None:
+                self.blocked[cell] = 1 if blocked else 0
+            if weight is not None:
+                self.weights[cell] = weight
+            new_cost = self._cost(cell)
+            if new_cost == old_cost:
+                continue
+            changed += 1
+            # Only moves into the cell changed; the cell's own moves out are unaffected
+            for offset in self.offsets:
+                neighbor = cell - offset
+                if neighbor == self.end or (self.blocked[neighbor] and neighbor != self.start):
+                    continue
+                if new_cost < old_cost:
+                    self.rhs[neighbor] = min(self.rhs[neighbor], new_cost + self.g[cell])
+                    self._update_vertex(neighbor)
+                elif self.rhs[neighbor] == old_cost + self.g[cell]:
+                    self._refresh(neighbor)
+            if old_cost == INF:
+                # Blocked cells are not kept up to date; catch up now that it can be entered
+                self._refresh(cell)
+        if changed:
+            self.grid = Grid(self.grid.size, self.blocked, self.weights)
+        return changed
+
+    def move_start(self, start: int) -> None:
+        """Moves the start, e.g. after the agent followed part of the last path."""
+        if start == self.start:
+            return
+        self.key_modifier += self._h(start)
+        self._h = self.grid.heuristic(self.heuristic_type, start, tabulate=False)
+        self.start = start
+        if self.blocked[start]:
+            self._refresh(start)
+
+    def path(self) -> Optional[List[int]]:
+        """Follows the cheapest successors from the start to the goal, or None if there is no path."""
+        if self.rhs[self.start] == INF:
+            return None
+        path = [self.start]
+        current = self.start
+        seen = {current}
+        while current != self.end:
+            _, current = self._best_successor(current)
+            if current == -1 or current in seen:
+                return None
+            seen.add(current)
+            path.append(current)
+        return path
+
+def _has_zero_weight(grid: Grid) -> bool:
+    """Whether any cell of the maze (blocked ones included, as edits may open them) weighs 0."""
+    size, width, weights = grid.size, grid.width, grid.weights
+    return any(min(weights[(x + 1) * width + 1:(x + 1) * width + 1 + size]) == 0 for x in range(size))
+
+def dstar_lite(start: int, end: int, grid: Grid, directions: int, heuristic_type: int = 0,
+               trace: Optional[List[int]] = None, planner: Optional[DStarLite] = None,
+               deadline_ns: Optional[int] = None) -> Dict[str, Any]:
+    """Implements D* Lite, an incremental variant of A* that can repair its search after maze edits.
+
+    Without a planner this plans from scratch, which behaves like a backwards A*. Passing
+    the planner of an earlier call (after planner.update_cells and planner.move_start)
+    reuses its search, so only the cells affected by the edits are expanded again.
+
+    Args:
+        start (int): Starting cell id
+        end (int): Goal cell id
+        grid (Grid): Flattened maze (blocked cells and optional weights)
+        directions (int): Number of possible movement directions (4 or 8)
+        heuristic_type (int, optional): Index of the heuristic to use, replaced by a consistent one if
+            needed (see DStarLite). Defaults to 0 (manhattan).
+        trace (List[int], optional): List that receives the explored cell ids. Defaults to None
+        planner (DStarLite, optional): Planner to continue; start, end and grid are then ignored. Defaults to None
+        deadline_ns (int, optional): time.perf_counter_ns() value at which to give up, see
+            DStarLite.compute. Defaults to None (no deadline)
+
+    Returns:
+        Dict[str, Any]: A dictionary containing:
+            - path: List of cell ids representing the found path, or None if no path exists
+            - exploration_order: List of cell ids expanded by this call
+            - metrics: Dictionary containing performance metrics:
+                - explored_size: Number of nodes expanded by this call
+                - frontier_size: Size of the frontier (priority queue)
+                - time_taken_ms: Time taken to find the path in milliseconds
+                - path_length: Length of the found path (0 if no path found)
+                - total_cost: Total cost of the path (sum of weights)
+                - heuristic_type: Heuristic the planner uses
+
+    Raises:
+        TimeoutError: If deadline_ns passed before a path was settled
+    """
+    start_time = time.perf_counter_ns()
+    if planner is None:
+        planner = DStarLite(grid, start, end, directions, heuristic_type)
+    exploration_order = trace if trace is not None else []
+    explored_size = planner.compute(exploration_order, deadline_ns)
+    path = planner.path()
+    time_taken_ms = elapsed_ms(start_time)
+
+    return {
+        "path": path,
+        "exploration_order": exploration_order,
+        "metrics": {
+            "explored_size": explored_size,
+            "frontier_size": len(planner.queue),
+            "counters": planner.queue.counters(),
+            "time_taken_ms": time_taken_ms,
+            "path_length": len(path) - 1 if path is not None else 0,
+            "total_cost": planner.grid.path_cost(path) if path is not None else 0,
+            "heuristic_type": planner.heuristic_type
+        }
+    }
@@ -0,0 +1,385 @@
+from typing import Dict, Any, List, Optional, Tuple
+import operator
+from collections import deque
+import re
+import time
+from array import array
+from frontier import IndexedHeap
+from grid import Grid
+from components import reachable
+from algorithms.astar import astar
+from instrumentation import elapsed_ms
+
+_OPEN_RUN = re.compile(b"\x00+")
+
+# Entrances shorter than this get a single transition in their middle, longer ones one at each end
+_ENTRANCE_SPLIT = 6
+
+class Abstraction:
+    """Entrance graph of a maze for hierarchical path planning (HPA*).
+
+    The maze is partitioned into square clusters. Wherever two neighboring clusters
+    share a run of open cells across their border, transition cells are placed on
+    both sides and linked by an inter-cluster edge. On weighted mazes every such
+    entrance also gets a transition where crossing it is cheapest, since paths can
+    only cross borders at transitions. Transition cells of the same
+    cluster are linked by intra-cluster edges whose costs are the shortest distances
+    inside the cluster. Those distances are computed per cluster the first time a
+    search touches it and are kept for later queries.
+
+    Args:
+        grid (Grid): Flattened maze
+        directions (int): Number of possible movement directions (4 or 8)
+        cluster_size (int): Side length of a cluster in cells
+    """
+    def __init__(self, grid: Grid, directions: int, cluster_size: int):
+        self.grid = grid
+        self.directions = directions
+        self.cluster_size = cluster_size
+        self.clusters_per_side = -(-grid.size // cluster_size)
+        self.nodes: Dict[int, List[int]] = {}
+        self.inter: Dict[int, List[Tuple[int, int]]] = {}
+        self._local: Dict[int, Tuple[Grid, int, int]] = {}
+        self._intra: Dict[int, List[Tuple[int, int]]] = {}
+        self._build_entrances()
+
+    def nbytes(self) -> int:
+        """Approximate memory held by the graph and the intra-cluster edges computed so far."""
+        edges = sum(len(edges) for edges in self.inter.values()) + sum(len(edges) for edges in self._intra.values())
+        local_cells = sum(len(local.blocked) * (3 if local.weights is not None else 1) for local, _, _ in self._local.values())
+        # Roughly 100 bytes per list entry holding an (int, int) tuple, plus the cluster grids
+        return 100 * edges + local_cells
+
+    def cluster_of(self, cell: int) -> int:
+        x, y = divmod(cell, self.grid.width)
+        return ((x - 1) // self.cluster_size) * self.clusters_per_side + (y - 1) // self.cluster_size
+
+    def _build_entrances(self) -> None:
+        grid, size, width, cluster_size = self.grid, self.grid.size, self.grid.width, self.cluster_size
+        blocked, weights = grid.blocked, grid.weights
+        for border in range(cluster_size, size, cluster_size):
+            # Rows border - 1 and border (padded rows border and border + 1)
+            row_a, row_b = border * width + 1, (border + 1) * width + 1
+            costs = None
+            if weights is not None:
+                costs = list(map(operator.add, weights[row_a:row_a + size], weights[row_b:row_b + size]))
+            for y in self._transitions(blocked[row_a:row_a + size], blocked[row_b:row_b + size], costs):
+                self._add_transition(row_a + y, row_b + y)
+            # Columns border - 1 and border
+            if weights is not None:
+                costs = list(map(operator.add, weights[border::width][1:size + 1],
+                                 weights[border + 1::width][1:size + 1]))
+            left = blocked[border::width][1:size + 1]
+            right = blocked[border + 1::width][1:size + 1]
+            for x in self._transitions(left, right, costs):
+                self._add_transition((x + 1) * width + border, (x + 1) * width + border + 1)
+
+    def _transitions(self, side_a: bytes, side_b: bytes, costs: Optional[List[int]] = None) -> List[int]:
+        """Returns the positions along a border where transitions are placed.
+
+        costs holds the weight of both cells at every position on weighted mazes (None otherwise).
+        """
+        crossing = bytes(map(operator.or_, side_a, side_b))
+        positions = []
+        for run in _OPEN_RUN.finditer(crossing):
+            run_start, run_end = run.span()
+            # Entrances never extend past a cluster boundary along the border
+            low = run_start
+            while low < run_end:
+                high = min(run_end, (low // self.cluster_size + 1) * self.cluster_size)
+                middle = (low + high - 1) // 2
+                entrance = [middle] if high - low < _ENTRANCE_SPLIT else [low, high - 1]
+                if costs is not None:
+                    # Also cross where it is cheapest, nearest the middle among equals
+                    cheapest = min(range(low, high), key=lambda position: (costs[position], abs(position - middle)))
+                    if costs[cheapest] < min(costs[position] for position in entrance):
+                        entrance.append(cheapest)
+                positions.extend(entrance)
+                low = high
+        return positions
+
+    def _add_transition(self, cell_a: int, cell_b: int) -> None:
+        grid = self.grid
+        for cell, other in ((cell_a, cell_b), (cell_b, cell_a)):
+            edges = self.inter.get(cell)
+            if edges is None:
+                edges = self.inter[cell] = []
+                self.nodes.setdefault(self.cluster_of(cell), []).append(cell)
+            edges.append((other, grid.cost(other)))
+
+    def local_grid(self, cluster: int) -> Tuple[Grid, int, int]:
+        """Returns a padded Grid holding only one cluster, and the cluster's origin (x0, y0)."""
+        local = self._local.get(cluster)
+        if local is None:
+            grid, cluster_size = self.grid, self.cluster_size
+            x0 = (cluster // self.clusters_per_side) * cluster_size
+            y0 = (cluster % self.clusters_per_side) * cluster_size
+            rows = min(cluster_size, grid.size - x0)
+            columns = min(cluster_size, grid.size - y0)
+            local_width = cluster_size + 2
+            blocked = bytearray(b"\x01") * (local_width * local_width)
+            weights = array('H', bytes(2 * local_width * local_width)) if grid.weights is not None else None
+            for row in range(rows):
+                source = (x0 + row + 1) * grid.width + y0 + 1
+                target = (row + 1) * local_width + 1
+                blocked[target:target + columns] = grid.blocked[source:source + columns]
+                if weights is not None:
+                    weights[target:target + columns] = grid.weights[source:source + columns]
+            local = self._local[cluster] = (Grid(cluster_size, blocked, weights), x0, y0)
+        return local
+
+    def to_local(self, cell: int, x0: int, y0: int) -> int:
+        x, y = divmod(cell, self.grid.width)
+        return (x - x0) * (self.cluster_size + 2) + (y - y0)
+
+    def to_global(self, cell: int, x0: int, y0: int) -> int:
+        x, y = divmod(cell, self.cluster_size + 2)
+        return (x + x0) * self.grid.width + (y + y0)
+
+    def distances_from(self, cell: int, reverse: bool = False) -> array:
+        """Returns the in-cluster distances from cell (or to cell if reverse) for every cell of its cluster.
+
+        Unreachable cells hold -1.
+        """
+        local, x0, y0 = self.local_grid(self.cluster_of(cell))
+        return _local_distances(local, self.to_local(cell, x0, y0), self.directions, reverse)
+
+    def edges_to_nodes(self, cell: int, distances: array) -> List[Tuple[int, int]]:
+        """Turns in-cluster distances from cell into (node, cost) edges to the transition cells of its cluster."""
+        cluster = self.cluster_of(cell)
+        _, x0, y0 = self.local_grid(cluster)
+        edges = []
+        for node in self.nodes.get(cluster, ()):
+            if node != cell:
+                distance = distances[self.to_local(node, x0, y0)]
+                if distance >= 0:
+                    edges.append((node, distance))
+        return edges
+
+    def intra_edges(self, node: int) -> List[Tuple[int, int]]:
+        """Returns the intra-cluster edges of a transition cell, computing them on first use."""
+        edges = self._intra.get(node)
+        if edges is None:
+            edges = self._intra[node] = self.edges_to_nodes(node, self.distances_from(node))
+        return edges
+
+def abstraction(grid: Grid, directions: int, cluster_size: int) -> Abstraction:
+    """Returns the HPA* entrance graph of a grid, building and caching it on first use."""
+    return grid.derived(("hpa", directions, cluster_size), lambda: Abstraction(grid, directions, cluster_size))
+
+def _local_distances(local: Grid, source: int, directions: int, reverse: bool = False) -> array:
+    """Single-source distances over a cluster grid: BFS when unweighted, Dijkstra otherwise.
+
+    Stepping onto a cell costs its weight, so distances towards source (reverse)
+    charge the weight of the cell being left instead of the one being entered.
+    """
+    blocked = local.blocked
+    weights = local.weights
+    offsets = local.offsets(directions)
+    distance = array('i', [-1]) * len(blocked)
+    distance[source] = 0
+
+    if weights is None:
+        queue = deque([source])
+        while queue:
+            current = queue.popleft()
+            next_distance = distance[current] + 1
+            for offset in offsets:
+                neighbor = current + offset
+                if not blocked[neighbor] and distance[neighbor] == -1:
+                    distance[neighbor] = next_distance
+                    queue.append(neighbor)
+        return distance
+
+    pq = IndexedHeap(len(blocked))
+    pq.push(source, 0)
+    while pq:
+        current = pq.pop()
+        current_distance = distance[current]
+        for offset in offsets:
+            neighbor = current + offset
+            if not blocked[neighbor]:
+                new_distance = current_distance + weights[current if reverse else neighbor]
+                if distance[neighbor] == -1 or new_distance < distance[neighbor]:
+                    distance[neighbor] = new_distance
+                    pq.push(neighbor, new_distance)
+    return distance
+
+def hpa(start: int, end: int, grid: Grid, directions: int, heuristic_type: int = 0, cluster_size: int = 16,
+        refine: bool = True, trace: Optional[List[int]] = None) -> Dict[str, Any]:
+    """Implements hierarchical pathfinding (HPA*).
+
+    The query is answered on the abstract entrance graph of the maze (see Abstraction):
+    start and end are linked to the transition cells of their clusters, and A* runs
+    over transition cells only, so its cost grows with the number of clusters crossed
+    rather than with the area. The abstract path is then refined segment by segment
+    with astar restricted to a single cluster. The result is near-optimal: paths are
+    only allowed to cross cluster borders at transition cells. Weights are honoured
+    (transitions include the cheapest crossing of every entrance), but on weighted
+    mazes paths still tend to cost a few percent more than the optimum, and some
+    10 to 20% more with 8 directions.
+
+    With refine=False the abstract waypoints are returned immediately; consecutive
+    waypoints are either adjacent or in the same cluster, and refine_path turns any
+    sub-list of them into cells later.
+
+    Args:
+        start (int): Starting cell id
+        end (int): Goal cell id
+        grid (Grid): Flattened maze (blocked cells and optional weights)
+        directions (int): Number of possible movement directions (4 or 8)
+        heuristic_type (int, optional): Index of the heuristic to use. Defaults to 0 (manhattan).
+        cluster_size (int, optional): Side length of a cluster in cells. Defaults to 16
+        refine (bool, optional): Refine the abstract path into cells. Defaults to True
+        trace (List[int], optional): List that receives the explored cell ids. Defaults to None
+
+    Returns:
+        Dict[str, Any]: A dictionary containing:
+            - path: List of cell ids representing the found path (the abstract waypoints if
+              refine is False), or None if no path exists
+            - exploration_order: List of cell ids of the expanded abstract nodes
+            - metrics: Dictionary containing performance metrics:
+                - explored_size: Number of abstract nodes expanded
+                - frontier_size: Size of the frontier (priority queue)
+                - time_taken_ms: Time taken to find the path in milliseconds
+                - path_length: Length of the found path (number of waypoint segments if not refined)
+                - total_cost: Total cost of the path
+                - refined: Whether path holds every cell
+    """
+    start_time = time.perf_counter_ns()
+
+    # Special case: if start and end are the same
+    if start == end:
+        return {
+            "path": [start],
+            "exploration_order": [start],
+            "metrics": {
+                "explored_size": 1,
+                "frontier_size": 0,
+                "time_taken_ms": elapsed_ms(start_time),
+                "path_length": 0,
+                "total_cost": 0,
+                "refined": True
+            }
+        }
+
+    graph = abstraction(grid, directions, cluster_size)
+    heuristic_func = grid.heuristic(heuristic_type, end)
+    exploration_order = trace if trace is not None else []
+
+    # Temporary edges linking start and end to the transition cells of their clusters
+    start_distances = graph.distances_from(start)
+    start_edges = graph.edges_to_nodes(start, start_distances)
+    end_cluster = graph.cluster_of(end)
+    _, end_x0, end_y0 = graph.local_grid(end_cluster)
+    if graph.cluster_of(start) == end_cluster and start_distances[graph.to_local(end, end_x0, end_y0)] >= 0:
+        start_edges.append((end, start_distances[graph.to_local(end, end_x0, end_y0)]))
+    to_end = {node: cost for node, cost in graph.edges_to_nodes(end, graph.distances_from(end, reverse=True))}
+
+    def neighbors(cell: int):
+        if cell == start:
+            yield from start_edges
+        else:
+            yield from graph.intra_edges(cell)
+            if cell in to_end:
+                yield end, to_end[cell]
+        yield from graph.inter.get(cell, ())
+
+    g_score = {start: 0}
+    parent = {start: -1}
+    closed = set()
+    pq = IndexedHeap(len(grid.blocked))
+    pq.push(start, heuristic_func(start), 0)
+    found = False
+
+    while pq:
+        current = pq.pop()
+        if current == end:
+            found = True
+            break
+        closed.add(current)
+        exploration_order.append(current)
+        current_g = g_score[current]
+        for node, cost in neighbors(current):
+            if node in closed:
+                continue
+            tentative_g_score = current_g + cost
+            if tentative_g_score < g_score.get(node, float('inf')):
+                g_score[node] = tentative_g_score
+                parent[node] = current
+                pq.push(node, tentative_g_score + heuristic_func(node), -tentative_g_score)
+
+    if not found and reachable(grid, start, end, directions):
+        # Paths that only cross cluster borders diagonally are not in the abstract graph
+        result = astar(start, end, grid, directions, heuristic_type, trace=trace)
+        result["metrics"]["fallback"] = "astar"
+        result["metrics"]["refined"] = True
+        return result
+    if not found:
+        return {
+            "path": None,
+            "exploration_order": exploration_order,
+            "metrics": {
+                "explored_size": len(closed),
+                "frontier_size": 0,
+                "counters": pq.counters(),
+                "time_taken_ms": elapsed_ms(start_time),
+                "path_length": 0,
+                "total_cost": 0,
+                "refined": True
+            }
+        }
+
+    waypoints = []
+    current = end
+    while current != -1:
+        waypoints.append(current)
+        current = parent[current]
+    waypoints.reverse()
+
+    path = refine_path(grid, directions, waypoints, heuristic_type, cluster_size) if refine else waypoints
+    return {
+        "path": path,
+        "exploration_order": exploration_order,
+        "metrics": {
+            "explored_size": len(closed),
+            "frontier_size": len(pq),
+            "counters": pq.counters(),
+            "time_taken_ms": elapsed_ms(start_time),
+            "path_length": len(path) - 1,
+            "total_cost": grid.path_cost(path) if refine else g_score[end],
+            "refined": refine
+        }
+    }
+
+def refine_path(grid: Grid, directions: int, waypoints: List[int], heuristic_type: int = 0,
+                cluster_size: int = 16) -> List[int]:
+    """Expands HPA* waypoints into the cells of the path.
+
+    Args:
+        grid (Grid): Flattened maze
+        directions (int): Number of possible movement directions (4 or 8)
+        waypoints (List[int]): Cell ids where consecutive entries are adjacent or in the same cluster
+        heuristic_type (int, optional): Index of the heuristic used inside clusters. Defaults to 0
+        cluster_size (int, optional): Cluster size the waypoints were planned with. Defaults to 16
+
+    Returns:
+        List[int]: Cell ids of the refined path
+    """
+    graph = abstraction(grid, directions, cluster_size)
+    offsets = set(grid.offsets(directions))
+    path = waypoints[:1]
+    for cell, target in zip(waypoints, waypoints[1:]):
+        if target - cell in offsets and not grid.blocked[target]:
+            path.append(target)
+            continue
+        cluster = graph.cluster_of(cell)
+        if graph.cluster_of(target) != cluster:
+            raise ValueError("Consecutive waypoints must be adjacent or in the same cluster")
+        local, x0, y0 = graph.local_grid(cluster)
+        segment = astar(graph.to_local(cell, x0, y0), graph.to_local(target, x0, y0), local, directions,
+                        heuristic_type)["path"]
+        if segment is None:
+            raise ValueError("Consecutive waypoints are not connected inside their cluster")
+        path.extend(graph.to_global(local_cell, x0, y0) for local_cell in segment[1:])
+    return path
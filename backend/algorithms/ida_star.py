@@ -0,0 +1,122 @@
+from typing import Dict, Any, List, Optional
+import time
+from array import array
+from grid import Grid, reconstruct_path, new_parent_array
+from exploration import CappedTrace
+from instrumentation import elapsed_ms
+
+def ida_star(start: int, end: int, grid: Grid, directions: int, heuristic_type: int = 0,
+             max_trace: Optional[int] = None, trace: Optional[List[int]] = None) -> Dict[str, Any]:
+    """Implements Iterative Deepening A* (IDA*) with a resumed frontier (Fringe Search).
+
+    Like IDA*, the search runs depth-first iterations bounded by a threshold on
+    f = g + h, raising the threshold to the smallest f that exceeded it. Instead of
+    restarting every iteration from the start, cells cut off by the threshold are kept
+    and the next iteration resumes from them, and the best g found so far for every
+    cell serves as a transposition table, so no cell is expanded twice with the same
+    cost. When the grid carries weights, they are the step costs.
+
+    Args:
+        start (int): Starting cell id
+        end (int): Goal cell id
+        grid (Grid): Flattened maze (blocked cells and optional weights)
+        directions (int): Number of possible movement directions (4 or 8)
+        heuristic_type (int, optional): Index of the heuristic to use, or LANDMARK_HEURISTIC
+            (landmarks, see landmarks.py). Defaults to 0 (manhattan).
+        max_trace (int, optional): Maximum number of exploration entries kept. Defaults to the number of cells
+        trace (List[int], optional): List that receives the explored cell ids. Defaults to None
+
+    Returns:
+        Dict[str, Any]: A dictionary containing:
+            - path: List of cell ids representing the found path, or None if no path exists
+            - exploration_order: List of cell ids showing the order of expansion
+            - metrics: Dictionary containing performance metrics:
+                - explored_size: Number of expansions (a cell is expanded again if a cheaper path to it is found)
+                - frontier_size: Number of cells waiting for a higher threshold
+                - time_taken_ms: Time taken to find the path in milliseconds
+                - path_length: Length of the found path (0 if no path found)
+                - total_cost: Total cost of the path (sum of weights)
+                - iterations: Number of thresholds tried
+                - trace_truncated: Present and True when max_trace entries were exceeded
+    """
+    start_time = time.perf_counter_ns()
+    blocked = grid.blocked
+    weights = grid.weights
+    # Reversed so that popping the stack tries directions in their usual order
+    offsets = grid.offsets(directions)[::-1]
+    count = len(blocked)
+    if trace is None:
+        trace = CappedTrace(max_trace if max_trace is not None else count)
+    exploration_order = trace
+    heuristic_func = grid.heuristic(heuristic_type, end, directions)
+    g_score = [float('inf')] * count
+    expanded_g = [float('inf')] * count
+    parent = new_parent_array(grid)
+    deferred = array('i', [0]) * count
+    g_score[start] = 0
+    threshold = heuristic_func(start)
+    now = [start]
+    later: List[int] = []
+    explored_size = 0
+    iterations = 0
+    found = False
+
+    while now and not found:
+        iterations += 1
+        later = []
+        next_threshold = float('inf')
+        while now:
+            current = now.pop()
+            g = g_score[current]
+            if expanded_g[current] <= g:
+                # Already expanded with this cost; a stale duplicate
+                continue
+            f = g + heuristic_func(current)
+            if f > threshold:
+                # Cut off; resume from here once the threshold reaches f
+                if f < next_threshold:
+                    next_threshold = f
+                if deferred[current] != iterations:
+                    deferred[current] = iterations
+                    later.append(current)
+                continue
+
+            explored_size += 1
+            exploration_order.append(current)
+            if current == end:
+                found = True
+                break
+            expanded_g[current] = g
+            for offset in offsets:
+                neighbor = current + offset
+                if blocked[neighbor]:
+                    continue
+                new_g = g + (weights[neighbor] if weights is not None else 1)
+                if new_g < g_score[neighbor]:
+                    g_score[neighbor] = new_g
+                    parent[neighbor] = current
+                    now.append(neighbor)
+        threshold = next_threshold
+        if not found:
+            # Keep the order in which the cells were cut off
+            later.reverse()
+            now = later
+
+    time_taken_ms = elapsed_ms(start_time)
+    path = reconstruct_path(parent, end) if found else None
+    metrics = {
+        "explored_size": explored_size,
+        "frontier_size": len(now) + len(later) if found else len(now),
+        "time_taken_ms": time_taken_ms,
+        "path_length": len(path) - 1 if path is not None else 0,
+        "total_cost": grid.path_cost(path) if path is not None else 0,
+        "iterations": iterations
+    }
+    if getattr(exploration_order, "truncated", False):
+        metrics["trace_truncated"] = True
+
+    return {
+        "path": path,
+        "exploration_order": exploration_order,
+        "metrics": metrics
+    }
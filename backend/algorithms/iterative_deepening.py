@@ -1,140 +1,116 @@
 from typing import Dict, Any, List, Optional
 import time
-from utils import Pair, make_2d_array, get_neighbors
+from grid import Grid, reconstruct_path, new_parent_array
+from exploration import CappedTrace
+from algorithms.dfs import depth_limited_dfs
+from instrumentation import elapsed_ms
 
-def iterative_deepening(start: Pair, end: Pair, blocks: List[List[bool]], size: int, directions: int, dx: List[int], dy: List[int]) -> Dict[str, Any]:
+def iterative_deepening(start: int, end: int, grid: Grid, directions: int, resume: bool = True,
+                        max_trace: Optional[int] = None, trace: Optional[List[int]] = None) -> Dict[str, Any]:
     """Implements the Iterative Deepening Depth-First Search (IDDFS) algorithm for pathfinding.
     
     IDDFS combines the space efficiency of DFS with the completeness of BFS. It performs
     a series of depth-limited DFS searches, gradually increasing the depth limit until
-    the goal is found or a maximum reasonable depth is reached.
+    the goal is found or no cell was cut off by the limit anymore.
+
+    By default every iteration resumes from the boundary of the previous one: the cells
+    reached at the old limit are expanded one step further instead of searching again
+    from the start, which keeps the total work linear in the number of cells (and makes
+    the path a shortest one in steps). With resume=False each iteration restarts from the
+    start with fresh visited and parent arrays, the textbook behaviour whose work grows
+    quadratically with the depth of the goal.
     
     Args:
-        start (Pair): Starting position coordinates (x, y)
-        end (Pair): Goal position coordinates (x, y)
-        blocks (List[List[bool]]): 2D grid representing obstacles (True for blocked cells)
-        size (int): Size of the grid (assuming square grid)
+        start (int): Starting cell id
+        end (int): Goal cell id
+        grid (Grid): Flattened maze (blocked cells and optional weights)
         directions (int): Number of possible movement directions (4 or 8)
-        dx (List[int]): List of x-direction movements
-        dy (List[int]): List of y-direction movements
+        resume (bool, optional): Resume from the previous boundary instead of restarting. Defaults to True
+        max_trace (int, optional): Maximum number of exploration entries kept. Defaults to the number of cells
+        trace (List[int], optional): List that receives the explored cell ids. Defaults to None
     
     Returns:
         Dict[str, Any]: A dictionary containing:
-            - path: List of Pair objects representing the found path, or None if no path exists
-            - exploration_order: List of coordinates showing the order of exploration
+            - path: List of cell ids representing the found path, or None if no path exists
+            - exploration_order: List of cell ids showing the order of exploration
             - metrics: Dictionary containing performance metrics:
                 - explored_size: Total number of nodes explored across all depth iterations
-                - frontier_size: Always 0 as IDDFS doesn't maintain a frontier
+                - frontier_size: Size of the boundary the last iteration resumed from (0 when restarting)
                 - time_taken_ms: Time taken to find the path in milliseconds
                 - path_length: Length of the found path (0 if no path found)
+                - iterations: Number of depth limits tried
+                - trace_truncated: Present and True when max_trace entries were exceeded
     """
+    start_time = time.perf_counter_ns()
+
     # Special case: if start and end are the same
-    if start.first == end.first and start.second == end.second:
+    if start == end:
         return {
             "path": [start],
-            "exploration_order": [[start.first, start.second]],
+            "exploration_order": [start],
             "metrics": {
                 "explored_size": 1,
                 "frontier_size": 0,
-                "time_taken_ms": 0,
+                "time_taken_ms": elapsed_ms(start_time),
                 "path_length": 0,
                 "total_cost": 0
             }
         }
     
-    start_time = time.time()
+    blocked = grid.blocked
     total_explored = 0
-    exploration_order = []
-    max_reasonable_depth = size * 2  # A reasonable maximum depth
-    
-    def depth_limited_dfs(current: Pair, depth: int, visited: List[List[bool]], parent: List[List[Pair]], 
-                         current_exploration: List[List[int]]) -> bool:
-        """Helper function that performs a depth-limited DFS search.
-        
-        Args:
-            current (Pair): Current position being explored
-            depth (int): Remaining depth to explore
-            visited (List[List[bool]]): 2D array tracking visited nodes
-            parent (List[List[Pair]]): 2D array tracking parent nodes for path reconstruction
-            current_exploration (List[List[int]]): List to track exploration order for current depth
-            
-        Returns:
-            bool: True if path to goal is found within depth limit, False otherwise
-        """
-        if depth < 0:
-            return False
-            
-        visited[current.first][current.second] = True
-        current_exploration.append([current.first, current.second])
-        
-        if current.first == end.first and current.second == end.second:
-            return True
-            
-        if depth == 0:
-            return False
-            
-        neighbors = get_neighbors(current, blocks, size, directions, dx, dy)
-        for neighbor in neighbors:
-            if not visited[neighbor.first][neighbor.second]:
-                parent[neighbor.first][neighbor.second] = current
-                if depth_limited_dfs(neighbor, depth - 1, visited, parent, current_exploration):
-                    return True
-                    
-        return False
-    
-    for depth in range(1, max_reasonable_depth + 1):
-        # Create new visited and parent arrays for each depth iteration
-        visited = make_2d_array(size, False)
-        parent = make_2d_array(size, Pair(-1, -1))
-        current_exploration = []
-        
-        # Run DFS with current depth limit
-        if depth_limited_dfs(start, depth, visited, parent, current_exploration):
-            # Path found, reconstruct it
-            path = []
-            current = end
-            total_cost = 0
-            while current.first != -1:
-                path.insert(0, current)
-                if parent[current.first][current.second].first != -1:
-                    total_cost += 1  # Each step has a cost of 1
-                current = parent[current.first][current.second]
-            
-            # Calculate metrics
-            explored_size = total_explored + sum(sum(row) for row in visited)
-            time_taken_ms = (time.time() - start_time) * 1000
-            path_length = len(path) - 1  # Subtract 1 to not count the start node
-            
-            # Add this iteration's exploration to the total
-            exploration_order.extend(current_exploration)
-            
-            return {
-                "path": path,
-                "exploration_order": exploration_order,
-                "metrics": {
-                    "explored_size": explored_size,
-                    "frontier_size": 0,  # No frontier in IDDFS
-                    "time_taken_ms": time_taken_ms,
-                    "path_length": path_length,
-                    "total_cost": total_cost
-                }
-            }
-        
-        # Add this iteration's exploration to the total
-        exploration_order.extend(current_exploration)
-        total_explored += sum(sum(row) for row in visited)
-    
-    # No path found after trying all reasonable depths
-    time_taken_ms = (time.time() - start_time) * 1000
-    
+    if trace is None:
+        trace = CappedTrace(max_trace if max_trace is not None else len(blocked))
+    exploration_order = trace
+    found = False
+    iterations = 0
+    resumed_from = 0
+
+    if resume:
+        visited = bytearray(len(blocked))
+        parent = new_parent_array(grid)
+        boundary = [start]
+        while boundary and not found:
+            iterations += 1
+            resumed_from = len(boundary)
+            next_boundary = []
+            for cell in boundary:
+                # Cells on the boundary were reached at the previous limit; expand them one step further
+                if depth_limited_dfs(cell, end, grid, directions, 1, visited, parent, exploration_order, next_boundary):
+                    found = True
+                    break
+            boundary = next_boundary
+        total_explored = visited.count(1)
+    else:
+        boundary = []
+        for depth in range(1, len(blocked) + 1):
+            iterations += 1
+            # Create new visited and parent arrays for each depth iteration
+            visited = bytearray(len(blocked))
+            parent = new_parent_array(grid)
+            boundary.clear()
+            found = depth_limited_dfs(start, end, grid, directions, depth, visited, parent, exploration_order, boundary)
+            total_explored += visited.count(1)
+            if found or not boundary:
+                # Found, or the whole component fit within the limit and deeper searches cannot add anything
+                break
+
+    time_taken_ms = elapsed_ms(start_time)
+    path = reconstruct_path(parent, end) if found else None
+    path_length = len(path) - 1 if path is not None else 0  # Subtract 1 to not count the start node
+    metrics = {
+        "explored_size": total_explored,
+        "frontier_size": resumed_from,
+        "time_taken_ms": time_taken_ms,
+        "path_length": path_length,
+        "total_cost": path_length,  # Each step has a cost of 1
+        "iterations": iterations
+    }
+    if getattr(exploration_order, "truncated", False):
+        metrics["trace_truncated"] = True
+
     return {
-        "path": None,
+        "path": path,
         "exploration_order": exploration_order,
-        "metrics": {
-            "explored_size": total_explored,
-            "frontier_size": 0,
-            "time_taken_ms": time_taken_ms,
-            "path_length": 0,
-            "total_cost": 0
-        }
-    } 
\ No newline at end of file
+        "metrics": metrics
+    }
@@ -0,0 +1,351 @@
+from typing import Dict, Any, List, Optional, Tuple
+import re
+import time
+from array import array
+from frontier import IndexedHeap
+from grid import Grid, reconstruct_path, new_parent_array
+from algorithms.astar import astar
+from instrumentation import elapsed_ms
+
+_OPEN_RUN = re.compile(b"\x00+")
+
+def jps(start: int, end: int, grid: Grid, directions: int, heuristic_type: int = 3, plus: bool = False,
+        trace: Optional[List[int]] = None) -> Dict[str, Any]:
+    """Implements Jump Point Search (JPS) and JPS+ for uniform-cost 8-direction grids.
+
+    JPS is A* that only expands jump points. From every expanded cell it scans in a
+    straight line (or diagonally) until it reaches a cell where the obstacles around it
+    force a turn, and skips every cell in between, because any path through them has
+    an equally short path through the jump point. On open grids this expands orders of
+    magnitude fewer cells than A*. JPS+ looks the jump distances up in a table that is
+    precomputed once per maze (see jump_table) instead of scanning.
+
+    Every step costs 1, diagonal steps included, as in the other solvers. JPS only
+    applies to uniform-cost 8-direction grids; weighted or 4-direction queries are
+    delegated to astar and report "fallback": "astar" in their metrics.
+
+    Args:
+        start (int): Starting cell id
+        end (int): Goal cell id
+        grid (Grid): Flattened maze (blocked cells and optional weights)
+        directions (int): Number of possible movement directions (4 or 8)
+        heuristic_type (int, optional): Index of the heuristic to use, or LANDMARK_HEURISTIC. Defaults to 3
+            (chebyshev), the exact distance on an open grid with unit-cost diagonals.
+        plus (bool, optional): Use precomputed jump distances (JPS+). Defaults to False
+        trace (List[int], optional): List that receives the explored cell ids. Defaults to None
+
+    Returns:
+        Dict[str, Any]: A dictionary containing:
+            - path: List of cell ids representing the found path, or None if no path exists
+            - exploration_order: List of cell ids of the expanded jump points
+            - metrics: Dictionary containing performance metrics:
+                - explored_size: Number of jump points expanded
+                - frontier_size: Size of the frontier (priority queue)
+                - time_taken_ms: Time taken to find the path in milliseconds
+                - path_length: Length of the found path (0 if no path found)
+                - total_cost: Total cost of the path
+    """
+    if directions != 8 or grid.weights is not None:
+        result = astar(start, end, grid, directions, heuristic_type, trace=trace)
+        result["metrics"]["fallback"] = "astar"
+        return result
+
+    start_time = time.perf_counter_ns()
+
+    # Special case: if start and end are the same
+    if start == end:
+        return {
+            "path": [start],
+            "exploration_order": [start],
+            "metrics": {
+                "explored_size": 1,
+                "frontier_size": 0,
+                "time_taken_ms": elapsed_ms(start_time),
+                "path_length": 0,
+                "total_cost": 0
+            }
+        }
+
+    blocked = grid.blocked
+    width = grid.width
+    visited = bytearray(len(blocked))
+    parent = new_parent_array(grid)
+    g_score = {start: 0}
+    heuristic_func = grid.heuristic(heuristic_type, end, directions)
+    exploration_order = trace if trace is not None else []
+    end_x, end_y = divmod(end, width)
+
+    if plus:
+        table = jump_table(grid)
+        successors = lambda cell, x, y, step: _table_successors(blocked, table, cell, x, y, step, end_x, end_y, width)
+    else:
+        successors = lambda cell, x, y, step: _scan_successors(blocked, cell, step, end, width)
+
+    pq = IndexedHeap(len(blocked))
+    pq.push(start, heuristic_func(start), 0)
+
+    while pq:
+        current = pq.pop()
+
+        if current == end:
+            path = _expand_path(reconstruct_path(parent, end), width)
+
+            explored_size = visited.count(1)
+            frontier_size = len(pq)
+            time_taken_ms = elapsed_ms(start_time)
+            path_length = len(path) - 1  # Subtract 1 to not count the start node
+
+            return {
+                "path": path,
+                "exploration_order": exploration_order,
+                "metrics": {
+                    "explored_size": explored_size,
+                    "frontier_size": frontier_size,
+                    "counters": pq.counters(),
+                    "time_taken_ms": time_taken_ms,
+                    "path_length": path_length,
+                    "total_cost": path_length  # Each step has a cost of 1
+                }
+            }
+
+        visited[current] = 1
+        exploration_order.append(current)
+
+        x, y = divmod(current, width)
+        step = None
+        if parent[current] != -1:
+            parent_x, parent_y = divmod(parent[current], width)
+            step = (_sign(x - parent_x), _sign(y - parent_y))
+
+        current_g = g_score[current]
+        for jump_point in successors(current, x, y, step):
+            if visited[jump_point]:
+                continue
+            jump_x, jump_y = divmod(jump_point, width)
+            # Jumps are straight or diagonal, so their length in steps is the Chebyshev distance
+            tentative_g_score = current_g + max(abs(jump_x - x), abs(jump_y - y))
+            if tentative_g_score < g_score.get(jump_point, float('inf')):
+                parent[jump_point] = current
+                g_score[jump_point] = tentative_g_score
+                pq.push(jump_point, tentative_g_score + heuristic_func(jump_point), -tentative_g_score)
+
+    explored_size = visited.count(1)
+    frontier_size = len(pq)
+    time_taken_ms = elapsed_ms(start_time)
+
+    return {
+        "path": None,
+        "exploration_order": exploration_order,
+        "metrics": {
+            "explored_size": explored_size,
+            "frontier_size": frontier_size,
+            "counters": pq.counters(),
+            "time_taken_ms": time_taken_ms,
+            "path_length": 0,
+            "total_cost": 0
+        }
+    }
+
+def _sign(value: int) -> int:
+    return (value > 0) - (value < 0)
+
+# Direction steps (dx, dy) of the 8 moves, in the order of the DX_8D/DY_8D constants
+_STEPS = ((0, 1), (1, 1), (1, 0), (1, -1), (0, -1), (-1, -1), (-1, 0), (-1, 1))
+
+def _pruned_steps(blocked: bytearray, cell: int, step: Optional[Tuple[int, int]], width: int) -> List[Tuple[int, int]]:
+    """Returns the natural and forced move directions out of a jump point reached by moving step."""
+    if step is None:
+        return list(_STEPS)
+    dx, dy = step
+    if dx == 0 or dy == 0:
+        steps = [step]
+        # Side cells that are blocked force the diagonal around them
+        for px, py in ((dy, dx), (-dy, -dx)):
+            side = cell + px * width + py
+            if blocked[side] and not blocked[side + dx * width + dy]:
+                steps.append((px + dx, py + dy))
+        return steps
+    steps = [step, (dx, 0), (0, dy)]
+    if blocked[cell - dx * width] and not blocked[cell - dx * width + dy]:
+        steps.append((-dx, dy))
+    if blocked[cell - dy] and not blocked[cell - dy + dx * width]:
+        steps.append((dx, -dy))
+    return steps
+
+def _scan_successors(blocked: bytearray, cell: int, step: Optional[Tuple[int, int]], end: int, width: int) -> List[int]:
+    jump_points = []
+    for dx, dy in _pruned_steps(blocked, cell, step, width):
+        if dx == 0 or dy == 0:
+            jump_point = _jump_straight(blocked, cell, dx * width + dy, dy * width + dx, end)
+        else:
+            jump_point = _jump_diagonal(blocked, cell, dx * width, dy, end)
+        if jump_point != -1:
+            jump_points.append(jump_point)
+    return jump_points
+
+def _jump_straight(blocked: bytearray, cell: int, offset: int, side: int, end: int) -> int:
+    """Scans from cell along offset; returns the first jump point or -1 at a wall."""
+    while True:
+        cell += offset
+        if blocked[cell]:
+            return -1
+        if cell == end:
+            return cell
+        if ((blocked[cell + side] and not blocked[cell + side + offset])
+                or (blocked[cell - side] and not blocked[cell - side + offset])):
+            return cell
+
+def _jump_diagonal(blocked: bytearray, cell: int, offset_x: int, offset_y: int, end: int) -> int:
+    """Scans diagonally from cell; stops where a straight scan along either component finds a jump point."""
+    offset = offset_x + offset_y
+    while True:
+        cell += offset
+        if blocked[cell]:
+            return -1
+        if cell == end:
+            return cell
+        if ((blocked[cell - offset_x] and not blocked[cell - offset_x + offset_y])
+                or (blocked[cell - offset_y] and not blocked[cell - offset_y + offset_x])):
+            return cell
+        if (_jump_straight(blocked, cell, offset_x, offset_y, end) != -1
+                or _jump_straight(blocked, cell, offset_y, offset_x, end) != -1):
+            return cell
+
+def _table_successors(blocked: bytearray, table: Dict[int, array], cell: int, x: int, y: int, step: Optional[Tuple[int, int]],
+                      end_x: int, end_y: int, width: int) -> List[int]:
+    jump_points = []
+    goal_dx, goal_dy = end_x - x, end_y - y
+    for dx, dy in _pruned_steps(blocked, cell, step, width):
+        offset = dx * width + dy
+        distance = table[offset][cell]
+        reach = distance if distance > 0 else -distance
+        if dx == 0 or dy == 0:
+            # The goal lies on this ray, before the next jump point or wall
+            if dx == 0:
+                on_ray = goal_dx == 0 and goal_dy * dy > 0
+                steps_to_goal = goal_dy * dy
+            else:
+                on_ray = goal_dy == 0 and goal_dx * dx > 0
+                steps_to_goal = goal_dx * dx
+            if on_ray and steps_to_goal <= reach:
+                jump_points.append(cell + steps_to_goal * offset)
+                continue
+        elif goal_dx * dx > 0 and goal_dy * dy > 0:
+            # The goal lies in this quadrant: stop where the ray crosses its row or column
+            steps_to_goal = min(goal_dx * dx, goal_dy * dy)
+            if steps_to_goal <= reach:
+                jump_points.append(cell + steps_to_goal * offset)
+                continue
+        if distance > 0:
+            jump_points.append(cell + distance * offset)
+    return jump_points
+
+def _expand_path(jump_points: List[int], width: int) -> List[int]:
+    """Fills in the cells between consecutive jump points."""
+    path = jump_points[:1]
+    for cell, target in zip(jump_points, jump_points[1:]):
+        x, y = divmod(cell, width)
+        target_x, target_y = divmod(target, width)
+        offset = _sign(target_x - x) * width + _sign(target_y - y)
+        while cell != target:
+            cell += offset
+            path.append(cell)
+    return path
+
+def jump_table(grid: Grid) -> Dict[int, array]:
+    """Returns the JPS+ jump distances of a grid, computing and caching them on first use.
+
+    The table maps each of the 8 direction offsets to an array holding, for every
+    cell, the number of steps to the next jump point in that direction (> 0), or
+    minus the number of free steps before the next wall (<= 0).
+    """
+    return grid.derived(("jps_plus",), lambda: _build_jump_table(grid))
+
+def _build_jump_table(grid: Grid) -> Dict[int, array]:
+    blocked = bytes(grid.blocked)
+    width = grid.width
+    count = len(blocked)
+    typecode = 'h' if width < 2 ** 15 else 'i'
+    table: Dict[int, array] = {}
+
+    # Cell masks as big integers with one byte per cell, so that whole-maze shifts and
+    # boolean operations run in C; shifted(mask, k) holds the value of cell + k at cell
+    all_cells = int.from_bytes(b"\x01" * count, "little")
+    blocked_mask = int.from_bytes(blocked, "little")
+    free_mask = blocked_mask ^ all_cells
+
+    def shifted(mask: int, k: int) -> int:
+        return mask >> (8 * k) if k >= 0 else (mask << (-8 * k)) & ((1 << (8 * count)) - 1)
+
+    def to_bytes(mask: int) -> bytes:
+        return (mask & all_cells).to_bytes(count, "little")
+
+    # Straight moves: a cell is a jump point when a blocked side cell opens up ahead of it
+    has_jump = {}
+    for offset, side in ((1, width), (width, 1)):
+        for direction in (offset, -offset):
+            forced = (shifted(blocked_mask, side) & shifted(free_mask, side + direction)) \
+                | (shifted(blocked_mask, -side) & shifted(free_mask, -side + direction))
+            markers = to_bytes(free_mask & forced)
+            table[direction], has_jump[direction] = _fill_distances(blocked, markers, direction, width, typecode)
+
+    # Diagonal moves: jump points are cells with a forced neighbor, or cells from which a
+    # straight scan along either component of the move reaches a jump point
+    for offset_x in (width, -width):
+        for offset_y in (1, -1):
+            direction = offset_x + offset_y
+            forced = (shifted(blocked_mask, -offset_x) & shifted(free_mask, -offset_x + offset_y)) \
+                | (shifted(blocked_mask, -offset_y) & shifted(free_mask, -offset_y + offset_x)) \
+                | int.from_bytes(has_jump[offset_x], "little") | int.from_bytes(has_jump[offset_y], "little")
+            markers = to_bytes(free_mask & forced)
+            table[direction], _ = _fill_distances(blocked, markers, direction, width, typecode)
+    return table
+
+def _fill_distances(blocked: bytes, markers: bytes, direction: int, width: int, typecode: str) -> Tuple[array, bytearray]:
+    """Computes the jump distances of every cell for one direction.
+
+    The flat buffer is cut into lines of stride |direction|; the blocked padding
+    separates consecutive rows, columns or diagonals within a line. Lines are
+    processed in the direction of the move (reversed for negative directions),
+    filled run by run from precomputed ramps of values, and copied into the result
+    with a single strided slice assignment.
+
+    Returns:
+        Tuple[array, bytearray]: The distances, and a mask of the cells with a jump point ahead
+    """
+    count = len(blocked)
+    stride = abs(direction)
+    itemsize = array(typecode).itemsize
+    distances = array(typecode, bytes(itemsize * count))
+    has_jump = bytearray(count)
+    # No run of open cells is longer than a row
+    longest = width
+    # countdown[-k:] is k, k-1, ..., 1 and to_wall[-k:] is -(k-1), ..., -1, 0
+    countdown = array(typecode, range(longest, 0, -1))
+    to_wall = array(typecode, range(1 - longest, 1))
+    ones = b"\x01" * longest
+    for first in range(stride):
+        line = blocked[first::stride]
+        line_markers = markers[first::stride]
+        if direction < 0:
+            line, line_markers = line[::-1], line_markers[::-1]
+        line_distances = array(typecode, bytes(itemsize * len(line)))
+        line_has_jump = bytearray(len(line))
+        for run in _OPEN_RUN.finditer(line):
+            run_start, run_end = run.span()
+            # Each cell gets the distance to the next marker after it, or to the end of its run
+            low = run_start
+            position = line_markers.find(1, run_start + 1, run_end)
+            while position != -1:
+                line_distances[low:position] = countdown[low - position:]
+                low = position
+                position = line_markers.find(1, position + 1, run_end)
+            if low > run_start:
+                line_has_jump[run_start:low] = ones[:low - run_start]
+            line_distances[low:run_end] = to_wall[low - run_end:]
+        if direction < 0:
+            line_distances.reverse()
+            line_has_jump.reverse()
+        distances[first::stride] = line_distances
+        has_jump[first::stride] = line_has_jump
+    return distances, has_jump
@@ -1,8 +1,9 @@
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 import time
-from utils import Pair, make_2d_array, get_neighbors, get_heuristic
+from grid import Grid, reconstruct_path, new_parent_array
+from instrumentation import elapsed_ms
 
-def local_beam_search(start: Pair, end: Pair, blocks: List[List[bool]], size: int, directions: int, dx: List[int], dy: List[int], beam_width: int = 5, heuristic_type: int = 0) -> Dict[str, Any]:
+def local_beam_search(start: int, end: int, grid: Grid, directions: int, beam_width: int = 5, heuristic_type: int = 0, trace: Optional[List[int]] = None) -> Dict[str, Any]:
     """Implements the Local Beam Search algorithm for pathfinding.
     
     Local Beam Search is a heuristic search algorithm that maintains a fixed number of
@@ -11,20 +12,19 @@ def local_beam_search(start: Pair, end: Pair, blocks: List[List[bool]], size: in
     memory efficient than BFS while still being guided towards the goal.
     
     Args:
-        start (Pair): Starting position coordinates (x, y)
-        end (Pair): Goal position coordinates (x, y)
-        blocks (List[List[bool]]): 2D grid representing obstacles (True for blocked cells)
-        size (int): Size of the grid (assuming square grid)
+        start (int): Starting cell id
+        end (int): Goal cell id
+        grid (Grid): Flattened maze (blocked cells and optional weights)
         directions (int): Number of possible movement directions (4 or 8)
-        dx (List[int]): List of x-direction movements
-        dy (List[int]): List of y-direction movements
         beam_width (int, optional): Number of states to maintain at each level. Defaults to 5
-        heuristic_type (int, optional): Type of heuristic function to use. Defaults to 0
+        heuristic_type (int, optional): Type of heuristic function to use, or LANDMARK_HEURISTIC
+            (landmarks, see landmarks.py). Defaults to 0
+        trace (List[int], optional): List that receives the explored cell ids. Defaults to None
     
     Returns:
         Dict[str, Any]: A dictionary containing:
-            - path: List of Pair objects representing the found path, or None if no path exists
-            - exploration_order: List of coordinates showing the order of exploration
+            - path: List of cell ids representing the found path, or None if no path exists
+            - exploration_order: List of cell ids showing the order of exploration
             - metrics: Dictionary containing performance metrics:
                 - explored_size: Number of nodes explored
                 - frontier_size: Size of the current beam
@@ -37,73 +37,72 @@ def local_beam_search(start: Pair, end: Pair, blocks: List[List[bool]], size: in
     elif beam_width > 20:  # Set a reasonable upper limit
         beam_width = 20
     
+    start_time = time.perf_counter_ns()
+
     # Get appropriate heuristic function
-    heuristic = get_heuristic(heuristic_type)
+    heuristic = grid.heuristic(heuristic_type, end, directions)
     
     # Special case: if start and end are the same
-    if start.first == end.first and start.second == end.second:
+    if start == end:
         return {
             "path": [start],
-            "exploration_order": [[start.first, start.second]],
+            "exploration_order": [start],
             "metrics": {
                 "explored_size": 1,
                 "frontier_size": 0,
-                "time_taken_ms": 0,
+                "time_taken_ms": elapsed_ms(start_time),
                 "path_length": 0
             }
         }
     
+    blocked = grid.blocked
+    offsets = grid.offsets(directions)
+    
     # Early exit: Check if end is a direct neighbor of start
-    initial_neighbors = get_neighbors(start, blocks, size, directions, dx, dy)
-    for neighbor in initial_neighbors:
-        if neighbor.first == end.first and neighbor.second == end.second:
-            return {
-                "path": [start, end],
-                "exploration_order": [[start.first, start.second], [end.first, end.second]],
-                "metrics": {
-                    "explored_size": 2,
-                    "frontier_size": len(initial_neighbors) - 1,  # All neighbors except the end
-                    "time_taken_ms": 0,
-                    "path_length": 1
-                }
+    initial_neighbors = [start + offset for offset in offsets if not blocked[start + offset]]
+    if end in initial_neighbors:
+        return {
+            "path": [start, end],
+            "exploration_order": [start, end],
+            "metrics": {
+                "explored_size": 2,
+                "frontier_size": len(initial_neighbors) - 1,  # All neighbors except the end
+                "time_taken_ms": elapsed_ms(start_time),
+                "path_length": 1
             }
+        }
     
-    start_time = time.time()
-    visited = make_2d_array(size, False)
-    parent = make_2d_array(size, Pair(-1, -1))
-    exploration_order = []
+    visited = bytearray(len(blocked))
+    parent = new_parent_array(grid)
+    exploration_order = trace if trace is not None else []
     
     # Initialize with start node
     current_level = [start]
-    visited[start.first][start.second] = True
-    exploration_order.append([start.first, start.second])
+    visited[start] = 1
+    exploration_order.append(start)
     
     while current_level:
         # Generate all neighbors for current level
         all_neighbors = []
         
         for current in current_level:
-            neighbors = get_neighbors(current, blocks, size, directions, dx, dy)
-            for neighbor in neighbors:
-                if not visited[neighbor.first][neighbor.second]:
-                    visited[neighbor.first][neighbor.second] = True
-                    parent[neighbor.first][neighbor.second] = current
-                    exploration_order.append([neighbor.first, neighbor.second])
+            for offset in offsets:
+                neighbor = current + offset
+                if not visited[neighbor] and not blocked[neighbor]:
+                    visited[neighbor] = 1
+                    parent[neighbor] = current
+                    exploration_order.append(neighbor)
                     all_neighbors.append(neighbor)
                     
                     # Check if we found the goal
-                    if neighbor.first == end.first and neighbor.second == end.second:
+                    if neighbor == end:
                         # Reconstruct path
-                        path = []
-                        current = end
-                        while current.first != -1:
-                            path.insert(0, current)
-                            current = parent[current.first][current.second]
+                        path = reconstruct_path(parent, end)
                         
                         # Calculate metrics
-                        explored_size = sum(sum(row) for row in visited)
+                        explored_size = visited.count(1)
                         frontier_size = len(all_neighbors)
-                        time_taken_ms = (time.time() - start_time) * 1000
+                        time_taken_ms = elapsed_ms(start_time)
                         path_length = len(path) - 1  # Subtract 1 to not count the start node
                         
                         return {
@@ -124,7 +123,7 @@ def local_beam_search(start: Pair, end: Pair, blocks: List[List[bool]], size: in
         # Score all neighbors using the specified heuristic
         scored_neighbors = []
         for neighbor in all_neighbors:
-            score = heuristic(neighbor, end)
+            score = heuristic(neighbor)
             scored_neighbors.append((score, neighbor))
         
         # Sort by score and take top beam_width neighbors
@@ -132,9 +131,9 @@ def local_beam_search(start: Pair, end: Pair, blocks: List[List[bool]], size: in
         current_level = [neighbor for _, neighbor in scored_neighbors[:beam_width]]
     
     # Calculate metrics for no path found
-    explored_size = sum(sum(row) for row in visited)
+    explored_size = visited.count(1)
     frontier_size = len(current_level)
-    time_taken_ms = (time.time() - start_time) * 1000
+    time_taken_ms = elapsed_ms(start_time)
     
     return {
         "path": None,
@@ -145,4 +144,4 @@ def local_beam_search(start: Pair, end: Pair, blocks: List[List[bool]], size: in
             "time_taken_ms": time_taken_ms,
             "path_length": 0
         }
-    } 
\ No newline at end of file
+    }
@@ -1,253 +1,462 @@
 import random
 import math
+import secrets
 from typing import List, Dict, Any, Optional, Tuple
-from utils import Pair
+from grid import Grid
 import time
+from instrumentation import elapsed_ms
 
-class Node:
-    """A node in the RRT tree representing a position in the maze.
-    
-    Attributes:
-        x (int): The x-coordinate of the node
-        y (int): The y-coordinate of the node
-        parent (Optional[Node]): The parent node in the RRT tree, None if root node
+# Step directions in the order steer() prefers them on ties
+DIRECTIONS_4 = ((1, 0), (0, 1), (-1, 0), (0, -1))
+DIRECTIONS_8 = ((1, 0), (1, 1), (0, 1), (-1, 1), (-1, 0), (-1, -1), (0, -1), (1, -1))
+
+class Tree:
+    """A tree of positions in the maze grown by the RRT planners.
+
+    Nodes are stored in parallel lists: node i sits at (xs[i], ys[i]), parents[i] is the
+    index of its parent (-1 for the root) and costs[i] the length of the tree path from
+    the root. Every node is also filed in a square bucket of side bucket_size, so that
+    nearest() and near() only look at the buckets around the query point instead of
+    scanning the whole tree.
+
+    Args:
+        x (int): x-coordinate of the root
+        y (int): y-coordinate of the root
+        bucket_size (int): Side of the spatial buckets, in cells
+    """
+    def __init__(self, x: int, y: int, bucket_size: int):
+        self.bucket_size = bucket_size
+        self.xs: List[int] = []
+        self.ys: List[int] = []
+        self.parents: List[int] = []
+        self.costs: List[float] = []
+        self.children: List[List[int]] = []
+        self._buckets: Dict[Tuple[int, int], List[int]] = {}
+        self._extent = 0
+        self.add(x, y, -1, 0.0)
+
+    def __len__(self) -> int:
+        return len(self.xs)
+
+    def add(self, x: int, y: int, parent: int, cost: float) -> int:
+        """Adds a node and returns its index."""
+        node = len(self.xs)
+        self.xs.append(x)
+        self.ys.append(y)
+        self.parents.append(parent)
+        self.costs.append(cost)
+        self.children.append([])
+        if parent != -1:
+            self.children[parent].append(node)
+        b = self.bucket_size
+        key = (x // b, y // b)
+        self._buckets.setdefault(key, []).append(node)
+        self._extent = max(self._extent, abs(key[0]), abs(key[1]))
+        return node
+
+    def nearest(self, x: float, y: float) -> int:
+        """Returns the node closest to (x, y); ties go to the node added first."""
+        b = self.bucket_size
+        bx, by = int(x) // b, int(y) // b
+        xs, ys, buckets = self.xs, self.ys, self._buckets
+        best, best_d2 = -1, float('inf')
+        ring = 0
+        # Rings beyond this one cannot hold nodes
+        last_ring = self._extent + max(abs(bx), abs(by)) + 1
+        while ring <= last_ring:
+            for key in _ring(bx, by, ring):
+                for node in buckets.get(key, ()):
+                    d2 = (xs[node] - x) ** 2 + (ys[node] - y) ** 2
+                    if d2 < best_d2 or (d2 == best_d2 and node < best):
+                        best, best_d2 = node, d2
+            # Every node in the next ring is more than ring * b away
+            if best != -1 and best_d2 <= (ring * b) ** 2:
+                break
+            ring += 1
+        return best
+
+    def near(self, x: float, y: float, radius: float) -> List[int]:
+        """Returns the nodes within radius of (x, y), in the order they were added."""
+        b = self.bucket_size
+        bx, by = int(x) // b, int(y) // b
+        reach = int(radius // b) + 1
+        xs, ys, buckets = self.xs, self.ys, self._buckets
+        r2 = radius * radius
+        found = []
+        for i in range(bx - reach, bx + reach + 1):
+            for j in range(by - reach, by + reach + 1):
+                for node in buckets.get((i, j), ()):
+                    if (xs[node] - x) ** 2 + (ys[node] - y) ** 2 <= r2:
+                        found.append(node)
+        found.sort()
+        return found
+
+    def reparent(self, node: int, parent: int, cost: float) -> None:
+        """Moves a node under a new parent and updates the costs of its subtree."""
+        self.children[self.parents[node]].remove(node)
+        self.parents[node] = parent
+        self.children[parent].append(node)
+        delta = cost - self.costs[node]
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            self.costs[current] += delta
+            stack.extend(self.children[current])
+
+    def path_to(self, node: int) -> List[Tuple[int, int]]:
+        """Returns the positions from the root to node."""
+        path = []
+        while node != -1:
+            path.append((self.xs[node], self.ys[node]))
+            node = self.parents[node]
+        path.reverse()
+        return path
+
+def _ring(bx: int, by: int, ring: int):
+    """Yields the bucket keys at Chebyshev distance ring from (bx, by)."""
+    if ring == 0:
+        yield bx, by
+        return
+    for i in range(bx - ring, bx + ring + 1):
+        yield i, by - ring
+        yield i, by + ring
+    for j in range(by - ring + 1, by + ring):
+        yield bx - ring, j
+        yield bx + ring, j
+
+class Workspace:
+    """Collision checking and steering shared by the RRT planners.
+
+    The unit vector and the step of every allowed direction are computed once, so
+    steering picks the direction closest to the target with a few dot products.
+
+    Args:
+        grid (Grid): Flattened maze (blocked cells and optional weights)
+        directions (int): Number of possible movement directions (4 or 8)
+        step_size (float): Maximum distance to move in one step
     """
-    def __init__(self, x: int, y: int, parent: Optional['Node'] = None):
-        self.x = x
-        self.y = y
-        self.parent = parent
+    def __init__(self, grid: Grid, directions: int, step_size: float):
+        self.grid = grid
+        self.size = grid.size
+        self.width = grid.width
+        self.blocked = grid.blocked
+        self.directions = directions
+        self.step_size = step_size
+        self.moves = []
+        for dir_x, dir_y in (DIRECTIONS_8 if directions == 8 else DIRECTIONS_4):
+            dir_len = math.sqrt(dir_x * dir_x + dir_y * dir_y)
+            unit_x, unit_y = dir_x / dir_len, dir_y / dir_len
+            self.moves.append((unit_x, unit_y, step_size * unit_x, step_size * unit_y))
+
+    def is_safe(self, x: int, y: int) -> bool:
+        return 0 <= x < self.size and 0 <= y < self.size and not self.blocked[(x + 1) * self.width + y + 1]
+
+    def steer(self, from_x: int, from_y: int, to_x: float, to_y: float) -> Tuple[int, int]:
+        """Returns the position one step from (from_x, from_y) towards (to_x, to_y)."""
+        dx = to_x - from_x
+        dy = to_y - from_y
+        dist2 = dx * dx + dy * dy
+        if dist2 <= self.step_size * self.step_size:
+            return int(to_x), int(to_y)
+
+        # The smallest angle to the target is the largest dot product with its direction
+        best = None
+        best_dot = -float('inf')
+        for move in self.moves:
+            dot = dx * move[0] + dy * move[1]
+            if dot > best_dot:
+                best_dot = dot
+                best = move
+        return int(round(from_x + best[2])), int(round(from_y + best[3]))
+
+    def is_path_free(self, x1: int, y1: int, x2: int, y2: int) -> bool:
+        """Checks that the straight segment between two positions only crosses open cells."""
+        is_safe = self.is_safe
+        if not is_safe(x1, y1) or not is_safe(x2, y2):
+            return False
+
+        dx = x2 - x1
+        dy = y2 - y1
+        steps = max(abs(dx), abs(dy))
+        if dx != 0 and dy != 0:
+            for i in range(1, steps + 1):
+                t = i / steps
+                check_x = int(round(x1 + t * dx))
+                check_y = int(round(y1 + t * dy))
+                if not is_safe(check_x, check_y):
+                    return False
+                # For diagonal moves, also check the orthogonal neighbors to avoid corner cutting
+                if self.directions == 8 and i < steps:
+                    if not is_safe(check_x, y1) or not is_safe(x1, check_y):
+                        return False
+        else:
+            for i in range(1, steps):
+                t = i / steps
+                if not is_safe(int(round(x1 + t * dx)), int(round(y1 + t * dy))):
+                    return False
+        return True
+
+    def can_connect(self, x1: int, y1: int, x2: int, y2: int) -> bool:
+        """Checks that two tree nodes may be joined by an edge (used when rewiring)."""
+        if self.directions == 4 and x1 != x2 and y1 != y2:
+            return False
+        return self.is_path_free(x1, y1, x2, y2)
+
+    def sample(self, rng: random.Random, goal: Tuple[int, int], goal_sample_rate: float) -> Tuple[int, int]:
+        """Draws a random position, or the goal with probability goal_sample_rate."""
+        if rng.random() < goal_sample_rate:
+            return goal
+        return rng.randint(0, self.size - 1), rng.randint(0, self.size - 1)
+
+    def extend(self, tree: Tree, x: float, y: float) -> int:
+        """Grows tree one step from its nearest node towards (x, y); returns the new node or -1."""
+        nearest = tree.nearest(x, y)
+        from_x, from_y = tree.xs[nearest], tree.ys[nearest]
+        new_x, new_y = self.steer(from_x, from_y, x, y)
+        if (new_x == from_x and new_y == from_y) or not self.is_path_free(from_x, from_y, new_x, new_y):
+            return -1
+        return tree.add(new_x, new_y, nearest, tree.costs[nearest] + math.hypot(new_x - from_x, new_y - from_y))
+
+def _bucket_size(step_size: float) -> int:
+    return max(4, int(math.ceil(2 * step_size)))
+
+def _new_rng(seed: Optional[int]) -> Tuple[random.Random, int]:
+    """Returns a private random generator, drawing a seed when none is given so that runs can be replayed."""
+    if seed is None:
+        seed = secrets.randbits(32)
+    return random.Random(seed), seed
+
+def _result(grid: Grid, positions: Optional[List[Tuple[int, int]]], exploration_order: List[int], explored_size: int,
+            iterations: int, seed: int, start_time: int) -> Dict[str, Any]:
+    path = [grid.cell(x, y) for x, y in positions] if positions is not None else None
+    path_cost = 0.0
+    if positions is not None:
+        path_cost = sum(math.hypot(b[0] - a[0], b[1] - a[1]) for a, b in zip(positions, positions[1:]))
+    return {
+        "path": path,
+        "exploration_order": exploration_order,
+        "metrics": {
+            "explored_size": explored_size,
+            "frontier_size": 0,  # RRT doesn't maintain a frontier
+            "time_taken_ms": elapsed_ms(start_time),
+            "path_length": len(path) if path is not None else 0,
+            "path_cost": path_cost,
+            "iterations": iterations,
+            "seed": seed
+        }
+    }
 
 def rrt(
-    start: Pair,
-    end: Pair,
-    blocks: List[List[bool]],
-    size: int,
+    start: int,
+    end: int,
+    grid: Grid,
     directions: int,
-    dx: List[int],
-    dy: List[int],
     step_size: float = 1.0,
     max_iterations: int = 1000,
-    goal_sample_rate: float = 0.1
+    goal_sample_rate: float = 0.1,
+    seed: Optional[int] = None,
+    trace: Optional[List[int]] = None
 ) -> Dict[str, Any]:
     """Implements the Rapidly-exploring Random Tree (RRT) algorithm for path planning.
-    
+
     This algorithm builds a tree of possible paths by randomly sampling points in the space
     and connecting them to the nearest existing node in the tree. It's particularly effective
-    for path planning in continuous spaces with obstacles.
-    
+    for path planning in continuous spaces with obstacles. Nearest nodes are found through
+    the spatial buckets of the tree, and random numbers come from a generator private to
+    the call, so a run is reproducible from its seed.
+
     Args:
-        start (Pair): Starting position coordinates (x, y)
-        end (Pair): Goal position coordinates (x, y)
-        blocks (List[List[bool]]): 2D grid representing obstacles (True for blocked cells)
-        size (int): Size of the grid (assuming square grid)
+        start (int): Starting cell id
+        end (int): Goal cell id
+        grid (Grid): Flattened maze (blocked cells and optional weights)
         directions (int): Number of possible movement directions (4 or 8)
-        dx (List[int]): List of x-direction movements
-        dy (List[int]): List of y-direction movements
         step_size (float, optional): Maximum distance to move in one step. Defaults to 1.0
         max_iterations (int, optional): Maximum number of iterations to attempt. Defaults to 1000
         goal_sample_rate (float, optional): Probability of sampling the goal position. Defaults to 0.1
-    
+        seed (int, optional): Seed of the random generator. Defaults to None (a fresh seed, reported in the metrics)
+        trace (List[int], optional): List that receives the explored cell ids. Defaults to None
+
     Returns:
         Dict[str, Any]: A dictionary containing:
-            - path: List of Pair objects representing the found path
-            - exploration_order: List of coordinates showing the order of exploration
+            - path: List of cell ids representing the found path
+            - exploration_order: List of cell ids showing the order of exploration
             - metrics: Dictionary containing performance metrics:
                 - explored_size: Number of nodes explored
                 - frontier_size: Size of the frontier (always 0 for RRT)
                 - time_taken_ms: Time taken to find the path in milliseconds
                 - path_length: Length of the found path
+                - path_cost: Euclidean length of the found path
+                - iterations: Number of samples drawn
+                - seed: Seed of the random generator
     """
-    start_time = time.time()
-    exploration_order = []
-    metrics = {
-        "explored_size": 0,
-        "frontier_size": 0,
-        "time_taken_ms": 0,
-        "path_length": 0
-    }
+    start_time = time.perf_counter_ns()
+    exploration_order = trace if trace is not None else []
+    rng, seed = _new_rng(seed)
+    space = Workspace(grid, directions, step_size)
+    start_x, start_y = grid.coords(start)
+    goal = grid.coords(end)
+    tree = Tree(start_x, start_y, _bucket_size(step_size))
+    step2 = step_size * step_size
 
-    # Initialize the tree with the start node
-    start_node = Node(start.first, start.second)
-    nodes = [start_node]
-    
-    def is_safe(x: int, y: int) -> bool:
-        return 0 <= x < size and 0 <= y < size and not blocks[x][y]
-
-    def get_distance(node1: Node, node2: Node) -> float:
-        return math.sqrt((node1.x - node2.x) ** 2 + (node1.y - node2.y) ** 2)
-
-    def get_nearest_node(x: float, y: float) -> Node:
-        min_dist = float('inf')
-        nearest = None
-        for node in nodes:
-            dist = math.sqrt((node.x - x) ** 2 + (node.y - y) ** 2)
-            if dist < min_dist:
-                min_dist = dist
-                nearest = node
-        return nearest
-
-    def get_valid_directions() -> List[Tuple[int, int]]:
-        if directions == 8:
-            # 8 directions: horizontal, vertical, and diagonal
-            return [
-                (1, 0), (1, 1), (0, 1), (-1, 1),
-                (-1, 0), (-1, -1), (0, -1), (1, -1)
-            ]
-        else:
-            # 4 directions: horizontal and vertical only
-            return [(1, 0), (0, 1), (-1, 0), (0, -1)]
-
-    def steer(from_node: Node, to_x: float, to_y: float) -> Tuple[int, int]:
-        # Calculate the direction vector
-        dx = to_x - from_node.x
-        dy = to_y - from_node.y
-        dist = math.sqrt(dx * dx + dy * dy)
-        
-        if dist <= step_size:
-            return int(to_x), int(to_y)
-        
-        # Get valid directions
-        valid_dirs = get_valid_directions()
-        
-        # Find the best direction
-        best_dir = None
-        min_angle_diff = float('inf')
-        
-        # Normalize the target direction vector
-        if dist > 0:
-            nx, ny = dx / dist, dy / dist
-        else:
-            return from_node.x, from_node.y
-        
-        for dir_x, dir_y in valid_dirs:
-            # Calculate the normalized direction vector
-            dir_len = math.sqrt(dir_x**2 + dir_y**2)
-            dir_nx, dir_ny = dir_x / dir_len, dir_y / dir_len
-            
-            # Calculate the dot product to find the cosine of the angle
-            dot_product = nx * dir_nx + ny * dir_ny
-            
-            # Calculate the angle difference (in radians)
-            angle_diff = math.acos(max(-1.0, min(1.0, dot_product)))
-            
-            if angle_diff < min_angle_diff:
-                min_angle_diff = angle_diff
-                best_dir = (dir_x, dir_y)
-        
-        if best_dir:
-            dir_x, dir_y = best_dir
-            # Normalize the step size based on direction
-            dir_len = math.sqrt(dir_x**2 + dir_y**2)
-            move_x = step_size * dir_x / dir_len
-            move_y = step_size * dir_y / dir_len
-            
-            return int(round(from_node.x + move_x)), int(round(from_node.y + move_y))
-        
-        return from_node.x, from_node.y
-
-    def is_path_free(node1: Node, x: int, y: int) -> bool:
-        # Check if the path between node1 and (x,y) is free of obstacles
-        x1, y1 = node1.x, node1.y
-        x2, y2 = x, y
-        
-        # Get the direction vector
-        dx = x2 - x1
-        dy = y2 - y1
-        
-        # Determine if this is a diagonal move
-        is_diagonal = dx != 0 and dy != 0
-        
-        # Check if start and end points are valid
-        if not is_safe(x1, y1) or not is_safe(x2, y2):
-            return False
-        
-        # For diagonal movement, check the direct path
-        if is_diagonal:
-            # Calculate the number of steps to check along the path
-            steps = max(abs(dx), abs(dy))
-            
-            # Check points along the path
-            for i in range(1, steps + 1):
-                t = i / steps
-                check_x = int(round(x1 + t * dx))
-                check_y = int(round(y1 + t * dy))
-                
-                if not is_safe(check_x, check_y):
-                    return False
-                
-                # For diagonal moves, also check the orthogonal neighbors to avoid corner cutting
-                if directions == 8:
-                    # Check if the movement is diagonal
-                    if i < steps:  # Skip the final point as it's already checked
-                        # Check orthogonal neighbors to prevent corner cutting
-                        if not is_safe(check_x, y1) or not is_safe(x1, check_y):
-                            return False
-        else:
-            # For orthogonal movement, check a straight line
-            steps = max(abs(dx), abs(dy))
-            for i in range(1, steps):
-                t = i / steps
-                check_x = int(round(x1 + t * dx))
-                check_y = int(round(y1 + t * dy))
-                
-                if not is_safe(check_x, check_y):
-                    return False
-                    
-        return True
+    for i in range(max_iterations):
+        sample_x, sample_y = space.sample(rng, goal, goal_sample_rate)
+        node = space.extend(tree, sample_x, sample_y)
+        if node == -1:
+            continue
+        new_x, new_y = tree.xs[node], tree.ys[node]
+        exploration_order.append(grid.cell(new_x, new_y))
+
+        # Check if we reached the goal
+        if (new_x - goal[0]) ** 2 + (new_y - goal[1]) ** 2 <= step2:
+            return _result(grid, tree.path_to(node), exploration_order, len(tree), i + 1, seed, start_time)
+
+    return _result(grid, None, exploration_order, len(tree), max_iterations, seed, start_time)
+
+def rrt_star(
+    start: int,
+    end: int,
+    grid: Grid,
+    directions: int,
+    step_size: float = 1.0,
+    max_iterations: int = 1000,
+    goal_sample_rate: float = 0.1,
+    seed: Optional[int] = None,
+    radius: Optional[float] = None,
+    trace: Optional[List[int]] = None
+) -> Dict[str, Any]:
+    """Implements RRT*, the asymptotically optimal variant of RRT.
+
+    Every new node is attached to the neighbor within radius that gives it the shortest
+    path from the start, and neighbors that become cheaper through the new node are
+    rewired under it. Instead of stopping at the first solution, the tree keeps improving
+    for all max_iterations, and the cheapest node that reached the goal is returned.
+
+    Args:
+        start (int): Starting cell id
+        end (int): Goal cell id
+        grid (Grid): Flattened maze (blocked cells and optional weights)
+        directions (int): Number of possible movement directions (4 or 8)
+        step_size (float, optional): Maximum distance to move in one step. Defaults to 1.0
+        max_iterations (int, optional): Number of iterations to run. Defaults to 1000
+        goal_sample_rate (float, optional): Probability of sampling the goal position. Defaults to 0.1
+        seed (int, optional): Seed of the random generator. Defaults to None (a fresh seed, reported in the metrics)
+        radius (float, optional): Rewiring radius. Defaults to 1.5 * max(step_size, 1)
+        trace (List[int], optional): List that receives the explored cell ids. Defaults to None
+
+    Returns:
+        Dict[str, Any]: Same structure as rrt
+    """
+    start_time = time.perf_counter_ns()
+    exploration_order = trace if trace is not None else []
+    rng, seed = _new_rng(seed)
+    space = Workspace(grid, directions, step_size)
+    if radius is None:
+        radius = 1.5 * max(step_size, 1.0)
+    start_x, start_y = grid.coords(start)
+    goal = grid.coords(end)
+    tree = Tree(start_x, start_y, _bucket_size(max(step_size, radius)))
+    xs, ys, costs = tree.xs, tree.ys, tree.costs
+    step2 = step_size * step_size
+    best_goal = -1
 
     for i in range(max_iterations):
-        # Random sampling
-        if random.random() < goal_sample_rate:
-            sample_x, sample_y = end.first, end.second
-        else:
-            sample_x = random.randint(0, size - 1)
-            sample_y = random.randint(0, size - 1)
-
-        # Find nearest node
-        nearest_node = get_nearest_node(sample_x, sample_y)
-        
-        # Steer towards the sample
-        new_x, new_y = steer(nearest_node, sample_x, sample_y)
-        
-        # Check if the new position is different from the nearest node
-        if new_x == nearest_node.x and new_y == nearest_node.y:
+        sample_x, sample_y = space.sample(rng, goal, goal_sample_rate)
+        nearest = tree.nearest(sample_x, sample_y)
+        new_x, new_y = space.steer(xs[nearest], ys[nearest], sample_x, sample_y)
+        if (new_x == xs[nearest] and new_y == ys[nearest]) or \
+                not space.is_path_free(xs[nearest], ys[nearest], new_x, new_y):
             continue
-        
-        # Check if path is free
-        if is_path_free(nearest_node, new_x, new_y):
-            new_node = Node(new_x, new_y, nearest_node)
-            nodes.append(new_node)
-            exploration_order.append([new_node.x, new_node.y])
-            
-            # Check if we reached the goal
-            if get_distance(new_node, Node(end.first, end.second)) <= step_size:
-                # Reconstruct path
-                path = []
-                current = new_node
-                while current is not None:
-                    path.append(Pair(current.x, current.y))
-                    current = current.parent
-                path.reverse()
-                
-                metrics["explored_size"] = len(nodes)
-                metrics["frontier_size"] = 0  # RRT doesn't maintain a frontier
-                metrics["time_taken_ms"] = (time.time() - start_time) * 1000
-                metrics["path_length"] = len(path)
-                
-                return {
-                    "path": path,
-                    "exploration_order": exploration_order,
-                    "metrics": metrics
-                }
-
-    # If no path found
-    metrics["explored_size"] = len(nodes)
-    metrics["frontier_size"] = 0
-    metrics["time_taken_ms"] = (time.time() - start_time) * 1000
-    metrics["path_length"] = 0
-    
-    return {
-        "path": None,
-        "exploration_order": exploration_order,
-        "metrics": metrics
-    }
\ No newline at end of file
+
+        # Choose the cheapest parent among the neighbors
+        neighbors = tree.near(new_x, new_y, radius)
+        parent = nearest
+        cost = costs[nearest] + math.hypot(new_x - xs[nearest], new_y - ys[nearest])
+        for neighbor in neighbors:
+            candidate = costs[neighbor] + math.hypot(new_x - xs[neighbor], new_y - ys[neighbor])
+            if candidate < cost and space.can_connect(xs[neighbor], ys[neighbor], new_x, new_y):
+                parent, cost = neighbor, candidate
+        node = tree.add(new_x, new_y, parent, cost)
+        exploration_order.append(grid.cell(new_x, new_y))
+
+        # Rewire neighbors that are cheaper to reach through the new node
+        for neighbor in neighbors:
+            if neighbor == parent:
+                continue
+            candidate = cost + math.hypot(new_x - xs[neighbor], new_y - ys[neighbor])
+            if candidate < costs[neighbor] and space.can_connect(new_x, new_y, xs[neighbor], ys[neighbor]):
+                tree.reparent(neighbor, node, candidate)
+
+        if (new_x - goal[0]) ** 2 + (new_y - goal[1]) ** 2 <= step2 and \
+                (best_goal == -1 or cost < costs[best_goal]):
+            best_goal = node
+
+    positions = tree.path_to(best_goal) if best_goal != -1 else None
+    return _result(grid, positions, exploration_order, len(tree), max_iterations, seed, start_time)
+
+def rrt_connect(
+    start: int,
+    end: int,
+    grid: Grid,
+    directions: int,
+    step_size: float = 1.0,
+    max_iterations: int = 1000,
+    seed: Optional[int] = None,
+    trace: Optional[List[int]] = None
+) -> Dict[str, Any]:
+    """Implements RRT-Connect, which grows one tree from the start and one from the goal.
+
+    Every iteration extends one tree a single step towards a random sample, then
+    greedily extends the other tree towards the new node until it is reached or
+    blocked. The trees swap roles after every iteration, and the search ends as soon
+    as they meet.
+
+    Args:
+        start (int): Starting cell id
+        end (int): Goal cell id
+        grid (Grid): Flattened maze (blocked cells and optional weights)
+        directions (int): Number of possible movement directions (4 or 8)
+        step_size (float, optional): Maximum distance to move in one step. Defaults to 1.0
+        max_iterations (int, optional): Maximum number of iterations to attempt. Defaults to 1000
+        seed (int, optional): Seed of the random generator. Defaults to None (a fresh seed, reported in the metrics)
+        trace (List[int], optional): List that receives the explored cell ids. Defaults to None
+
+    Returns:
+        Dict[str, Any]: Same structure as rrt
+    """
+    start_time = time.perf_counter_ns()
+    exploration_order = trace if trace is not None else []
+    rng, seed = _new_rng(seed)
+    space = Workspace(grid, directions, step_size)
+    bucket_size = _bucket_size(step_size)
+    start_tree = Tree(*grid.coords(start), bucket_size)
+    goal_tree = Tree(*grid.coords(end), bucket_size)
+    # Connecting moves at least about one cell closer per step
+    max_connect_steps = 2 * grid.size + 2
+
+    if start == end:
+        return _result(grid, start_tree.path_to(0), exploration_order, 1, 0, seed, start_time)
+
+    trees = (start_tree, goal_tree)
+    for i in range(max_iterations):
+        growing, other = trees[i % 2], trees[1 - i % 2]
+        sample_x, sample_y = space.sample(rng, (0, 0), 0.0)
+        node = space.extend(growing, sample_x, sample_y)
+        if node == -1:
+            continue
+        target_x, target_y = growing.xs[node], growing.ys[node]
+        exploration_order.append(grid.cell(target_x, target_y))
+
+        for _ in range(max_connect_steps):
+            reached = space.extend(other, target_x, target_y)
+            if reached == -1:
+                break
+            exploration_order.append(grid.cell(other.xs[reached], other.ys[reached]))
+            if other.xs[reached] == target_x and other.ys[reached] == target_y:
+                ends = {id(growing): node, id(other): reached}
+                from_start = start_tree.path_to(ends[id(start_tree)])
+                to_goal = goal_tree.path_to(ends[id(goal_tree)])
+                positions = from_start + to_goal[::-1][1:]
+                return _result(grid, positions, exploration_order, len(start_tree) + len(goal_tree), i + 1,
+                               seed, start_time)
+
+    return _result(grid, None, exploration_order, len(start_tree) + len(goal_tree), max_iterations, seed, start_time)
@@ -1,30 +1,30 @@
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Union
 import time
-from queue import PriorityQueue
-from utils import Pair, make_2d_array, get_neighbors, PriorityQueueItem
+from frontier import IndexedHeap, BucketQueue, make_frontier
+from grid import Grid, reconstruct_path, new_parent_array
+from instrumentation import elapsed_ms
 
-def ucs(start: Pair, end: Pair, blocks: List[List[bool]], size: int, directions: int, dx: List[int], dy: List[int], weights: List[List[int]] = None, is_weighted: bool = False) -> Dict[str, Any]:
+def ucs(start: int, end: int, grid: Grid, directions: int, frontier: str = "heap",
+        trace: Optional[List[int]] = None) -> Dict[str, Any]:
     """Implements Uniform Cost Search (UCS) algorithm for pathfinding.
     
     UCS is a graph search algorithm that finds the path with minimum total cost from start to goal.
     It expands the least-cost unexpanded node first, making it optimal for finding the minimum-cost path.
-    When is_weighted is True, it uses the provided weights to find the path with minimum total cost.
+    When the grid carries weights, they are used to find the path with minimum total cost.
     
     Args:
-        start (Pair): Starting position coordinates (x, y)
-        end (Pair): Goal position coordinates (x, y)
-        blocks (List[List[bool]]): 2D grid representing obstacles (True for blocked cells)
-        size (int): Size of the grid (assuming square grid)
+        start (int): Starting cell id
+        end (int): Goal cell id
+        grid (Grid): Flattened maze (blocked cells and optional weights)
         directions (int): Number of possible movement directions (4 or 8)
-        dx (List[int]): List of x-direction movements
-        dy (List[int]): List of y-direction movements
-        weights (List[List[int]], optional): 2D grid of cell weights. Defaults to None.
-        is_weighted (bool, optional): Whether to use weights. Defaults to False.
+        frontier (str, optional): "heap" (binary heap) or "bucket" (Dial's bucket queue: O(1) push and pop
+            on integer weights). Defaults to "heap".
+        trace (List[int], optional): List that receives the explored cell ids. Defaults to None
     
     Returns:
         Dict[str, Any]: A dictionary containing:
-            - path: List of Pair objects representing the found path, or None if no path exists
-            - exploration_order: List of coordinates showing the order of exploration
+            - path: List of cell ids representing the found path, or None if no path exists
+            - exploration_order: List of cell ids showing the order of exploration
             - metrics: Dictionary containing performance metrics:
                 - explored_size: Number of nodes explored
                 - frontier_size: Size of the frontier (priority queue)
@@ -32,108 +32,82 @@ def ucs(start: Pair, end: Pair, blocks: List[List[bool]], size: int, directions:
                 - path_length: Length of the found path (0 if no path found)
                 - total_cost: Total cost of the path (sum of weights)
     """
+    start_time = time.perf_counter_ns()
+
     # Special case: if start and end are the same
-    if start.first == end.first and start.second == end.second:
+    if start == end:
         return {
             "path": [start],
-            "exploration_order": [[start.first, start.second]],
+            "exploration_order": [start],
             "metrics": {
                 "explored_size": 1,
                 "frontier_size": 0,
-                "time_taken_ms": 0,
+                "time_taken_ms": elapsed_ms(start_time),
                 "path_length": 0,
                 "total_cost": 0
             }
         }
     
-    start_time = time.time()
-    visited = make_2d_array(size, False)
-    parent = make_2d_array(size, Pair(-1, -1))
-    cost = make_2d_array(size, float('inf'))
-    pq = PriorityQueue()
-    pq.put(PriorityQueueItem(0, start))
-    cost[start.first][start.second] = 0
-    exploration_order = []
-    
-    # Mark start as in frontier
-    in_frontier = make_2d_array(size, False)
-    in_frontier[start.first][start.second] = True
+    blocked = grid.blocked
+    weights = grid.weights
+    offsets = grid.offsets(directions)
+    visited = bytearray(len(blocked))
+    parent = new_parent_array(grid)
+    cost = [float('inf')] * len(blocked)
+    pq = make_frontier(frontier, len(blocked))
+    pq.push(start, 0)
+    cost[start] = 0
+    exploration_order = trace if trace is not None else []
     
-    while not pq.empty():
-        current = pq.get().item
-        in_frontier[current.first][current.second] = False
-        
-        # Skip if we've already visited this node (can happen due to multiple entries in PQ)
-        if visited[current.first][current.second]:
-            continue
+    while pq:
+        # Each cell is queued at most once, so popped cells are never stale
+        current = pq.pop()
+        visited[current] = 1
+        exploration_order.append(current)
         
-        visited[current.first][current.second] = True
-        exploration_order.append([current.first, current.second])
-        
-        if current.first == end.first and current.second == end.second:
+        if current == end:
             # Goal reached - reconstruct path and return results
             path = reconstruct_path(parent, end)
-            return create_result(path, exploration_order, visited, pq, start_time, cost[end.first][end.second])
+            return create_result(path, exploration_order, visited, pq, start_time, cost[end])
         
-        neighbors = get_neighbors(current, blocks, size, directions, dx, dy)
-        for neighbor in neighbors:
-            if not visited[neighbor.first][neighbor.second]:
+        for offset in offsets:
+            neighbor = current + offset
+            if not visited[neighbor] and not blocked[neighbor]:
                 # Calculate new cost
-                step_cost = weights[neighbor.first][neighbor.second] if is_weighted and weights else 1
-                new_cost = cost[current.first][current.second] + step_cost
+                step_cost = weights[neighbor] if weights is not None else 1
+                new_cost = cost[current] + step_cost
                 
                 # Update if we found a better path
-                if new_cost < cost[neighbor.first][neighbor.second]:
-                    cost[neighbor.first][neighbor.second] = new_cost
-                    parent[neighbor.first][neighbor.second] = current
+                if new_cost < cost[neighbor]:
+                    cost[neighbor] = new_cost
+                    parent[neighbor] = current
                     
-                    # Add to frontier if not already there
-                    if not in_frontier[neighbor.first][neighbor.second]:
-                        pq.put(PriorityQueueItem(new_cost, neighbor))
-                        in_frontier[neighbor.first][neighbor.second] = True
+                    # Add to frontier, or lower its key if already there
+                    pq.push(neighbor, new_cost)
     
     # No path found
     return create_result(None, exploration_order, visited, pq, start_time, 0)
 
-def reconstruct_path(parent: List[List[Pair]], end: Pair) -> List[Pair]:
-    """Reconstructs the path from start to end using the parent matrix.
-    
-    Args:
-        parent (List[List[Pair]]): 2D grid of parent pointers
-        end (Pair): Goal position coordinates (x, y)
-    
-    Returns:
-        List[Pair]: List of coordinates representing the path from start to end
-    """
-    path = []
-    current = end
-    
-    while current.first != -1:
-        path.insert(0, current)
-        current = parent[current.first][current.second]
-        
-    return path
-
-def create_result(path: List[Pair], exploration_order: List[List[int]], 
-                 visited: List[List[bool]], pq: PriorityQueue, 
-                 start_time: float, total_cost: float) -> Dict[str, Any]:
+def create_result(path: List[int], exploration_order: List[int],
+                 visited: bytearray, pq: Union[IndexedHeap, BucketQueue],
+                 start_time: int, total_cost: float) -> Dict[str, Any]:
     """Creates the standardized result dictionary.
     
     Args:
-        path (List[Pair]): The found path, or None if no path exists
-        exploration_order (List[List[int]]): Order of node exploration
-        visited (List[List[bool]]): 2D grid of visited flags
-        pq (PriorityQueue): Current frontier queue
-        start_time (float): Time when search started
+        path (List[int]): The found path as cell ids, or None if no path exists
+        exploration_order (List[int]): Order of node exploration
+        visited (bytearray): Flat array of visited flags
+        pq (Union[IndexedHeap, BucketQueue]): Current frontier queue
+        start_time (int): time.perf_counter_ns() reading taken when the search started
         total_cost (float): Total path cost
     
     Returns:
         Dict[str, Any]: Standardized result dictionary
     """
     # Calculate metrics
-    explored_size = sum(sum(row) for row in visited)
-    frontier_size = pq.qsize()
-    time_taken_ms = (time.time() - start_time) * 1000
+    explored_size = visited.count(1)
+    frontier_size = len(pq)
+    time_taken_ms = elapsed_ms(start_time)
     path_length = len(path) - 1 if path else 0  # Subtract 1 to not count the start node
     
     return {
@@ -142,8 +116,9 @@ def create_result(path: List[Pair], exploration_order: List[List[int]],
         "metrics": {
             "explored_size": explored_size,
             "frontier_size": frontier_size,
+            "counters": pq.counters(),
             "time_taken_ms": time_taken_ms,
             "path_length": path_length,
             "total_cost": total_cost
         }
-    }
\ No newline at end of file
+    }
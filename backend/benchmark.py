@@ -0,0 +1,268 @@
+"""Benchmark of the registered solvers on the maze corpus.
+
+Runs every algorithm of the server (or a subset) on the mazes of maze_corpus
+and records, per maze and algorithm: wall time, the solver's own time,
+expansions, peak memory, and how the cost of the path compares with the optimal
+cost (from BFS, or Dijkstra on weighted mazes). Solvers are called through the
+server's dispatch, so they run exactly as they do behind /solve, but in a child
+process per solve so a runaway solver can be stopped at the timeout. Every row
+starts from a grid without derived data, as a maze sent inline to /solve does;
+the time to label the maze's connected components, which /mazes uploads pay
+in the background, is reported per maze as labels_ms.
+
+The report is JSON (and optionally CSV) with one row per (maze, algorithm);
+passing an earlier report as --baseline prints the time ratio of every row that
+both reports share, which makes runs on different commits comparable.
+
+Usage:
+    python benchmark.py --preset quick --output report.json
+    python benchmark.py --sizes 200 1000 --kinds backtracker rooms --algorithms bfs astar jps
+    python benchmark.py --preset full --memory --csv report.csv --baseline previous.json
+"""
+
+import argparse
+import csv
+import json
+import multiprocessing
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from typing import Any, Dict, List, Optional, Sequence
+from grid import Grid
+from maze_corpus import KINDS, DEFAULT_DENSITIES, CorpusMaze, corpus
+from algorithms.bfs import bfs
+from algorithms.dijkstra import dijkstra
+from components import label_components
+from server import ALGORITHMS, dispatch
+
+PRESETS = {
+    "quick": (50, 200),
+    "standard": (50, 200, 1000),
+    "full": (50, 200, 1000, 4000)
+}
+
+# Options passed to every solver; the seed keeps the sampling planners reproducible
+SOLVE_OPTIONS = {
+    "heuristic_type": 0,
+    "beam_width": 5,
+    "exploration": "none",
+    "cluster_size": 16,
+    "refine": True,
+    "resume": True,
+    "max_trace": None,
+    "max_iterations": 1000,
+    "step_size": 1.0,
+    "seed": 0
+}
+
+CSV_FIELDS = ("maze", "kind", "size", "density", "digest", "algorithm", "directions", "status", "wall_time_ms",
+              "wall_time_min_ms", "solver_time_ms", "expansions", "frontier_size", "peak_memory_bytes", "found",
+              "reaches_end", "path_length", "path_cost", "optimal_cost", "optimality", "labels_ms", "error")
+
+def measure(algorithm: str, start: int, end: int, grid: Grid, directions: int, repeat: int,
+            memory: bool) -> Dict[str, Any]:
+    """Solves one query repeat times (plus once under tracemalloc if memory is set) and summarizes the runs."""
+    times = []
+    result = None
+    for _ in range(repeat):
+        begin = time.perf_counter()
+        result = dispatch(algorithm, start, end, grid, directions, SOLVE_OPTIONS)
+        times.append((time.perf_counter() - begin) * 1000)
+
+    peak = None
+    if memory:
+        # A separate run, since tracing allocations slows the solver down
+        tracemalloc.start()
+        try:
+            dispatch(algorithm, start, end, grid, directions, SOLVE_OPTIONS)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    path = result["path"]
+    metrics = result["metrics"]
+    return {
+        "wall_time_ms": statistics.median(times),
+        "wall_time_min_ms": min(times),
+        "solver_time_ms": metrics.get("time_taken_ms"),
+        "expansions": metrics.get("explored_size"),
+        "frontier_size": metrics.get("frontier_size"),
+        "peak_memory_bytes": peak,
+        "found": path is not None,
+        "reaches_end": path is not None and path[-1] == end,
+        "path_length": len(path) - 1 if path is not None else None,
+        "path_cost": grid.path_cost(path) if path is not None else None
+    }
+
+def _measure_child(connection, *args) -> None:
+    try:
+        connection.send(("ok", measure(*args)))
+    except Exception as e:
+        connection.send(("error", f"{type(e).__name__}: {e}"))
+    finally:
+        connection.close()
+
+def measure_isolated(algorithm: str, start: int, end: int, grid: Grid, directions: int, repeat: int,
+                     memory: bool, timeout: float) -> Dict[str, Any]:
+    """Runs measure() in a child process, giving up after timeout seconds (0 runs it in this process)."""
+    if timeout <= 0:
+        try:
+            return {"status": "ok", **measure(algorithm, start, end, grid, directions, repeat, memory)}
+        except Exception as e:
+            return {"status": "error", "error": f"{type(e).__name__}: {e}"}
+
+    receiver, sender = multiprocessing.Pipe(duplex=False)
+    process = multiprocessing.Process(target=_measure_child,
+                                      args=(sender, algorithm, start, end, grid, directions, repeat, memory))
+    process.start()
+    sender.close()
+    try:
+        if not receiver.poll(timeout):
+            return {"status": "timeout", "error": f"Did not finish within {timeout:g}s"}
+        status, value = receiver.recv()
+    except EOFError:
+        return {"status": "error", "error": f"Solver process exited with code {process.exitcode}"}
+    finally:
+        if process.is_alive():
+            process.kill()
+        process.join()
+        receiver.close()
+    if status == "ok":
+        return {"status": "ok", **value}
+    return {"status": "error", "error": value}
+
+def optimal_cost(maze: CorpusMaze, directions: int) -> Optional[int]:
+    """Cost of a shortest path of the maze, or None if the end cannot be reached."""
+    solver = dijkstra if maze.grid.weights is not None else bfs
+    path = solver(maze.start, maze.end, maze.grid, directions)["path"]
+    return maze.grid.path_cost(path) if path is not None else None
+
+def labelling_time(maze: CorpusMaze, directions: int) -> float:
+    """Milliseconds taken to label the connected components of the maze (not cached on it)."""
+    begin = time.perf_counter()
+    label_components(maze.grid, directions)
+    return (time.perf_counter() - begin) * 1000
+
+def run_benchmark(mazes: Sequence[CorpusMaze], algorithms: Sequence[str], directions: int, repeat: int = 1,
+                  memory: bool = False, timeout: float = 60, log=None) -> List[Dict[str, Any]]:
+    """Benchmarks every algorithm on every maze.
+
+    Args:
+        mazes (Sequence[CorpusMaze]): Mazes to solve (any iterable, consumed once)
+        algorithms (Sequence[str]): Algorithm names, as accepted by /solve
+        directions (int): Number of possible movement directions (4 or 8)
+        repeat (int, optional): Timed solves per row; the median and minimum are reported. Defaults to 1
+        memory (bool, optional): Also measure peak traced memory in an extra solve. Defaults to False
+        timeout (float, optional): Seconds allowed per row, 0 for no limit. Defaults to 60
+        log (Callable, optional): Called with every finished row. Defaults to None
+
+    Returns:
+        List[Dict[str, Any]]: One row per (maze, algorithm), with the fields of CSV_FIELDS
+    """
+    rows = []
+    for maze in mazes:
+        optimal = optimal_cost(maze, directions)
+        labels_ms = labelling_time(maze, directions)
+        for algorithm in algorithms:
+            row = {
+                "maze": maze.name,
+                "kind": maze.kind,
+                "size": maze.size,
+                "density": maze.density,
+                "digest": maze.grid.digest,
+                "algorithm": algorithm,
+                "directions": directions,
+                **measure_isolated(algorithm, maze.start, maze.end, maze.grid, directions, repeat, memory, timeout),
+                "optimal_cost": optimal,
+                "labels_ms": labels_ms
+            }
+            # Paths that stop short of the end (e.g. RRT's) are not comparable with the optimum
+            if row.get("reaches_end") and optimal:
+                row["optimality"] = row["path_cost"] / optimal
+            rows.append(row)
+            if log is not None:
+                log(row)
+    return rows
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare(rows: Sequence[Dict[str, Any]], baseline: Dict[str, Any]) -> List[str]:
+    """Formats the wall time ratio (this run / baseline) of every row present in both reports."""
+    previous = {(row["digest"], row["algorithm"], row["directions"]): row for row in baseline["results"]}
+    lines = []
+    for row in rows:
+        before = previous.get((row["digest"], row["algorithm"], row["directions"]))
+        if before is None or row["status"] != "ok" or before["status"] != "ok":
+            continue
+        ratio = row["wall_time_ms"] / before["wall_time_ms"] if before["wall_time_ms"] else float("inf")
+        lines.append(f"{row['maze']:<24} {row['algorithm']:<20} {before['wall_time_ms']:>10.1f} ms "
+                     f"-> {row['wall_time_ms']:>10.1f} ms  x{ratio:.2f}")
+    return lines
+
+def _format_row(row: Dict[str, Any]) -> str:
+    if row["status"] != "ok":
+        return f"{row['maze']:<24} {row['algorithm']:<20} {row['status']}: {row.get('error')}"
+    optimality = f"{row['optimality']:.3f}" if row.get("optimality") is not None else "-"
+    return (f"{row['maze']:<24} {row['algorithm']:<20} {row['wall_time_ms']:>10.1f} ms "
+            f"{row['expansions']:>10} expanded  optimality {optimality}")
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the maze solvers on a generated corpus.")
+    parser.add_argument("--preset", choices=sorted(PRESETS), default="quick", help="Maze sizes to use")
+    parser.add_argument("--sizes", type=int, nargs="+", help="Maze sizes (overrides --preset)")
+    parser.add_argument("--kinds", nargs="+", choices=KINDS, default=list(KINDS))
+    parser.add_argument("--densities", type=float, nargs="+", default=list(DEFAULT_DENSITIES),
+                        help="Obstacle densities of the random mazes")
+    parser.add_argument("--algorithms", nargs="+", choices=ALGORITHMS, default=list(ALGORITHMS))
+    parser.add_argument("--directions", type=int, choices=(4, 8), default=4)
+    parser.add_argument("--seed", type=int, default=0, help="Corpus seed")
+    parser.add_argument("--repeat", type=int, default=1, help="Timed solves per row")
+    parser.add_argument("--memory", action="store_true", help="Measure peak memory with tracemalloc")
+    parser.add_argument("--timeout", type=float, default=60, help="Seconds per row, 0 to run in-process")
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    parser.add_argument("--csv", help="Write the rows as CSV to this file")
+    parser.add_argument("--baseline", help="Earlier JSON report to compare wall times against")
+    args = parser.parse_args(argv)
+
+    sizes = args.sizes or PRESETS[args.preset]
+    mazes = corpus(sizes, args.kinds, args.densities, args.seed)
+    rows = run_benchmark(mazes, args.algorithms, args.directions, args.repeat, args.memory, args.timeout,
+                         log=lambda row: print(_format_row(row), flush=True))
+    report = {
+        "meta": {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "revision": git_revision(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "sizes": list(sizes),
+            "kinds": args.kinds,
+            "densities": args.densities,
+            "seed": args.seed,
+            "directions": args.directions,
+            "repeat": args.repeat,
+            "options": SOLVE_OPTIONS
+        },
+        "results": rows
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.csv:
+        with open(args.csv, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=CSV_FIELDS, extrasaction="ignore")
+            writer.writeheader()
+            writer.writerows(rows)
+    if args.baseline:
+        with open(args.baseline) as f:
+            print("\n".join(compare(rows, json.load(f))))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,126 @@
+"""Connected-component labelling of mazes.
+
+Two open cells are in the same component when a solver moving in the given
+number of directions can walk from one to the other. Labels are computed once
+per (maze, directions) and cached on the grid, so checking whether a query can
+have a path at all is a pair of array lookups.
+
+Labelling works on runs of open cells rather than on single cells: the padding
+border guarantees that no run crosses a row boundary, so the runs of the whole
+maze are found with one regular-expression scan over the flat buffer. Runs in
+consecutive rows that touch are merged with union-find, and every run's label
+is then written with a single slice assignment.
+"""
+
+import re
+from array import array
+from typing import List, Optional
+from grid import Grid
+
+_OPEN_RUN = re.compile(b"\x00+")
+
+def label_components(grid: Grid, directions: int) -> array:
+    """Labels the connected components of the open cells of a grid.
+
+    Args:
+        grid (Grid): Flattened maze
+        directions (int): Number of possible movement directions (4 or 8)
+
+    Returns:
+        array: Component label for every cell id; 0 for blocked cells, 1.. for open cells
+    """
+    width = grid.width
+    # With diagonal moves, runs in adjacent rows also touch when they only meet at a corner
+    reach = 1 if directions == 8 else 0
+    parent: List[int] = []
+    run_starts: List[int] = []
+    run_ends: List[int] = []
+
+    def find(run: int) -> int:
+        while parent[run] != run:
+            parent[run] = parent[parent[run]]
+            run = parent[run]
+        return run
+
+    previous_row = -1
+    previous_runs: List[int] = []
+    current_runs: List[int] = []
+    for match in _OPEN_RUN.finditer(grid.blocked):
+        start, end = match.span()
+        row = start // width
+        if row != previous_row:
+            # Runs of non-adjacent rows can never touch
+            previous_runs = current_runs if row == previous_row + 1 else []
+            current_runs = []
+            previous_row = row
+            scan = 0
+        run = len(parent)
+        parent.append(run)
+        run_starts.append(start)
+        run_ends.append(end)
+        current_runs.append(run)
+
+        # Merge with the runs of the previous row whose column span touches [start, end)
+        low, high = start - width - reach, end - width + reach
+        while scan < len(previous_runs) and run_ends[previous_runs[scan]] <= low:
+            scan += 1
+        above = scan
+        while above < len(previous_runs) and run_starts[previous_runs[above]] < high:
+            root_a, root_b = find(run), find(previous_runs[above])
+            if root_a != root_b:
+                if root_a < root_b:
+                    parent[root_b] = root_a
+                else:
+                    parent[root_a] = root_b
+            above += 1
+
+    labels = array('i', bytes(4 * len(grid.blocked)))
+    component_of_root = {}
+    for run in range(len(parent)):
+        root = find(run)
+        label = component_of_root.get(root)
+        if label is None:
+            label = len(component_of_root) + 1
+            component_of_root[root] = label
+        start, end = run_starts[run], run_ends[run]
+        labels[start:end] = array('i', [label]) * (end - start)
+    return labels
+
+def components(grid: Grid, directions: int) -> array:
+    """Returns the component labels of a grid, computing and caching them on first use."""
+    return grid.derived(("components", directions), lambda: label_components(grid, directions))
+
+def reachable(grid: Grid, start: int, end: int, directions: int, build: bool = True) -> Optional[bool]:
+    """Checks whether any path can connect start to end.
+
+    Solvers never step onto blocked cells but do leave a blocked start, so a
+    blocked start is treated as belonging to the components of its neighbors.
+    Labelling a large maze costs far more than a single search on it, so callers
+    gating a search on the answer pass build=False and only use labels that are
+    already cached.
+
+    Args:
+        grid (Grid): Flattened maze
+        start (int): Starting cell id
+        end (int): Goal cell id
+        directions (int): Number of possible movement directions (4 or 8)
+        build (bool, optional): Compute the labels if they are not cached yet. Defaults to True
+
+    Returns:
+        Optional[bool]: False if no path can exist, True otherwise; None if build is
+        False and the labels are not cached
+    """
+    if start == end:
+        return True
+    if grid.blocked[end]:
+        return False
+    if build:
+        labels = components(grid, directions)
+    else:
+        labels = grid.derived_value(("components", directions))
+        if labels is None:
+            return None
+    target = labels[end]
+    if not grid.blocked[start]:
+        return labels[start] == target
+    return any(labels[start + offset] == target for offset in grid.offsets(directions))
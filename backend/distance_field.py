@@ -0,0 +1,177 @@
+"""Level-synchronous BFS distance fields.
+
+distance_field() labels every cell with its number of steps from a source,
+one whole BFS level at a time. With NumPy available a level is expanded with
+a few array operations: while the frontier is large it is a boolean mask that
+is shifted by each neighbor offset of the padded flat grid, and while it is of
+moderate size it is an index array whose neighbors are gathered and
+deduplicated. Levels of only a few cells (long corridors) are cheaper to expand
+in plain Python than to hand to NumPy; the NumPy arrays are views of the same
+buffers, so the representations can be mixed freely. Without NumPy every level
+is expanded in plain Python.
+
+Fields are int32 sequences over the padded cell ids of the grid, holding -1
+for cells that were not reached (including blocked cells).
+"""
+
+from array import array
+from typing import Callable, List, Optional, Sequence
+from grid import Grid
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy is optional
+    np = None
+
+# Use the dense mask expansion while the frontier holds more than 1/DENSE_RATIO of the cells
+DENSE_RATIO = 32
+# Expand levels of at most this many cells in plain Python
+SMALL_LEVEL = 64
+
+# Maps blocked (1) to 0 and open (0) to 1
+_INVERT = bytes([1, 0]) + bytes(254)
+
+def distance_field(grid: Grid, source: int, directions: int, targets: Optional[Sequence[int]] = None,
+                   on_level: Optional[Callable[[List[int]], None]] = None):
+    """Computes the number of steps from source to every reachable cell.
+
+    Args:
+        grid (Grid): Flattened maze (weights are ignored)
+        source (int): Source cell id
+        directions (int): Number of possible movement directions (4 or 8)
+        targets (Sequence[int], optional): Stop as soon as all of these cells have been labelled. Defaults to None
+        on_level (Callable, optional): Called with the cell ids of every level, in order. Defaults to None
+
+    Returns:
+        numpy.ndarray | array: int32 distance of every cell id, -1 where unreached
+    """
+    if np is None:
+        return _distance_field_python(grid, source, directions, targets, on_level)
+
+    offsets = grid.offsets(directions)
+    count = len(grid.blocked)
+    # Python buffers with NumPy views on them, for the small and the large levels respectively
+    open_cells = bytearray(grid.blocked.translate(_INVERT))
+    distance_buffer = array('i', [-1]) * count
+    unvisited = np.frombuffer(open_cells, dtype=np.bool_)
+    distance = np.frombuffer(distance_buffer, dtype=np.int32)
+    distance_buffer[source] = 0
+    open_cells[source] = 0
+    frontier = [source]
+    if on_level is not None:
+        on_level(frontier)
+    offset_array = np.array(offsets, dtype=np.int64)
+    dense_limit = count // DENSE_RATIO
+    pending = _pending(distance_buffer, targets)
+    level = 0
+    while len(frontier) and (pending is None or pending):
+        level += 1
+        if len(frontier) <= SMALL_LEVEL:
+            if not isinstance(frontier, list):
+                frontier = frontier.tolist()
+            next_level = []
+            for cell in frontier:
+                for offset in offsets:
+                    neighbor = cell + offset
+                    if open_cells[neighbor]:
+                        open_cells[neighbor] = 0
+                        distance_buffer[neighbor] = level
+                        next_level.append(neighbor)
+            frontier = next_level
+            if on_level is not None and frontier:
+                on_level(frontier)
+            if pending:
+                pending = _pending(distance_buffer, pending)
+            continue
+
+        if len(frontier) > dense_limit:
+            mask = np.zeros(count, dtype=bool)
+            mask[frontier] = True
+            reached = np.zeros(count, dtype=bool)
+            for offset in offsets:
+                # reached[cell] |= mask[cell - offset]; the blocked border keeps shifts in range
+                if offset > 0:
+                    reached[offset:] |= mask[:-offset]
+                else:
+                    reached[:offset] |= mask[-offset:]
+            reached &= unvisited
+            frontier = np.flatnonzero(reached)
+        else:
+            candidates = (np.asarray(frontier, dtype=np.int64)[:, None] + offset_array).ravel()
+            frontier = np.unique(candidates[unvisited[candidates]])
+        unvisited[frontier] = False
+        distance[frontier] = level
+        if on_level is not None and frontier.size:
+            on_level(frontier.tolist())
+        if pending:
+            pending = _pending(distance_buffer, pending)
+    return distance
+
+def _pending(distance, targets: Optional[Sequence[int]]) -> Optional[List[int]]:
+    """Returns the targets that have not been labelled yet, or None when there are no targets."""
+    if targets is None:
+        return None
+    return [cell for cell in targets if distance[cell] == -1]
+
+def _distance_field_python(grid: Grid, source: int, directions: int, targets: Optional[Sequence[int]],
+                           on_level: Optional[Callable[[List[int]], None]]) -> array:
+    blocked = grid.blocked
+    offsets = grid.offsets(directions)
+    distance = array('i', [-1]) * len(blocked)
+    distance[source] = 0
+    level = [source]
+    pending = _pending(distance, targets)
+    step = 0
+    while level and (pending is None or pending):
+        if on_level is not None:
+            on_level(level)
+        step += 1
+        next_level = []
+        for cell in level:
+            for offset in offsets:
+                neighbor = cell + offset
+                if distance[neighbor] == -1 and not blocked[neighbor]:
+                    distance[neighbor] = step
+                    next_level.append(neighbor)
+        level = next_level
+        if pending:
+            pending = _pending(distance, pending)
+    if on_level is not None and level:
+        on_level(level)
+    return distance
+
+def reached_count(distance) -> int:
+    """Returns the number of cells labelled in a distance field."""
+    if isinstance(distance, array):
+        return len(distance) - distance.count(-1)
+    return int(np.count_nonzero(distance >= 0))
+
+def path_from_field(grid: Grid, distance, source: int, end: int, directions: int) -> Optional[List[int]]:
+    """Walks a distance field downhill from end to source.
+
+    Args:
+        grid (Grid): Flattened maze the field was computed on
+        distance: Distance field from source, see distance_field
+        source (int): Source cell id of the field
+        end (int): Cell id to walk back from
+        directions (int): Number of possible movement directions (4 or 8)
+
+    Returns:
+        Optional[List[int]]: Cell ids from source to end, or None if end was not reached
+    """
+    remaining = int(distance[end])
+    if remaining < 0:
+        return None
+    offsets = grid.offsets(directions)
+    path = [end]
+    current = end
+    while remaining > 0:
+        remaining -= 1
+        for offset in offsets:
+            neighbor = current - offset
+            if distance[neighbor] == remaining:
+                current = neighbor
+                break
+        path.append(current)
+    path.reverse()
+    return path
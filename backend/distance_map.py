@@ -0,0 +1,193 @@
+"""Single-source distance maps.
+
+A distance map holds, for one source cell, the shortest distance to every cell
+of the maze together with the step each shortest path takes into that cell.
+It is computed with one search (a BFS distance field, or Dijkstra when cell
+weights count), after which the path to any cell is read off the predecessor
+raster in O(path length) without searching again.
+
+An encoded map is a 24-byte little-endian header followed by the distance raster
+and the predecessor raster:
+
+    offset  size  field
+    0       4     magic b"DMAP"
+    4       1     format version (1)
+    5       1     distance item size in bytes: 4 = int32, 8 = int64
+    6       1     directions (4 or 8)
+    7       1     reserved (0)
+    8       4     width (number of rows, x)
+    12      4     height (number of columns, y)
+    16      4     source x
+    20      4     source y
+
+Both rasters store one value per cell in row-major order (cell (x, y) is entry
+number x * height + y), like the packed maze format of grid_codec. Distances are
+signed little-endian integers, -1 for cells that cannot be reached (including
+blocked cells). A predecessor is one byte: the index k into the DX/DY direction
+constants of the step that enters the cell, so the previous cell of (x, y) is
+(x - DX[k], y - DY[k]); 255 marks the source and unreached cells.
+"""
+
+import struct
+import sys
+from array import array
+from typing import Any, Dict, List, Optional, Tuple
+from grid import Grid
+from distance_field import distance_field
+from multi_target import cost_tree
+from utils import DX_4D, DY_4D, DX_8D, DY_8D
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy is optional
+    np = None
+
+MAGIC = b"DMAP"
+VERSION = 1
+HEADER = struct.Struct("<4sBBBBIIII")
+NO_PREDECESSOR = 255
+
+def distance_map(grid: Grid, source: int, directions: int, weighted: bool) -> Tuple[Any, Any]:
+    """Computes the distance and predecessor of every cell from a source.
+
+    Args:
+        grid (Grid): Flattened maze
+        source (int): Source cell id
+        directions (int): Number of possible movement directions (4 or 8)
+        weighted (bool): Minimize the sum of cell weights (Dijkstra) instead of the number of steps (BFS)
+
+    Returns:
+        Tuple: Distance (-1 when unreached) and predecessor direction index (NO_PREDECESSOR
+            for the source and unreached cells) of every padded cell id
+    """
+    offsets = grid.offsets(directions)
+    if weighted and grid.weights is not None:
+        distance, parent, _ = cost_tree(source, grid, directions)
+        return distance, _predecessors_from_parents(parent, offsets)
+    distance = distance_field(grid, source, directions)
+    return distance, _predecessors_from_distances(distance, offsets)
+
+def _predecessors_from_distances(distance, offsets) -> Any:
+    # Same choice as path_from_field: the first direction that steps down by one
+    if np is None:
+        predecessors = bytearray([NO_PREDECESSOR]) * len(distance)
+        for cell, value in enumerate(distance):
+            if value > 0:
+                for k, offset in enumerate(offsets):
+                    if distance[cell - offset] == value - 1:
+                        predecessors[cell] = k
+                        break
+        return predecessors
+
+    count = len(distance)
+    predecessors = np.full(count, NO_PREDECESSOR, dtype=np.uint8)
+    missing = distance > 0
+    previous = np.empty(count, dtype=distance.dtype)
+    for k, offset in enumerate(offsets):
+        # previous[cell] = distance[cell - offset]; the blocked border keeps shifts in range
+        previous.fill(-1)
+        if offset > 0:
+            previous[offset:] = distance[:-offset]
+        else:
+            previous[:offset] = distance[-offset:]
+        found = missing & (previous == distance - 1)
+        predecessors[found] = k
+        missing &= ~found
+    return predecessors
+
+def _predecessors_from_parents(parent: array, offsets) -> Any:
+    if np is None:
+        steps = {offset: k for k, offset in enumerate(offsets)}
+        predecessors = bytearray([NO_PREDECESSOR]) * len(parent)
+        for cell, previous in enumerate(parent):
+            if previous != -1:
+                predecessors[cell] = steps[cell - previous]
+        return predecessors
+
+    parents = np.frombuffer(parent, dtype=np.int32)
+    step = np.arange(len(parents), dtype=np.int64) - parents
+    predecessors = np.full(len(parents), NO_PREDECESSOR, dtype=np.uint8)
+    for k, offset in enumerate(offsets):
+        predecessors[(parents != -1) & (step == offset)] = k
+    return predecessors
+
+def encode_distance_map(grid: Grid, source: int, directions: int, distance, predecessors) -> bytes:
+    """Encodes a distance map computed by distance_map into the format described above."""
+    size, width = grid.size, grid.width
+    rows = [((x + 1) * width + 1, (x + 1) * width + 1 + size) for x in range(size)]
+    if np is not None:
+        distance = np.asarray(distance)
+        largest = int(distance.max()) if distance.size else 0
+        itemsize = 4 if largest < 2 ** 31 else 8
+        interior = distance.reshape(width, width)[1:-1, 1:-1]
+        distance_bytes = interior.astype("<i4" if itemsize == 4 else "<i8").tobytes()
+        predecessor_bytes = np.asarray(predecessors).reshape(width, width)[1:-1, 1:-1].tobytes()
+    else:
+        largest = max(distance) if len(distance) else 0
+        itemsize = 4 if largest < 2 ** 31 else 8
+        flat = array('i' if itemsize == 4 else 'q')
+        for begin, end in rows:
+            flat.fromlist(list(distance[begin:end]))
+        if sys.byteorder == "big":
+            flat.byteswap()
+        distance_bytes = flat.tobytes()
+        predecessor_bytes = b"".join(bytes(predecessors[begin:end]) for begin, end in rows)
+    x, y = grid.coords(source)
+    header = HEADER.pack(MAGIC, VERSION, itemsize, directions, 0, size, size, x, y)
+    return header + distance_bytes + predecessor_bytes
+
+def decode_distance_map(data: bytes) -> Dict[str, Any]:
+    """Decodes an encoded distance map.
+
+    Returns:
+        Dict[str, Any]: width, height, directions, source ([x, y]), distance (array of
+            row-major distances) and predecessors (bytes of row-major direction indices)
+    """
+    view = memoryview(data)
+    if len(view) < HEADER.size:
+        raise ValueError("Distance map is shorter than its header")
+    magic, version, itemsize, directions, _, width, height, x, y = HEADER.unpack_from(view)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("Not a distance map (bad magic or version)")
+    if itemsize not in (4, 8):
+        raise ValueError(f"Unsupported distance item size: {itemsize}")
+    count = width * height
+    distance_end = HEADER.size + count * itemsize
+    if len(view) != distance_end + count:
+        raise ValueError(f"Distance map has {len(view)} bytes, expected {distance_end + count}")
+    distance = array('i' if itemsize == 4 else 'q')
+    distance.frombytes(view[HEADER.size:distance_end])
+    if sys.byteorder == "big":
+        distance.byteswap()
+    return {
+        "width": width,
+        "height": height,
+        "directions": directions,
+        "source": [x, y],
+        "distance": distance,
+        "predecessors": bytes(view[distance_end:])
+    }
+
+def path_from_map(decoded: Dict[str, Any], end: List[int]) -> Optional[List[List[int]]]:
+    """Follows the predecessors of a decoded distance map from end back to its source.
+
+    Args:
+        decoded (Dict[str, Any]): Result of decode_distance_map
+        end (List[int]): [x, y] of the cell to reach
+
+    Returns:
+        Optional[List[List[int]]]: [x, y] cells from the source to end, or None if end is unreachable
+    """
+    height = decoded["height"]
+    predecessors = decoded["predecessors"]
+    dx, dy = (DX_8D, DY_8D) if decoded["directions"] == 8 else (DX_4D, DY_4D)
+    x, y = end
+    if decoded["distance"][x * height + y] < 0:
+        return None
+    path = [[x, y]]
+    while [x, y] != decoded["source"]:
+        k = predecessors[x * height + y]
+        x, y = x - dx[k], y - dy[k]
+        path.append([x, y])
+    path.reverse()
+    return path
@@ -0,0 +1,235 @@
+import asyncio
+import itertools
+import multiprocessing
+import os
+import queue
+import signal
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Awaitable, Callable, Optional
+
+class SolverOverloaded(Exception):
+    """Raised when the bounded solver queue is full."""
+
+class SolverTimeout(Exception):
+    """Raised when a solver call exceeds its time budget."""
+
+class SolveCancelled(Exception):
+    """Raised when a solver call is cancelled, e.g. because the client disconnected."""
+
+# Worker-side state, populated by _init_worker in every pool process
+_slot = -1
+_current_job = 0
+_worker_pids = None
+_worker_jobs = None
+_cancel_requests = None
+
+def _init_worker(slot_counter, pids, jobs, cancels) -> None:
+    """Registers a pool process in the shared slot tables and installs the cancel handler."""
+    global _slot, _worker_pids, _worker_jobs, _cancel_requests
+    with slot_counter.get_lock():
+        _slot = slot_counter.value
+        slot_counter.value += 1
+    _worker_pids, _worker_jobs, _cancel_requests = pids, jobs, cancels
+    if _slot < len(pids):
+        pids[_slot] = os.getpid()
+    if hasattr(signal, "SIGUSR1"):
+        signal.signal(signal.SIGUSR1, _on_cancel_signal)
+
+def _on_cancel_signal(signum, frame) -> None:
+    # Signals may arrive after the targeted job finished; only abort the job they were meant for
+    if _current_job and _cancel_requests[_slot] == _current_job:
+        raise SolveCancelled("Solver call was cancelled")
+
+def _run_job(job_id: int, fn: Callable[..., Any], args: tuple) -> Any:
+    """Runs fn(*args) inside a pool process while advertising the job id for cancellation."""
+    global _current_job
+    registered = 0 <= _slot < len(_worker_jobs)
+    if registered:
+        _worker_jobs[_slot] = job_id
+    _current_job = job_id
+    try:
+        return fn(*args)
+    finally:
+        _current_job = 0
+        if registered:
+            _worker_jobs[_slot] = 0
+
+class SolverExecutor:
+    """Runs CPU-bound solver calls off the event loop.
+
+    Calls are executed in a process pool sized to the machine's cores. The number of
+    calls queued or running is bounded; once the bound is reached new calls are
+    rejected with SolverOverloaded instead of piling up latency. Every call has a
+    timeout and can be tied to the client connection, in which case it is cancelled
+    when the client goes away. Calls that have not started yet are simply dropped;
+    calls already running are interrupted with SIGUSR1 (POSIX only).
+
+    With SOLVER_WORKERS=0, and for run_thread, calls run on a thread of this process
+    instead. Threads cannot be interrupted: on a timeout the caller stops waiting,
+    but the call keeps its place in the pending bound until it actually returns, and
+    client disconnects are not watched. Functions that may run long should stop at a
+    deadline of their own.
+
+    Configuration is read from the environment by from_env():
+        SOLVER_WORKERS: Number of worker processes (0 runs solvers in a thread instead)
+        SOLVER_MAX_PENDING: Maximum number of queued plus running calls
+        SOLVER_TIMEOUT_S: Per-call timeout in seconds
+    """
+    def __init__(self, max_workers: int, max_pending: int, timeout: float, poll_interval: float = 0.1):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+        self.pending = 0
+        self._job_ids = itertools.count(1)
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._manager = None
+        self._pids = self._jobs = self._cancels = None
+
+    @classmethod
+    def from_env(cls) -> 'SolverExecutor':
+        max_workers = int(os.environ.get("SOLVER_WORKERS", os.cpu_count() or 1))
+        max_pending = int(os.environ.get("SOLVER_MAX_PENDING", max(1, max_workers) * 4))
+        timeout = float(os.environ.get("SOLVER_TIMEOUT_S", 30))
+        return cls(max_workers, max_pending, timeout)
+
+    def _ensure_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            ctx = multiprocessing.get_context()
+            self._pids = ctx.Array('q', self.max_workers, lock=False)
+            self._jobs = ctx.Array('q', self.max_workers, lock=False)
+            self._cancels = ctx.Array('q', self.max_workers, lock=False)
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=ctx,
+                initializer=_init_worker,
+                initargs=(ctx.Value('i', 0), self._pids, self._jobs, self._cancels)
+            )
+        return self._pool
+
+    def check_capacity(self) -> None:
+        """Raises SolverOverloaded if a new call would be rejected right now."""
+        if self.pending >= self.max_pending:
+            raise SolverOverloaded(f"Solver queue is full ({self.pending} calls pending)")
+
+    def create_queue(self):
+        """Returns a queue that solver calls can use to send data back while they run."""
+        if self.max_workers <= 0:
+            return queue.Queue()
+        if self._manager is None:
+            self._manager = multiprocessing.get_context().Manager()
+        return self._manager.Queue()
+
+    def _cancel(self, job_id: int, future: Future) -> None:
+        if future.cancel() or self._jobs is None:
+            return
+        for slot, running_job in enumerate(self._jobs):
+            if running_job == job_id:
+                self._cancels[slot] = job_id
+                if hasattr(signal, "SIGUSR1"):
+                    try:
+                        os.kill(self._pids[slot], signal.SIGUSR1)
+                    except ProcessLookupError:
+                        pass
+                return
+
+    async def run(self, fn: Callable[..., Any], *args: Any,
+                  is_disconnected: Optional[Callable[[], Awaitable[bool]]] = None) -> Any:
+        """Runs fn(*args) in the pool and awaits its result.
+
+        Args:
+            fn (Callable): Picklable, module-level function to run
+            *args: Picklable arguments for fn
+            is_disconnected (Callable, optional): Coroutine function polled while waiting;
+                the call is cancelled as soon as it returns True (not in thread mode)
+
+        Returns:
+            Any: The value returned by fn
+
+        Raises:
+            SolverOverloaded: If the queue bound has been reached
+            SolverTimeout: If the call did not finish within the timeout
+            SolveCancelled: If the client disconnected before the call finished
+        """
+        if self.max_workers <= 0:
+            return await self.run_thread(fn, *args)
+        self.check_capacity()
+        self.pending += 1
+        try:
+            job_id = next(self._job_ids)
+            try:
+                future = self._ensure_pool().submit(_run_job, job_id, fn, args)
+            except BrokenProcessPool:
+                # A worker died (e.g. killed by the OOM killer); start a fresh pool
+                self._pool = None
+                future = self._ensure_pool().submit(_run_job, job_id, fn, args)
+
+            result_waiter = asyncio.wrap_future(future)
+            # Consume the outcome of abandoned calls so asyncio does not log it as unhandled
+            result_waiter.add_done_callback(lambda f: f.cancelled() or f.exception())
+            waiters = {result_waiter}
+            watcher = None
+            if is_disconnected is not None:
+                watcher = asyncio.ensure_future(self._watch(is_disconnected))
+                waiters.add(watcher)
+
+            try:
+                done, _ = await asyncio.wait(waiters, timeout=self.timeout, return_when=asyncio.FIRST_COMPLETED)
+            except asyncio.CancelledError:
+                self._cancel(job_id, future)
+                raise
+            finally:
+                if watcher is not None:
+                    watcher.cancel()
+
+            if future.done() and not future.cancelled():
+                try:
+                    return future.result()
+                except BrokenProcessPool:
+                    self._pool = None
+                    raise
+            self._cancel(job_id, future)
+            if watcher is not None and watcher in done:
+                raise SolveCancelled("Client disconnected")
+            raise SolverTimeout(f"Solver did not finish within {self.timeout:g}s")
+        finally:
+            self.pending -= 1
+
+    async def run_thread(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """Runs fn(*args) on a thread of this process, within the pending bound and the timeout.
+
+        The thread cannot be stopped: if the timeout expires first, SolverTimeout is raised
+        but the call holds its pending slot until fn returns.
+
+        Raises:
+            SolverOverloaded: If the queue bound has been reached
+            SolverTimeout: If the call did not finish within the timeout
+        """
+        self.check_capacity()
+        self.pending += 1
+        call = asyncio.ensure_future(asyncio.to_thread(fn, *args))
+        call.add_done_callback(self._release_thread)
+        try:
+            # Shielded, so giving up on the call does not pretend to have stopped it
+            return await asyncio.wait_for(asyncio.shield(call), self.timeout)
+        except asyncio.TimeoutError:
+            raise SolverTimeout(f"Solver did not finish within {self.timeout:g}s")
+
+    def _release_thread(self, call: asyncio.Future) -> None:
+        self.pending -= 1
+        # Consume the outcome of abandoned calls so asyncio does not log it as unhandled
+        if not call.cancelled():
+            call.exception()
+
+    async def _watch(self, is_disconnected: Callable[[], Awaitable[bool]]) -> None:
+        while not await is_disconnected():
+            await asyncio.sleep(self.poll_interval)
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+        if self._manager is not None:
+            self._manager.shutdown()
+            self._manager = None
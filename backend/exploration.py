@@ -0,0 +1,151 @@
+"""Exploration tracing modes.
+
+Solvers record the cells they explore by appending cell ids to an
+``exploration_order`` list. Passing one of the list subclasses below as the
+solver's ``trace`` argument changes what happens to those ids without touching
+the search loops: NullTrace drops them, CappedTrace keeps only the first ones
+and StreamingTrace forwards them in batches while the search is still running.
+Finished traces can be packed into a compact delta/run-length encoded buffer
+with pack_trace.
+"""
+
+from typing import Callable, List, Optional
+from grid import Grid
+
+EXPLORATION_MODES = ("full", "none", "packed", "stream")
+
+class NullTrace(list):
+    """Exploration trace that records nothing."""
+    def append(self, cell: int) -> None:
+        pass
+
+    def extend(self, cells) -> None:
+        pass
+
+class CappedTrace(list):
+    """Exploration trace that keeps only the first limit cell ids.
+
+    Searches that revisit cells (iterative deepening, IDA*) can record far more
+    entries than the maze has cells; truncated is set once an entry is dropped.
+    """
+    def __init__(self, limit: int):
+        super().__init__()
+        self.limit = max(0, limit)
+        self.truncated = False
+
+    def append(self, cell: int) -> None:
+        if len(self) < self.limit:
+            super().append(cell)
+        else:
+            self.truncated = True
+
+    def extend(self, cells) -> None:
+        for cell in cells:
+            self.append(cell)
+
+    def __reduce__(self):
+        # Results leave solver workers as plain lists
+        return list, (list(self),)
+
+class StreamingTrace(list):
+    """Exploration trace that forwards cell ids to a sink in fixed-size batches.
+
+    The trace itself stays empty; call flush() once the solver returns to emit
+    the final partial batch.
+    """
+    def __init__(self, sink: Callable[[List[int]], None], batch_size: int = 500):
+        super().__init__()
+        self.sink = sink
+        self.batch_size = max(1, batch_size)
+        self._buffer: List[int] = []
+
+    def append(self, cell: int) -> None:
+        self._buffer.append(cell)
+        if len(self._buffer) >= self.batch_size:
+            self.flush()
+
+    def extend(self, cells) -> None:
+        for cell in cells:
+            self.append(cell)
+
+    def flush(self) -> None:
+        if self._buffer:
+            batch, self._buffer = self._buffer, []
+            self.sink(batch)
+
+def make_trace(mode: str, sink: Optional[Callable[[List[int]], None]] = None, batch_size: int = 500) -> Optional[list]:
+    """Returns the trace object for an exploration mode, or None for a plain list."""
+    if mode not in EXPLORATION_MODES:
+        raise ValueError(f"Unknown exploration mode: {mode}")
+    if mode == "none":
+        return NullTrace()
+    if mode == "stream":
+        if sink is None:
+            raise ValueError("Streaming exploration requires a sink")
+        return StreamingTrace(sink, batch_size)
+    return None
+
+def _write_varint(out: bytearray, value: int) -> None:
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+def pack_trace(cells: List[int], grid: Grid) -> bytes:
+    """Packs an exploration trace into a delta/run-length encoded buffer.
+
+    Cells are converted to unpadded row-major indices (x * size + y). The
+    sequence of differences between consecutive indices (the first taken from 0)
+    is stored as pairs of LEB128 varints: the zigzag-encoded delta followed by
+    the number of consecutive times it repeats.
+
+    Args:
+        cells (List[int]): Exploration order as cell ids
+        grid (Grid): Grid the cell ids refer to
+
+    Returns:
+        bytes: The packed trace
+    """
+    out = bytearray()
+    width, size = grid.width, grid.size
+    previous = 0
+    run_delta = None
+    run_length = 0
+    for cell in cells:
+        x, y = divmod(cell, width)
+        index = (x - 1) * size + (y - 1)
+        delta = index - previous
+        previous = index
+        if delta == run_delta:
+            run_length += 1
+            continue
+        if run_length:
+            _write_varint(out, (run_delta << 1) ^ (run_delta >> 63))
+            _write_varint(out, run_length)
+        run_delta, run_length = delta, 1
+    if run_length:
+        _write_varint(out, (run_delta << 1) ^ (run_delta >> 63))
+        _write_varint(out, run_length)
+    return bytes(out)
+
+def unpack_trace(data: bytes, size: int) -> List[List[int]]:
+    """Decodes a buffer produced by pack_trace back into [x, y] coordinates."""
+    values = []
+    value = shift = 0
+    for byte in data:
+        value |= (byte & 0x7F) << shift
+        if byte & 0x80:
+            shift += 7
+            continue
+        values.append(value)
+        value = shift = 0
+
+    coordinates = []
+    index = 0
+    for i in range(0, len(values) - 1, 2):
+        zigzag, run_length = values[i], values[i + 1]
+        delta = (zigzag >> 1) ^ -(zigzag & 1)
+        for _ in range(run_length):
+            index += delta
+            coordinates.append(list(divmod(index, size)))
+    return coordinates
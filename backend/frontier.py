@@ -0,0 +1,275 @@
+from array import array
+from typing import Dict, Tuple, Union
+
+# Frontiers selectable for dijkstra, ucs and astar (see make_frontier)
+FRONTIERS = ("heap", "bucket")
+
+class IndexedHeap:
+    """Binary min-heap of cell ids for single-threaded search, with decrease-key.
+
+    Every cell is in the heap at most once: pushing a cell that is already
+    queued lowers its key instead of adding a stale duplicate. Entries are
+    (priority, tiebreak, cell) tuples, so ties on priority are broken by the
+    smaller tiebreak (pass -g to prefer deeper nodes) and finally by cell id,
+    which keeps the expansion order deterministic.
+
+    The heap counts its operations (see counters()) for the solve metrics.
+
+    Args:
+        capacity (int): Number of cell ids (len(grid.blocked))
+    """
+    def __init__(self, capacity: int):
+        self._heap = []
+        self._position = array('i', [-1]) * capacity
+        self.inserts = 0
+        self.key_changes = 0
+        self.pops = 0
+        self.peak = 0
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def __contains__(self, cell: int) -> bool:
+        return self._position[cell] != -1
+
+    def push(self, cell: int, priority: float, tiebreak: float = 0) -> bool:
+        """Inserts a cell or lowers its key.
+
+        Returns:
+            bool: True if the cell was inserted or its key decreased
+        """
+        entry = (priority, tiebreak, cell)
+        position = self._position[cell]
+        if position == -1:
+            self._heap.append(entry)
+            position = len(self._heap) - 1
+            self.inserts += 1
+            if position >= self.peak:
+                self.peak = position + 1
+        elif entry < self._heap[position]:
+            self._heap[position] = entry
+            self.key_changes += 1
+        else:
+            return False
+        self._sift_up(position, entry)
+        return True
+
+    def pop(self) -> int:
+        """Removes and returns the cell with the smallest key."""
+        heap = self._heap
+        last = heap.pop()
+        self.pops += 1
+        if not heap:
+            self._position[last[2]] = -1
+            return last[2]
+        top = heap[0]
+        self._position[top[2]] = -1
+        heap[0] = last
+        self._sift_down(0, last)
+        return top[2]
+
+    def update(self, cell: int, priority: float, tiebreak: float = 0) -> None:
+        """Inserts a cell or changes its key, whether it goes down or up."""
+        position = self._position[cell]
+        if position == -1:
+            self.push(cell, priority, tiebreak)
+            return
+        entry = (priority, tiebreak, cell)
+        old = self._heap[position]
+        self.key_changes += 1
+        if entry < old:
+            self._sift_up(position, entry)
+        else:
+            self._sift_down(position, entry)
+
+    def remove(self, cell: int) -> None:
+        """Removes a queued cell."""
+        heap = self._heap
+        position = self._position[cell]
+        removed = heap[position]
+        self._position[cell] = -1
+        self.pops += 1
+        last = heap.pop()
+        if position == len(heap):
+            return
+        if last < removed:
+            self._sift_up(position, last)
+        else:
+            self._sift_down(position, last)
+
+    def counters(self) -> Dict[str, int]:
+        """Returns the operation counts: pushes (inserts), pops (cells taken off by pop or remove),
+        relaxations (inserts and key changes) and the peak number of queued cells."""
+        return {
+            "pushes": self.inserts,
+            "pops": self.pops,
+            "relaxations": self.inserts + self.key_changes,
+            "peak_frontier": self.peak
+        }
+
+    def peek(self) -> Tuple[float, float, int]:
+        """Returns the (priority, tiebreak, cell) entry with the smallest key."""
+        return self._heap[0]
+
+    def _sift_up(self, position: int, entry: tuple) -> None:
+        heap, index = self._heap, self._position
+        while position > 0:
+            parent_position = (position - 1) >> 1
+            parent = heap[parent_position]
+            if entry < parent:
+                heap[position] = parent
+                index[parent[2]] = position
+                position = parent_position
+            else:
+                break
+        heap[position] = entry
+        index[entry[2]] = position
+
+    def _sift_down(self, position: int, entry: tuple) -> None:
+        heap, index = self._heap, self._position
+        size = len(heap)
+        child_position = 2 * position + 1
+        while child_position < size:
+            right_position = child_position + 1
+            if right_position < size and heap[right_position] < heap[child_position]:
+                child_position = right_position
+            child = heap[child_position]
+            if child < entry:
+                heap[position] = child
+                index[child[2]] = position
+                position = child_position
+                child_position = 2 * position + 1
+            else:
+                break
+        heap[position] = entry
+        index[entry[2]] = position
+
+class BucketQueue:
+    """Monotone integer priority queue of cell ids (Dial's algorithm), with decrease-key.
+
+    Cells are kept in a circular array of buckets, one per priority, starting at
+    the smallest priority still queued. Since the priorities of a label-setting
+    search never go below the last one popped, and every push is at most the
+    largest step cost (plus heuristic change) above it, the window of buckets
+    stays small and push and pop are O(1) amortized. The window doubles whenever
+    a push lands beyond it.
+
+    Priorities must be integers. Lowering the key of a queued cell leaves its
+    old entry behind, which pop skips. Within a bucket the last pushed cell comes
+    out first, which favours deeper nodes like the -g tiebreak of IndexedHeap;
+    the tiebreak argument is accepted for compatibility and ignored. A priority
+    below the smallest queued one (from an inconsistent heuristic) is raised to
+    it, so that cell is popped next, as it would be from a heap.
+
+    The queue counts its operations like IndexedHeap (see counters()).
+
+    Args:
+        capacity (int): Number of cell ids (len(grid.blocked))
+        span (int, optional): Expected largest priority increase per step. Defaults to 16
+    """
+    def __init__(self, capacity: int, span: int = 16):
+        size = 1
+        while size <= span:
+            size <<= 1
+        self._buckets = [[] for _ in range(size)]
+        self._mask = size - 1
+        # Priority of every queued cell, -1 for cells not in the queue
+        self._priority = array('q', [-1]) * capacity
+        # Smallest priority that can still be queued
+        self._base = 0
+        self._size = 0
+        self.inserts = 0
+        self.key_changes = 0
+        self.pops = 0
+        self.peak = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __contains__(self, cell: int) -> bool:
+        return self._priority[cell] != -1
+
+    def push(self, cell: int, priority: int, tiebreak: float = 0) -> bool:
+        """Inserts a cell or lowers its key.
+
+        Returns:
+            bool: True if the cell was inserted or its key decreased
+        """
+        if priority < self._base:
+            priority = self._base
+        current = self._priority[cell]
+        if current == -1:
+            self._size += 1
+            self.inserts += 1
+            if self._size > self.peak:
+                self.peak = self._size
+        elif priority < current:
+            self.key_changes += 1
+        else:
+            return False
+        if priority - self._base > self._mask:
+            self._grow(priority - self._base)
+        self._priority[cell] = priority
+        self._buckets[priority & self._mask].append(cell)
+        return True
+
+    def pop(self) -> int:
+        """Removes and returns a cell with the smallest key."""
+        if not self._size:
+            raise IndexError("pop from an empty BucketQueue")
+        buckets, mask, priorities = self._buckets, self._mask, self._priority
+        base = self._base
+        while True:
+            bucket = buckets[base & mask]
+            while bucket:
+                cell = bucket.pop()
+                # Entries left behind by a decrease-key no longer match the cell's priority
+                if priorities[cell] == base:
+                    priorities[cell] = -1
+                    self._size -= 1
+                    self.pops += 1
+                    self._base = base
+                    return cell
+            base += 1
+
+    def counters(self) -> Dict[str, int]:
+        """Returns the operation counts, as IndexedHeap.counters does."""
+        return {
+            "pushes": self.inserts,
+            "pops": self.pops,
+            "relaxations": self.inserts + self.key_changes,
+            "peak_frontier": self.peak
+        }
+
+    def _grow(self, span: int) -> None:
+        size = len(self._buckets)
+        while size <= span:
+            size <<= 1
+        buckets = [[] for _ in range(size)]
+        mask = size - 1
+        priorities = self._priority
+        # Only the entries still matching their cell's priority are worth keeping
+        for slot, bucket in enumerate(self._buckets):
+            for cell in bucket:
+                priority = priorities[cell]
+                if priority != -1 and priority & self._mask == slot:
+                    buckets[priority & mask].append(cell)
+        self._buckets = buckets
+        self._mask = mask
+
+def make_frontier(frontier: str, capacity: int, span: int = 16) -> Union[IndexedHeap, BucketQueue]:
+    """Creates the frontier of a label-setting search.
+
+    Args:
+        frontier (str): "heap" (IndexedHeap, any priorities) or "bucket" (BucketQueue, integer priorities)
+        capacity (int): Number of cell ids (len(grid.blocked))
+        span (int, optional): Expected largest priority increase per step, for "bucket". Defaults to 16
+
+    Returns:
+        Union[IndexedHeap, BucketQueue]: An empty frontier
+    """
+    if frontier == "heap":
+        return IndexedHeap(capacity)
+    if frontier == "bucket":
+        return BucketQueue(capacity, span)
+    raise ValueError(f"Unknown frontier: {frontier}")
@@ -0,0 +1,285 @@
+import hashlib
+import sys
+from array import array
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from utils import Pair, get_heuristic, LANDMARK_HEURISTIC, DX_4D, DY_4D, DX_8D, DY_8D
+
+# Kinds of derived data (first element of the key) that only depend on the blocked
+# cells and are therefore shared with the unweighted view of a grid
+WEIGHT_INDEPENDENT = {"components", "jps_plus", "heuristics"}
+# Kinds of derived data that are cheap to rebuild, dropped first when memory runs short
+DISPOSABLE = {"heuristics"}
+
+class Grid:
+    """Flat, array-backed representation of a square maze.
+
+    Cells are addressed by integer ids into a linear buffer of ``(size + 2) ** 2``
+    entries. The maze is surrounded by a one-cell border of blocked padding so that
+    a neighbor id is always ``cell + offset`` and solvers never need bounds checks.
+    Coordinates (x, y) map to the id ``(x + 1) * width + (y + 1)`` where
+    ``width = size + 2``.
+
+    Attributes:
+        size (int): Size of the grid (assuming square grid)
+        width (int): Row stride of the padded buffer (size + 2)
+        blocked (bytearray): 1 for blocked cells (including the padding border), 0 otherwise
+        weights (Optional[array]): Unsigned 16-bit cell weights, or None for uniform cost
+        on_grow (Optional[Callable[[Grid], None]]): Called with the grid whenever its derived
+            data grows (see derived_grew); set by the maze registry holding the grid
+
+    The cell buffers are treated as immutable once the grid is built: derived data
+    (see derived()) and the content digest are cached on the instance and are not
+    invalidated.
+    """
+    def __init__(self, size: int, blocked: bytearray, weights: Optional[array] = None):
+        self.size = size
+        self.width = size + 2
+        self.blocked = blocked
+        self.weights = weights
+        self._offsets: Dict[int, Tuple[int, ...]] = {}
+        self._derived: Dict[Any, Any] = {}
+        self._digest: Optional[str] = None
+        self.on_grow: Optional[Callable[['Grid'], None]] = None
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # Derived data can be much larger than the maze itself and is cheap to
+        # rebuild relative to shipping it to a worker on every call
+        state = self.__dict__.copy()
+        state["_derived"] = {}
+        # The copy belongs to no registry
+        state["on_grow"] = None
+        return state
+
+    @classmethod
+    def from_lists(cls, blocks: List[List[bool]], size: int, weights: Optional[List[List[int]]] = None) -> 'Grid':
+        """Builds a grid from the nested-list representation used by the API.
+
+        Args:
+            blocks (List[List[bool]]): 2D grid representing obstacles (True for blocked cells)
+            size (int): Size of the grid (assuming square grid)
+            weights (List[List[int]], optional): 2D grid of cell weights. Defaults to None.
+
+        Returns:
+            Grid: The flattened grid
+        """
+        if len(blocks) != size or any(len(row) != size for row in blocks):
+            raise ValueError(f"blocks must be a {size}x{size} grid")
+        width = size + 2
+        blocked = bytearray(b"\x01") * (width * width)
+        for x, row in enumerate(blocks):
+            base = (x + 1) * width + 1
+            blocked[base:base + size] = bytes(row)
+
+        flat_weights = None
+        if weights is not None:
+            if len(weights) != size or any(len(row) != size for row in weights):
+                raise ValueError(f"weights must be a {size}x{size} grid")
+            flat_weights = array('H', bytes(2 * width * width))
+            for x, row in enumerate(weights):
+                base = (x + 1) * width + 1
+                flat_weights[base:base + size] = array('H', row)
+
+        return cls(size, blocked, flat_weights)
+
+    @property
+    def digest(self) -> str:
+        """Hex digest of the maze content (size, blocked cells and weights), used as its maze id."""
+        if self._digest is None:
+            h = hashlib.blake2b(digest_size=16)
+            h.update(self.size.to_bytes(4, "little"))
+            h.update(self.blocked)
+            if self.weights is not None:
+                h.update(b"W")
+                h.update(self.weights.tobytes())
+            self._digest = h.hexdigest()
+        return self._digest
+
+    def derived(self, key: Any, build: Callable[[], Any]) -> Any:
+        """Returns data derived from the maze, building and caching it on first use.
+
+        Args:
+            key (Any): Hashable cache key, e.g. ("components", directions)
+            build (Callable[[], Any]): Computes the value when it is not cached yet
+
+        Returns:
+            Any: The cached value
+        """
+        value = self._derived.get(key)
+        if value is None:
+            value = build()
+            self._derived[key] = value
+            self.derived_grew()
+        return value
+
+    def derived_grew(self) -> None:
+        """Reports derived data that was added or grew in place, so that it is charged right away."""
+        if self.on_grow is not None:
+            self.on_grow(self)
+
+    def derived_value(self, key: Any) -> Any:
+        """Returns cached derived data without building it, or None if it is not cached."""
+        return self._derived.get(key)
+
+    def drop_disposable(self) -> bool:
+        """Drops the cached derived data of the DISPOSABLE kinds. Returns False if there was none."""
+        dropped = False
+        for key in list(self._derived):
+            value = self._derived[key]
+            if isinstance(key, tuple) and key[0] in DISPOSABLE:
+                del self._derived[key]
+                dropped = True
+            elif isinstance(value, Grid):
+                dropped = value.drop_disposable() or dropped
+        return dropped
+
+    def memory(self) -> Dict[int, Tuple[Any, int]]:
+        """Approximate memory held by the grid, per object.
+
+        Covers the cell buffers and the derived data, including that of derived grids
+        such as the unweighted view. Objects are keyed by id(), so buffers and derived
+        data shared between grids can be counted once.
+
+        Returns:
+            Dict[int, Tuple[Any, int]]: (object, size in bytes) by id of the object
+        """
+        items = {id(self.blocked): (self.blocked, len(self.blocked))}
+        if self.weights is not None:
+            items[id(self.weights)] = (self.weights, len(self.weights) * self.weights.itemsize)
+        for value in self._derived.values():
+            if isinstance(value, Grid):
+                items.update(value.memory())
+            else:
+                items[id(value)] = (value, _sizeof(value))
+        return items
+
+    def nbytes(self) -> int:
+        """Approximate memory held by the grid, including its derived data (shared objects counted once)."""
+        return sum(size for _, size in self.memory().values())
+
+    def without_weights(self) -> 'Grid':
+        """Returns a uniform-cost grid sharing this grid's blocked cells."""
+        if self.weights is None:
+            return self
+        return self.derived("without_weights", self._build_unweighted)
+
+    def _build_unweighted(self) -> 'Grid':
+        grid = Grid(self.size, self.blocked)
+        for key, value in self._derived.items():
+            if isinstance(key, tuple) and key[0] in WEIGHT_INDEPENDENT:
+                grid._derived[key] = value
+        return grid
+
+    def cell(self, x: int, y: int) -> int:
+        """Converts (x, y) coordinates into a cell id, validating the bounds."""
+        if not (0 <= x < self.size and 0 <= y < self.size):
+            raise ValueError(f"Coordinates ({x}, {y}) are outside the {self.size}x{self.size} grid")
+        return (x + 1) * self.width + (y + 1)
+
+    def coords(self, cell: int) -> Tuple[int, int]:
+        """Converts a cell id back into (x, y) coordinates."""
+        x, y = divmod(cell, self.width)
+        return x - 1, y - 1
+
+    def to_pair(self, cell: int) -> Pair:
+        """Converts a cell id into a Pair."""
+        x, y = divmod(cell, self.width)
+        return Pair(x - 1, y - 1)
+
+    def to_coordinates(self, cells: List[int]) -> List[List[int]]:
+        """Converts a list of cell ids into the [x, y] lists returned by the API."""
+        width = self.width
+        result = []
+        for cell in cells:
+            x, y = divmod(cell, width)
+            result.append([x - 1, y - 1])
+        return result
+
+    def offsets(self, directions: int) -> Tuple[int, ...]:
+        """Returns the linear id offsets of the neighbors of any cell.
+
+        Offsets follow the order of the DX/DY direction constants so that neighbors
+        are generated in the same order as the coordinate-based implementation.
+        """
+        offsets = self._offsets.get(directions)
+        if offsets is None:
+            dx, dy = (DX_8D, DY_8D) if directions == 8 else (DX_4D, DY_4D)
+            offsets = tuple(dx[i] * self.width + dy[i] for i in range(len(dx)))
+            self._offsets[directions] = offsets
+        return offsets
+
+    def is_blocked(self, cell: int) -> bool:
+        return bool(self.blocked[cell])
+
+    def cost(self, cell: int) -> int:
+        """Returns the cost of stepping onto a cell."""
+        return self.weights[cell] if self.weights is not None else 1
+
+    def path_cost(self, path: List[int]) -> int:
+        """Returns the total cost of a path, excluding the starting cell."""
+        if self.weights is None:
+            return len(path) - 1
+        weights = self.weights
+        return sum(weights[cell] for cell in path[1:])
+
+    def heuristic(self, heuristic_type: int, goal: int, directions: Optional[int] = None,
+                  tabulate: bool = True) -> Callable[[int], float]:
+        """Returns a heuristic function estimating the distance from a cell id to goal.
+
+        The landmark heuristic (LANDMARK_HEURISTIC) is measured in the maze for a given
+        number of movement directions, so solvers that support it pass directions. The
+        geometric heuristics are memoized per goal on the grid (see heuristic_field.py),
+        unless tabulate is False, for callers whose goal keeps changing.
+        """
+        if heuristic_type == LANDMARK_HEURISTIC:
+            if directions is None:
+                raise ValueError("This solver does not support the landmark heuristic")
+            # Imported here since landmarks builds on this module
+            from landmarks import landmark_heuristic
+            return landmark_heuristic(self, goal, directions)
+        if tabulate:
+            from heuristic_field import heuristic_function
+            return heuristic_function(self, heuristic_type, goal)
+        distance = get_heuristic(heuristic_type)
+        width = self.width
+        goal_x, goal_y = divmod(goal, width)
+
+        def h(cell: int) -> float:
+            x, y = divmod(cell, width)
+            return distance(abs(x - goal_x), abs(y - goal_y))
+
+        return h
+
+def _sizeof(value: Any) -> int:
+    """Approximate size in bytes of a cached derived value."""
+    if isinstance(value, (tuple, list)):
+        return sys.getsizeof(value) + sum(_sizeof(item) for item in value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(_sizeof(item) for item in value.values())
+    if callable(getattr(value, "nbytes", None)):
+        return value.nbytes()
+    try:
+        return memoryview(value).nbytes
+    except TypeError:
+        return sys.getsizeof(value)
+
+def reconstruct_path(parent: array, end: int) -> List[int]:
+    """Reconstructs the path from the search root to end using the parent array.
+
+    Args:
+        parent (array): Parent cell id for every cell, -1 for the root and unreached cells
+        end (int): Goal cell id
+
+    Returns:
+        List[int]: Cell ids of the path from the root to end
+    """
+    path = []
+    current = end
+    while current != -1:
+        path.append(current)
+        current = parent[current]
+    path.reverse()
+    return path
+
+def new_parent_array(grid: Grid) -> array:
+    """Allocates a parent array with every entry set to -1."""
+    return array('i', [-1]) * len(grid.blocked)
@@ -0,0 +1,148 @@
+"""Compact binary encoding of mazes.
+
+A packed maze is a 16-byte little-endian header followed by the blocks bitmap and,
+optionally, the weight raster:
+
+    offset  size  field
+    0       4     magic b"MAZE"
+    4       1     format version (1)
+    5       1     weight dtype: 0 = no weights, 1 = uint8, 2 = uint16
+    6       2     reserved (0)
+    8       4     width (number of rows, x)
+    12      4     height (number of columns, y)
+
+The bitmap stores one bit per cell in row-major order (cell (x, y) is bit number
+x * height + y), least significant bit first, 1 meaning blocked. Its length is
+ceil(width * height / 8) bytes. The weight raster stores one little-endian value
+per cell in the same row-major order.
+"""
+
+import struct
+import sys
+from array import array
+from typing import Optional, Tuple
+from grid import Grid
+
+MAGIC = b"MAZE"
+VERSION = 1
+HEADER = struct.Struct("<4sBBHII")
+WEIGHT_DTYPES = {"uint8": 1, "uint16": 2}
+_WEIGHT_DTYPE_SIZES = {0: 0, 1: 1, 2: 2}
+
+# Expands a bitmap byte into eight 0/1 bytes, least significant bit first
+_BYTE_TO_CELLS = [bytes((value >> bit) & 1 for bit in range(8)) for value in range(256)]
+
+def unpack_bitmap(bitmap: bytes, count: int) -> bytes:
+    """Expands an LSB-first bitmap into one 0/1 byte per cell."""
+    if len(bitmap) < (count + 7) // 8:
+        raise ValueError(f"Bitmap holds {len(bitmap) * 8} cells, expected {count}")
+    return b"".join(map(_BYTE_TO_CELLS.__getitem__, bitmap))[:count]
+
+def pack_bitmap(cells: bytes) -> bytes:
+    """Packs one 0/1 byte per cell into an LSB-first bitmap."""
+    packed = bytearray((len(cells) + 7) // 8)
+    for bit in range(8):
+        column = cells[bit::8]
+        for i, value in enumerate(column):
+            if value:
+                packed[i] |= 1 << bit
+    return bytes(packed)
+
+def grid_from_buffers(size: int, bitmap: bytes, weights_raster: Optional[bytes] = None,
+                      weights_dtype: str = "uint8") -> Grid:
+    """Builds a grid straight from a blocks bitmap and an optional weight raster.
+
+    The buffers are copied row by row into the grid's padded flat arrays without
+    materialising any per-cell Python objects.
+
+    Args:
+        size (int): Size of the grid (assuming square grid)
+        bitmap (bytes): Bit-packed blocks, see the module docstring
+        weights_raster (bytes, optional): Row-major little-endian weights. Defaults to None.
+        weights_dtype (str, optional): "uint8" or "uint16". Defaults to "uint8".
+
+    Returns:
+        Grid: The flattened grid
+    """
+    if weights_dtype not in WEIGHT_DTYPES:
+        raise ValueError(f"Unsupported weights_dtype: {weights_dtype}")
+    count = size * size
+    width = size + 2
+    cells = unpack_bitmap(bitmap, count)
+    blocked = bytearray(b"\x01") * (width * width)
+    for x in range(size):
+        base = (x + 1) * width + 1
+        blocked[base:base + size] = cells[x * size:(x + 1) * size]
+
+    weights = None
+    if weights_raster is not None:
+        flat = _decode_weights(weights_raster, count, WEIGHT_DTYPES[weights_dtype])
+        weights = array('H', bytes(2 * width * width))
+        for x in range(size):
+            base = (x + 1) * width + 1
+            weights[base:base + size] = flat[x * size:(x + 1) * size]
+
+    return Grid(size, blocked, weights)
+
+def _decode_weights(raster: bytes, count: int, dtype: int) -> array:
+    itemsize = _WEIGHT_DTYPE_SIZES[dtype]
+    if len(raster) != count * itemsize:
+        raise ValueError(f"Weight raster has {len(raster)} bytes, expected {count * itemsize}")
+    if dtype == 1:
+        # Widen uint8 to little-endian uint16 by interleaving zero high bytes
+        widened = bytearray(2 * count)
+        widened[0::2] = raster
+        raster = widened
+    flat = array('H')
+    flat.frombytes(raster)
+    if sys.byteorder == "big":
+        flat.byteswap()
+    return flat
+
+def decode_grid(data: bytes) -> Tuple[Grid, bool]:
+    """Decodes a packed maze (header, bitmap and optional weight raster).
+
+    Returns:
+        Tuple[Grid, bool]: The grid and whether the payload carried weights
+    """
+    view = memoryview(data)
+    if len(view) < HEADER.size:
+        raise ValueError("Packed maze is shorter than its header")
+    magic, version, dtype, _, width, height = HEADER.unpack_from(view)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("Not a packed maze (bad magic or version)")
+    if width != height:
+        raise ValueError(f"Only square grids are supported, got {width}x{height}")
+    if dtype not in _WEIGHT_DTYPE_SIZES:
+        raise ValueError(f"Unsupported weight dtype code: {dtype}")
+
+    count = width * height
+    bitmap_end = HEADER.size + (count + 7) // 8
+    raster_end = bitmap_end + count * _WEIGHT_DTYPE_SIZES[dtype]
+    if len(view) != raster_end:
+        raise ValueError(f"Packed maze has {len(view)} bytes, expected {raster_end}")
+
+    dtype_name = "uint16" if dtype == 2 else "uint8"
+    raster = view[bitmap_end:raster_end] if dtype else None
+    return grid_from_buffers(width, view[HEADER.size:bitmap_end], raster, dtype_name), dtype != 0
+
+def encode_grid(grid: Grid, weights_dtype: str = "uint8") -> bytes:
+    """Encodes a grid into the packed maze format."""
+    size, width = grid.size, grid.width
+    cells = b"".join(bytes(grid.blocked[(x + 1) * width + 1:(x + 1) * width + 1 + size]) for x in range(size))
+    parts = [b"", pack_bitmap(cells)]
+    dtype = 0
+    if grid.weights is not None:
+        dtype = WEIGHT_DTYPES[weights_dtype]
+        flat = array('H')
+        for x in range(size):
+            base = (x + 1) * width + 1
+            flat.extend(grid.weights[base:base + size])
+        if dtype == 1:
+            parts.append(bytes(flat.tolist()))
+        else:
+            if sys.byteorder == "big":
+                flat.byteswap()
+            parts.append(flat.tobytes())
+    parts[0] = HEADER.pack(MAGIC, VERSION, dtype, 0, size, size)
+    return b"".join(parts)
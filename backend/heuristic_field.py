@@ -0,0 +1,183 @@
+"""Heuristic tables: the geometric heuristics memoized per goal.
+
+The heuristics of utils.get_heuristic map the x and y offsets between a cell and
+the goal to an estimate, and the informed solvers evaluate them for every cell
+they generate, usually several times per cell. Since the estimate only depends
+on the cell and the goal, it is memoized in a HeuristicTable per goal:
+
+- Small grids (up to EAGER_CELLS cells) get the whole table at once, computed in
+  one vectorized NumPy pass, and the heuristic a solver receives is a plain
+  lookup into it.
+- On larger grids most queries only touch a small part of the maze, so the
+  estimates are computed per cell on first use and kept in a dict. Once a
+  search has touched more than 1/WIDE_RATIO of the cells it is a wide one, and
+  the memo is replaced by the whole table (with NumPy) or by a dense array
+  that keeps filling up per cell (without).
+
+Tables hold int32 values for Manhattan, Chebyshev and squared Euclidean and
+float32 values for the others, also in the dict memo, so an estimate does not
+depend on how it was stored. Path costs are integers, so rounding a float
+estimate to float32 never lifts it above the cost it bounds (integers below
+2 ** 24 are exact in float32).
+
+Tables are cached on the grid per (heuristic_type, goal), keeping the
+HEURISTIC_TABLES most recently used ones, so repeated queries towards the same
+goal (several algorithms on one maze, or a client moving its start) share them.
+They are disposable derived data (see grid.DISPOSABLE): when the maze registry
+runs over its budget it drops them before evicting any maze. Adding a table and
+densifying one are reported to the registry (Grid.derived_grew); the dict memo
+is charged whenever the registry next measures the grid.
+"""
+
+import sys
+from array import array
+from collections import OrderedDict
+from typing import Callable, Dict, Union
+from grid import Grid
+from utils import SQRT2, get_heuristic
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy is optional
+    np = None
+
+# Goal tables kept per grid
+HEURISTIC_TABLES = 4
+# Grids of at most this many cells (including the padding) are tabulated up front
+EAGER_CELLS = 512 * 512
+# A search touching more than 1/WIDE_RATIO of the cells switches to a whole table
+WIDE_RATIO = 32
+# Approximate memory of a dict memo entry: the slot and the int and float objects
+_ENTRY_BYTES = 80
+
+# Heuristics whose values are integers, indexed like utils.get_heuristic
+_INTEGER = {0, 3, 5}
+
+class HeuristicTable:
+    """Memoized estimates of a geometric heuristic towards one goal.
+
+    Args:
+        grid (Grid): Flattened maze
+        heuristic_type (int): Index of the heuristic in utils.get_heuristic
+        goal (int): Goal cell id
+    """
+    def __init__(self, grid: Grid, heuristic_type: int, goal: int):
+        self.distance = get_heuristic(heuristic_type)
+        self.heuristic_type = heuristic_type
+        self.width = grid.width
+        self.goal = goal
+        self.goal_x, self.goal_y = divmod(goal, grid.width)
+        self._grew = grid.derived_grew
+        self.cells = len(grid.blocked)
+        self.typecode = _typecode(heuristic_type, grid.width)
+        # Estimates by cell id: a dict memo, then a dense array (-1 for cells not computed yet)
+        self.values: Union[Dict[int, float], array] = {}
+        self.dense = False
+        self.complete = False
+        self._wide = self.cells // WIDE_RATIO
+        # Rounds computed estimates to the precision of the table
+        self._rounding = array(self.typecode, [0])
+        if np is not None and self.cells <= EAGER_CELLS:
+            self._tabulate()
+
+    def nbytes(self) -> int:
+        if self.dense:
+            return self.values.itemsize * len(self.values)
+        return sys.getsizeof(self.values) + _ENTRY_BYTES * len(self.values)
+
+    def function(self) -> Callable[[int], float]:
+        """Returns the heuristic function, a lookup once the table is complete."""
+        if self.complete:
+            return self.values.__getitem__
+        return self.lookup
+
+    def lookup(self, cell: int) -> float:
+        """Returns the estimate from a cell id to the goal, computing and memoizing it on first use."""
+        values = self.values
+        if self.dense:
+            value = values[cell]
+            if value >= 0:
+                return value
+        else:
+            value = values.get(cell)
+            if value is not None:
+                return value
+        x, y = divmod(cell, self.width)
+        rounding = self._rounding
+        rounding[0] = self.distance(abs(x - self.goal_x), abs(y - self.goal_y))
+        value = values[cell] = rounding[0]
+        if not self.dense and len(values) > self._wide:
+            self._densify()
+        return value
+
+    def _densify(self) -> None:
+        if np is not None:
+            self._tabulate()
+        else:
+            dense = array(self.typecode, [-1]) * self.cells
+            for cell, value in self.values.items():
+                dense[cell] = value
+            self.values = dense
+            self.dense = True
+        self._grew()
+
+    def _tabulate(self) -> None:
+        self.values = array(self.typecode, _vectorized(self.width, self.heuristic_type, self.goal,
+                                                       self.typecode).tobytes())
+        self.dense = True
+        self.complete = True
+
+def heuristic_function(grid: Grid, heuristic_type: int, goal: int) -> Callable[[int], float]:
+    """Returns a heuristic function estimating the distance from a cell id to goal, memoized on the grid.
+
+    Args:
+        grid (Grid): Flattened maze
+        heuristic_type (int): Index of the heuristic in utils.get_heuristic
+        goal (int): Goal cell id
+
+    Returns:
+        Callable[[int], float]: The estimate for a cell id
+    """
+    tables = grid.derived(("heuristics",), OrderedDict)
+    key = (heuristic_type, goal)
+    table = tables.get(key)
+    if table is not None:
+        tables.move_to_end(key)
+    else:
+        table = tables[key] = HeuristicTable(grid, heuristic_type, goal)
+        while len(tables) > HEURISTIC_TABLES:
+            tables.popitem(last=False)
+        grid.derived_grew()
+    return table.function()
+
+def _typecode(heuristic_type: int, width: int) -> str:
+    if heuristic_type not in _INTEGER:
+        return 'f'
+    # Squared Euclidean distances outgrow int32 on grids wider than 32k cells
+    return 'i' if 2 * width * width < 2 ** 31 else 'q'
+
+def _vectorized(width: int, heuristic_type: int, goal: int, typecode: str):
+    """Evaluates a heuristic for every cell id at once, with the same operations as its distance function."""
+    goal_x, goal_y = divmod(goal, width)
+    dtype = np.int64 if heuristic_type in _INTEGER else np.float64
+    # Offsets of the rows and columns, broadcast to the whole padded grid
+    dx = np.abs(np.arange(width, dtype=dtype) - goal_x)[:, None]
+    dy = np.abs(np.arange(width, dtype=dtype) - goal_y)[None, :]
+    if heuristic_type == 0:
+        table = dx + dy
+    elif heuristic_type == 1 or heuristic_type == 4:
+        # Diagonal and octile distances
+        table = dx + dy + (SQRT2 - 2) * np.minimum(dx, dy)
+    elif heuristic_type == 2:
+        table = np.sqrt(dx * dx + dy * dy)
+    elif heuristic_type == 3:
+        table = np.maximum(dx, dy)
+    elif heuristic_type == 5:
+        table = dx * dx + dy * dy
+    elif heuristic_type == 6:
+        # Minkowski distance with p = 10
+        table = np.power(np.power(dx, 10.0) + np.power(dy, 10.0), 1 / 10.0)
+    else:
+        raise ValueError(f"Unknown heuristic type: {heuristic_type}")
+    # Computed in double precision and rounded once, like the per-cell estimates
+    return np.ascontiguousarray(table.ravel(), dtype=np.dtype(typecode))
@@ -0,0 +1,269 @@
+"""Instrumentation of solves: phase timings, search counters and process-wide totals.
+
+Every /solve is broken into phases timed with time.perf_counter_ns and reported
+in milliseconds under metrics["phases_ms"]:
+
+    parse            reading and validating the request body
+    grid_build       resolving the maze into a Grid (decoding, or a registry lookup)
+    pool             waiting for a solver worker and shipping the call to it and back
+    search           running the solver, in the worker
+    exploration      applying the exploration mode (packing the trace), in the worker
+    path             converting the path back to coordinates
+    serialization    converting the exploration and building the response model
+
+Solvers report operation counts under metrics["counters"]: expansions for every
+solver, and pushes, pops, relaxations and peak_frontier for the ones built on
+IndexedHeap (see IndexedHeap.counters). With profile_memory set, the worker
+traces allocations during the search and reports the peak under
+metrics["peak_memory_bytes"]; tracing slows the solver down, so it is opt-in.
+
+The server aggregates these numbers in a MetricsRegistry, rendered in the
+Prometheus text format by GET /metrics: counters per algorithm, latency and
+exploration histograms per algorithm, grid size class and direction count,
+phase histograms, HTTP request durations and statuses per handler, and gauges
+such as the solver queue depth. Recording a solve is a handful of dictionary
+updates and bisections under one lock, so it stays cheap on the request path.
+"""
+
+import threading
+import time
+import tracemalloc
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+# Counters summed from metrics["counters"] of every solve
+SEARCH_COUNTERS = ("expansions", "pushes", "pops", "relaxations")
+
+def elapsed_ms(start_ns: int) -> float:
+    """Milliseconds elapsed since start_ns, a time.perf_counter_ns() reading."""
+    return (time.perf_counter_ns() - start_ns) / 1e6
+
+def record_phase(metrics: Dict[str, Any], phase: str, start_ns: int) -> int:
+    """Adds the time elapsed since start_ns to metrics["phases_ms"][phase].
+
+    Returns:
+        int: The current time.perf_counter_ns(), to start the next phase from
+    """
+    now = time.perf_counter_ns()
+    phases = metrics.setdefault("phases_ms", {})
+    phases[phase] = phases.get(phase, 0.0) + (now - start_ns) / 1e6
+    return now
+
+@contextmanager
+def memory_profile(enabled: bool) -> Iterator[Dict[str, int]]:
+    """Traces allocations with tracemalloc while the block runs, when enabled.
+
+    Yields a dict that receives "peak_memory_bytes" once the block exits. Tracing is
+    left alone if something else in the process already started it.
+    """
+    report: Dict[str, int] = {}
+    if not enabled:
+        yield report
+        return
+    started = not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start()
+    else:
+        tracemalloc.reset_peak()
+    try:
+        yield report
+    finally:
+        report["peak_memory_bytes"] = tracemalloc.get_traced_memory()[1]
+        if started:
+            tracemalloc.stop()
+
+class RequestTimer:
+    """ASGI middleware that stamps every HTTP request with its arrival time.
+
+    The stamp (time.perf_counter_ns()) is stored as request.state.received_ns, so
+    handlers can time the parse phase: everything between the arrival of the
+    request and the handler being called with the validated body. Once the
+    response has been sent (including the whole body of streamed responses),
+    on_finish is called with the ASGI scope, the response status and the duration
+    in nanoseconds.
+
+    Args:
+        app: The wrapped ASGI application
+        on_finish (Callable, optional): Called as on_finish(scope, status, duration_ns)
+    """
+    def __init__(self, app, on_finish: Optional[Callable[[Dict[str, Any], int, int], None]] = None):
+        self.app = app
+        self.on_finish = on_finish
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        received = time.perf_counter_ns()
+        scope.setdefault("state", {})["received_ns"] = received
+        status = 500
+
+        async def send_and_watch(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_and_watch)
+        finally:
+            if self.on_finish is not None:
+                self.on_finish(scope, status, time.perf_counter_ns() - received)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+# Upper bounds of the histogram buckets
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+VOLUME_BUCKETS = (10, 100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+# Grid sizes are reported by the smallest of these that is at least the size
+SIZE_CLASSES = (32, 64, 128, 256, 512, 1024, 2048, 4096)
+
+def size_class(size: int) -> str:
+    """Label of the grid size class of a maze: the first SIZE_CLASSES bound it fits in, or "+Inf"."""
+    index = bisect_left(SIZE_CLASSES, size)
+    return str(SIZE_CLASSES[index]) if index < len(SIZE_CLASSES) else "+Inf"
+
+class MetricsRegistry:
+    """Process-wide counters, histograms and gauges with labels, rendered in the Prometheus text format.
+
+    Counters and histograms are declared with describe() and updated with inc() and
+    observe(); gauges are read from a callback when rendering.
+
+    Args:
+        prefix (str): Prefix of every metric name
+    """
+    def __init__(self, prefix: str = "maze"):
+        self.prefix = prefix
+        self._help: Dict[str, str] = {}
+        self._kinds: Dict[str, str] = {}
+        self._buckets: Dict[str, Tuple[float, ...]] = {}
+        # Counters map labels to a value; histograms map labels to [per-bucket counts..., +Inf count, sum]
+        self._values: Dict[str, Dict[Labels, Any]] = {}
+        self._gauges: Dict[str, Callable[[], float]] = {}
+        self._lock = threading.Lock()
+
+    def describe(self, name: str, help_text: str, kind: str = "counter",
+                 buckets: Optional[Tuple[float, ...]] = None) -> None:
+        """Declares a counter, or a histogram with the given bucket upper bounds."""
+        self._help[name] = help_text
+        self._kinds[name] = kind
+        if kind == "histogram":
+            self._buckets[name] = buckets or LATENCY_BUCKETS
+        self._values.setdefault(name, {})
+
+    def gauge(self, name: str, help_text: str, read: Callable[[], float]) -> None:
+        """Declares a gauge whose value is read from read() when rendering."""
+        self._help[name] = help_text
+        self._kinds[name] = "gauge"
+        self._gauges[name] = read
+
+    def inc(self, name: str, labels: Labels = (), value: float = 1) -> None:
+        with self._lock:
+            series = self._values.setdefault(name, {})
+            series[labels] = series.get(labels, 0) + value
+
+    def observe(self, name: str, labels: Labels, value: float) -> None:
+        """Records one observation in a histogram declared with describe()."""
+        buckets = self._buckets[name]
+        index = bisect_left(buckets, value)
+        with self._lock:
+            series = self._values[name]
+            counts = series.get(labels)
+            if counts is None:
+                counts = series[labels] = [0] * (len(buckets) + 1) + [0.0]
+            counts[index] += 1
+            counts[-1] += value
+
+    def value(self, name: str, labels: Labels = ()) -> float:
+        """Current value of a counter, or the number of observations of a histogram."""
+        value = self._values.get(name, {}).get(labels, 0)
+        return sum(value[:-1]) if isinstance(value, list) else value
+
+    def record_solve(self, algorithm: str, grid_size: Optional[int], directions: int, metrics: Dict[str, Any],
+                     error: Optional[str] = None) -> None:
+        """Adds the metrics of one solve to the totals and histograms."""
+        labels = (("algorithm", algorithm),)
+        self.inc("solves_total", labels)
+        if error is not None:
+            self.inc("solve_errors_total", labels)
+        counters = metrics.get("counters", {})
+        for counter in SEARCH_COUNTERS:
+            if counter in counters:
+                self.inc(f"{counter}_total", labels, counters[counter])
+        phases = metrics.get("phases_ms", {})
+        for phase, duration_ms in phases.items():
+            self.inc("phase_seconds_total", labels + (("phase", phase),), duration_ms / 1000)
+            self.observe("solve_phase_seconds", (("phase", phase),), duration_ms / 1000)
+        if error is None and grid_size is not None:
+            shape = labels + (("grid_size", size_class(grid_size)), ("directions", str(directions)))
+            self.observe("solve_latency_seconds", shape, sum(phases.values()) / 1000)
+            if "search" in phases:
+                self.observe("solve_search_seconds", shape, phases["search"] / 1000)
+            self.observe("solve_explored_cells", shape, metrics.get("explored_size", 0))
+
+    def record_request(self, scope: Dict[str, Any], status: int, duration_ns: int) -> None:
+        """Records the duration and status of an HTTP request, labelled by the handler that served it."""
+        endpoint = scope.get("endpoint")
+        handler = getattr(endpoint, "__name__", "unmatched")
+        self.observe("http_request_duration_seconds", (("handler", handler),), duration_ns / 1e9)
+        self.inc("http_responses_total", (("handler", handler), ("status", str(status))))
+
+    def render(self) -> str:
+        """Returns all metrics in the Prometheus text exposition format."""
+        lines = []
+        for name, read in self._gauges.items():
+            self._header(lines, name)
+            lines.append(f"{self.prefix}_{name} {read():g}")
+        with self._lock:
+            for name, series in self._values.items():
+                self._header(lines, name)
+                full_name = f"{self.prefix}_{name}"
+                if self._kinds.get(name) != "histogram":
+                    for labels, value in series.items():
+                        lines.append(f"{full_name}{_labels(labels)} {value:g}")
+                    continue
+                bounds = [f"{bound:g}" for bound in self._buckets[name]] + ["+Inf"]
+                for labels, counts in series.items():
+                    cumulative = 0
+                    for bound, count in zip(bounds, counts):
+                        cumulative += count
+                        lines.append(f"{full_name}_bucket{_labels(labels + (('le', bound),))} {cumulative}")
+                    lines.append(f"{full_name}_sum{_labels(labels)} {counts[-1]:g}")
+                    lines.append(f"{full_name}_count{_labels(labels)} {cumulative}")
+        return "\n".join(lines) + "\n"
+
+    def _header(self, lines: List[str], name: str) -> None:
+        full_name = f"{self.prefix}_{name}"
+        if name in self._help:
+            lines.append(f"# HELP {full_name} {self._help[name]}")
+        lines.append(f"# TYPE {full_name} {self._kinds.get(name, 'counter')}")
+
+def _labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{value}"' for key, value in labels) + "}"
+
+_metrics: Optional[MetricsRegistry] = None
+
+def default_metrics() -> MetricsRegistry:
+    """Returns the process-wide registry, with the solve and request metrics declared."""
+    global _metrics
+    if _metrics is None:
+        _metrics = MetricsRegistry()
+        _metrics.describe("solves_total", "Solves handled, by algorithm")
+        _metrics.describe("solve_errors_total", "Solves that returned an error, by algorithm")
+        for counter in SEARCH_COUNTERS:
+            _metrics.describe(f"{counter}_total", f"Search {counter} summed over solves, by algorithm")
+        _metrics.describe("phase_seconds_total", "Time spent in each solve phase, by algorithm")
+        _metrics.describe("solve_phase_seconds", "Duration of each solve phase", "histogram")
+        _metrics.describe("solve_latency_seconds", "Time to handle a solve (all phases), by algorithm, "
+                          "grid size class and directions", "histogram")
+        _metrics.describe("solve_search_seconds", "Time spent in the solver, by algorithm, grid size class "
+                          "and directions", "histogram")
+        _metrics.describe("solve_explored_cells", "Cells explored per solve, by algorithm, grid size class "
+                          "and directions", "histogram", VOLUME_BUCKETS)
+        _metrics.describe("http_request_duration_seconds", "HTTP request duration including the response body, "
+                          "by handler", "histogram")
+        _metrics.describe("http_responses_total", "HTTP responses, by handler and status")
+    return _metrics
@@ -0,0 +1,161 @@
+"""ALT landmark heuristics.
+
+The geometric heuristics of utils.get_heuristic only look at coordinates, so on
+weighted terrain or in winding mazes they badly underestimate the remaining
+cost and A* expands almost as much as Dijkstra. A landmark heuristic uses
+distances measured in the maze itself instead: the cost from a few landmark
+cells L to every cell is computed once, and by the triangle inequality
+
+    d(v, t) >= d(L, t) - d(L, v)
+    d(v, t) >= d(v, L) - d(t, L)
+
+for every cell v and goal t. The heuristic is the largest of these bounds over
+all landmarks (ALT: A*, landmarks and the triangle inequality). Moving into a
+cell costs its weight, so d(v, L) differs from d(L, v), but only by the weights
+of the two end cells: d(v, L) = d(L, v) - w(v) + w(L). One table per landmark
+therefore gives both bounds.
+
+Landmarks are picked per connected component by farthest-point selection: the
+first one is the cell farthest from an arbitrary cell of the component, every
+next one the cell farthest from all landmarks picked so far. This spreads them
+along the rim of the component, where their bounds are tightest. The tables
+(int32 costs, -1 outside the component) are cached on the grid per
+(directions, component), so only the first query on a maze pays for the
+LANDMARK_COUNT searches.
+
+The bounds are consistent, so astar keeps finding optimal paths with them, and
+they are integers, so the bucket frontier can use them as they are.
+"""
+
+from array import array
+from typing import Callable, List, Optional
+from grid import Grid
+from components import components
+from distance_field import distance_field
+from multi_target import cost_tree
+
+# Landmarks picked per component
+LANDMARK_COUNT = 8
+
+class Landmarks:
+    """Landmarks of one component of a maze with their distance tables.
+
+    Args:
+        cells (List[int]): Landmark cell ids
+        tables (List[array]): Cost from each landmark to every cell id, -1 for cells it cannot reach
+    """
+    def __init__(self, cells: List[int], tables: List[array]):
+        self.cells = cells
+        self.tables = tables
+
+    def nbytes(self) -> int:
+        return sum(table.itemsize * len(table) for table in self.tables)
+
+def landmark_distances(grid: Grid, source: int, directions: int) -> array:
+    """Cost from source to every cell (BFS steps, or Dijkstra over the weights), -1 where unreached."""
+    if grid.weights is None:
+        distance = distance_field(grid, source, directions)
+        return distance if isinstance(distance, array) else array('i', distance.tobytes())
+    distance = cost_tree(source, grid, directions, frontier="bucket")[0]
+    # Keep the table compact unless the costs do not fit in 32 bits
+    return array('i', distance) if max(distance) < 2 ** 31 else distance
+
+def select_landmarks(grid: Grid, directions: int, seed: int, count: int = LANDMARK_COUNT) -> Landmarks:
+    """Picks up to count landmarks in the component of seed by farthest-point selection.
+
+    Args:
+        grid (Grid): Flattened maze (blocked cells and optional weights)
+        directions (int): Number of possible movement directions (4 or 8)
+        seed (int): Any open cell of the component
+        count (int, optional): Number of landmarks. Defaults to LANDMARK_COUNT
+
+    Returns:
+        Landmarks: The landmarks (fewer than count if the component is too small)
+    """
+    cells: List[int] = []
+    tables: List[array] = []
+    nearest = None
+    farthest = _farthest(landmark_distances(grid, seed, directions))
+    while farthest is not None and len(cells) < count:
+        table = landmark_distances(grid, farthest, directions)
+        cells.append(farthest)
+        tables.append(table)
+        # Distance of every cell to its nearest landmark
+        nearest = table if nearest is None else array('q', map(min, nearest, table))
+        farthest = _farthest(nearest)
+    return Landmarks(cells, tables)
+
+def _farthest(distance: array) -> Optional[int]:
+    farthest = max(distance)
+    return distance.index(farthest) if farthest > 0 else None
+
+def landmarks(grid: Grid, directions: int, cell: int) -> Optional[Landmarks]:
+    """Returns the landmarks of the component of a cell, selecting and caching them on first use.
+
+    Returns:
+        Optional[Landmarks]: The landmarks, or None for a blocked cell
+    """
+    labels = components(grid, directions)
+    label = labels[cell]
+    if label == 0:
+        return None
+    return grid.derived(("landmarks", directions, label),
+                        lambda: select_landmarks(grid, directions, labels.index(label)))
+
+def landmark_heuristic(grid: Grid, goal: int, directions: int, reverse: bool = False) -> Callable[[int], int]:
+    """Returns the ALT heuristic function estimating the cost from a cell id to goal.
+
+    Args:
+        grid (Grid): Flattened maze (blocked cells and optional weights)
+        goal (int): Goal cell id
+        directions (int): Number of possible movement directions (4 or 8)
+        reverse (bool, optional): Estimate the cost from goal to the cell instead, as a search
+            running backwards towards goal needs. Defaults to False
+
+    Returns:
+        Callable[[int], int]: Lower bound of the cost from a cell to goal (0 for cells
+            outside the goal's component)
+    """
+    found = landmarks(grid, directions, goal)
+    if found is None:
+        return lambda cell: 0
+    weights = grid.weights
+    goal_cost = weights[goal] if weights is not None else 1
+    # Per landmark: its table, d(L, goal), and d(goal, L) - w(L)
+    bounds = [(table, table[goal], table[goal] - goal_cost) for table in found.tables]
+
+    def h(cell: int) -> int:
+        cost = weights[cell] if weights is not None else 1
+        best = 0
+        for table, to_goal, from_goal in bounds:
+            distance = table[cell]
+            if distance < 0:
+                return 0
+            # d(L, goal) - d(L, cell)
+            bound = to_goal - distance
+            if bound > best:
+                best = bound
+            # d(cell, L) - d(goal, L)
+            bound = distance - cost - from_goal
+            if bound > best:
+                best = bound
+        return best
+
+    def h_reverse(cell: int) -> int:
+        cost = weights[cell] if weights is not None else 1
+        best = 0
+        for table, to_goal, from_goal in bounds:
+            distance = table[cell]
+            if distance < 0:
+                return 0
+            # d(L, cell) - d(L, goal)
+            bound = distance - to_goal
+            if bound > best:
+                best = bound
+            # d(goal, L) - d(cell, L)
+            bound = from_goal - distance + cost
+            if bound > best:
+                best = bound
+        return best
+
+    return h_reverse if reverse else h
@@ -0,0 +1,168 @@
+"""Deterministic maze corpus for benchmarking the solvers.
+
+Every maze is generated from its kind, size and seed alone, so two checkouts
+that build the corpus with the same parameters benchmark the exact same mazes
+(the report records each maze's digest to prove it). The kinds cover the shapes
+the solvers behave differently on:
+
+    open         no obstacles at all
+    random       independent obstacles at a given density (may have no path)
+    backtracker  perfect maze carved by a randomized depth-first search: one
+                 long winding corridor system with a single path between cells
+    rooms        rectangular rooms joined in a chain by one-cell corridors
+    weighted     open terrain with a few obstacles and smooth cell weights 1..9
+
+Mazes are built straight into the padded buffers of Grid, so large sizes
+(thousands of cells per side) do not go through nested lists.
+"""
+
+import random
+from array import array
+from dataclasses import dataclass
+from typing import Iterator, List, Optional, Sequence, Tuple
+from grid import Grid
+
+KINDS = ("open", "random", "backtracker", "rooms", "weighted")
+DEFAULT_DENSITIES = (0.1, 0.25, 0.35)
+
+@dataclass
+class CorpusMaze:
+    name: str
+    kind: str
+    size: int
+    seed: int
+    density: Optional[float]
+    grid: Grid
+    start: int
+    end: int
+
+def generate(kind: str, size: int, seed: int = 0, density: float = 0.25) -> CorpusMaze:
+    """Generates one maze of the corpus.
+
+    Args:
+        kind (str): One of KINDS
+        size (int): Number of cells per side
+        seed (int, optional): Seed of the generator. Defaults to 0
+        density (float, optional): Obstacle density of "random" mazes. Defaults to 0.25
+
+    Returns:
+        CorpusMaze: The maze with its start (top-left) and end (bottom-right) cell ids
+    """
+    if size < 2:
+        raise ValueError("Corpus mazes need at least 2 cells per side")
+    # Seeding with the parameters keeps mazes of different kinds and sizes unrelated
+    rng = random.Random(f"{kind}:{size}:{seed}:{density}")
+    weights = None
+    start, end = (0, 0), (size - 1, size - 1)
+    if kind == "open":
+        cells = bytearray(size * size)
+    elif kind == "random":
+        cells = _random_obstacles(size, density, rng)
+    elif kind == "backtracker":
+        cells = _backtracker(size, rng)
+        # Corridors run along even coordinates
+        last = size - 1 - (size - 1) % 2
+        end = (last, last)
+    elif kind == "rooms":
+        cells, start, end = _rooms(size, rng)
+    elif kind == "weighted":
+        cells = _random_obstacles(size, 0.05, rng)
+        weights = _terrain(size, rng)
+    else:
+        raise ValueError(f"Unknown maze kind: {kind}")
+
+    for x, y in (start, end):
+        cells[x * size + y] = 0
+    grid = _to_grid(size, cells, weights)
+    name = f"{kind}-{density:g}-{size}" if kind == "random" else f"{kind}-{size}"
+    return CorpusMaze(name, kind, size, seed, density if kind == "random" else None, grid,
+                      grid.cell(*start), grid.cell(*end))
+
+def corpus(sizes: Sequence[int], kinds: Sequence[str] = KINDS, densities: Sequence[float] = DEFAULT_DENSITIES,
+           seed: int = 0) -> Iterator[CorpusMaze]:
+    """Generates the corpus lazily, size by size, so only one maze needs to be in memory at a time."""
+    for size in sizes:
+        for kind in kinds:
+            for density in (densities if kind == "random" else (0.25,)):
+                yield generate(kind, size, seed, density)
+
+def _to_grid(size: int, cells: bytearray, weights: Optional[array]) -> Grid:
+    """Pads row-major cells (1 = blocked) and weights into a Grid."""
+    width = size + 2
+    blocked = bytearray(b"\x01") * (width * width)
+    flat_weights = array('H', bytes(2 * width * width)) if weights is not None else None
+    for x in range(size):
+        base = (x + 1) * width + 1
+        blocked[base:base + size] = cells[x * size:(x + 1) * size]
+        if weights is not None:
+            flat_weights[base:base + size] = weights[x * size:(x + 1) * size]
+    return Grid(size, blocked, flat_weights)
+
+def _random_obstacles(size: int, density: float, rng: random.Random) -> bytearray:
+    random_value = rng.random
+    return bytearray(random_value() < density for _ in range(size * size))
+
+def _backtracker(size: int, rng: random.Random) -> bytearray:
+    # Cells at even coordinates are rooms of the maze; the cells between two of them are walls to carve
+    cells = bytearray(b"\x01") * (size * size)
+    side = (size + 1) // 2
+    visited = bytearray(side * side)
+    moves = ((1, 0), (-1, 0), (0, 1), (0, -1))
+    stack = [(0, 0)]
+    visited[0] = 1
+    cells[0] = 0
+    while stack:
+        i, j = stack[-1]
+        options = [(i + di, j + dj) for di, dj in moves
+                   if 0 <= i + di < side and 0 <= j + dj < side and not visited[(i + di) * side + j + dj]]
+        if not options:
+            stack.pop()
+            continue
+        ni, nj = options[rng.randrange(len(options))]
+        visited[ni * side + nj] = 1
+        # Open the new room and the wall between it and the current one
+        cells[2 * ni * size + 2 * nj] = 0
+        cells[(i + ni) * size + j + nj] = 0
+        stack.append((ni, nj))
+    return cells
+
+def _rooms(size: int, rng: random.Random) -> Tuple[bytearray, Tuple[int, int], Tuple[int, int]]:
+    cells = bytearray(b"\x01") * (size * size)
+    max_side = max(2, min(12, size // 4))
+    count = max(2, (size // 10) ** 2 // 2)
+    centers: List[Tuple[int, int]] = []
+    for _ in range(count):
+        height = rng.randint(2, max_side)
+        width = rng.randint(2, max_side)
+        x = rng.randint(0, max(0, size - height))
+        y = rng.randint(0, max(0, size - width))
+        for row in range(x, min(size, x + height)):
+            cells[row * size + y:row * size + min(size, y + width)] = bytes(min(size, y + width) - y)
+        centers.append((min(size - 1, x + height // 2), min(size - 1, y + width // 2)))
+
+    # Chain the rooms in sweep order with L-shaped corridors, which keeps every room reachable
+    centers.sort(key=lambda c: (c[0] // max_side, c[1] if (c[0] // max_side) % 2 == 0 else -c[1]))
+    centers = [(0, 0)] + centers + [(size - 1, size - 1)]
+    for (x1, y1), (x2, y2) in zip(centers, centers[1:]):
+        for x in range(min(x1, x2), max(x1, x2) + 1):
+            cells[x * size + y1] = 0
+        row = x2 * size
+        cells[row + min(y1, y2):row + max(y1, y2) + 1] = bytes(abs(y2 - y1) + 1)
+    return cells, centers[0], centers[-1]
+
+def _terrain(size: int, rng: random.Random, scale: int = 16) -> array:
+    # Value noise: random heights on a coarse lattice, interpolated bilinearly in between
+    side = size // scale + 2
+    lattice = [[rng.random() for _ in range(side)] for _ in range(side)]
+    weights = array('H', bytes(2 * size * size))
+    for x in range(size):
+        i, fx = divmod(x, scale)
+        tx = fx / scale
+        top, bottom = lattice[i], lattice[i + 1]
+        row = [a + (b - a) * tx for a, b in zip(top, bottom)]
+        base = x * size
+        for y in range(size):
+            j, fy = divmod(y, scale)
+            value = row[j] + (row[j + 1] - row[j]) * (fy / scale)
+            weights[base + y] = 1 + int(value * 8.999)
+    return weights
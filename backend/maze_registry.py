@@ -0,0 +1,146 @@
+"""Registry of flattened mazes keyed by content digest.
+
+Clients usually solve the same maze many times with different endpoints or
+algorithms. Registering a Grid returns its maze id (Grid.digest); later
+requests can refer to the maze by id, and any data derived from it (see
+Grid.derived) is kept alongside it. Derived data is charged as soon as it is
+added (Grid.on_grow), and objects shared between entries, such as the buffers
+and labels a maze shares with its unweighted view, are charged once. Once the
+total size exceeds the memory budget, the disposable derived data of the mazes
+(see grid.DISPOSABLE) is dropped first, least recently used maze first, and
+then whole entries are evicted least recently used first.
+
+Every process has its own default registry: the server's holds uploaded mazes,
+and each solver worker interns the grids it receives so that derived data
+survives between calls handled by the same worker.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+from grid import Grid
+
+class MazeRegistry:
+    """LRU cache of grids bounded by an approximate memory budget.
+
+    Args:
+        budget_bytes (int): Maximum total memory (see Grid.memory) kept in the registry
+    """
+    def __init__(self, budget_bytes: int):
+        self.budget_bytes = budget_bytes
+        self._grids: 'OrderedDict[str, Grid]' = OrderedDict()
+        # Objects held by every entry as last measured; keeping them also keeps their ids unique
+        self._memory: Dict[str, Dict[int, Tuple[Any, int]]] = {}
+        # Size charged for every object and the number of entries holding it
+        self._charged: Dict[int, int] = {}
+        self._holders: Dict[int, int] = {}
+        self._total = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._grids)
+
+    def __contains__(self, maze_id: str) -> bool:
+        return maze_id in self._grids
+
+    @property
+    def total_bytes(self) -> int:
+        return self._total
+
+    def get(self, maze_id: str) -> Optional[Grid]:
+        """Returns the grid registered under maze_id and marks it as recently used."""
+        with self._lock:
+            grid = self._grids.get(maze_id)
+            if grid is not None:
+                self._grids.move_to_end(maze_id)
+                # Derived data may have been added since the last access
+                self._resize(maze_id, grid)
+            return grid
+
+    def intern(self, grid: Grid) -> Grid:
+        """Registers a grid, returning the already registered instance if its content is known.
+
+        Args:
+            grid (Grid): Freshly built grid
+
+        Returns:
+            Grid: The registered grid with the same content (with its derived data)
+        """
+        maze_id = grid.digest
+        with self._lock:
+            existing = self._grids.get(maze_id)
+            if existing is not None:
+                self._grids.move_to_end(maze_id)
+                self._resize(maze_id, existing)
+                return existing
+            self._grids[maze_id] = grid
+            self._memory[maze_id] = {}
+            grid.on_grow = self._grown
+            self._resize(maze_id, grid)
+            return grid
+
+    def remove(self, maze_id: str) -> bool:
+        """Drops a maze from the registry. Returns False if it was not registered."""
+        with self._lock:
+            if maze_id not in self._grids:
+                return False
+            self._drop(maze_id)
+            return True
+
+    def _grown(self, grid: Grid) -> None:
+        """Charges derived data added to a registered grid (Grid.on_grow)."""
+        with self._lock:
+            maze_id = grid.digest
+            # Evicted grids may still be in use by a solver
+            if self._grids.get(maze_id) is grid:
+                self._resize(maze_id, grid)
+
+    def _resize(self, maze_id: str, grid: Grid) -> None:
+        self._measure(maze_id, grid)
+        if self._total > self.budget_bytes:
+            # Drop data that is cheap to rebuild before giving up any maze
+            for other_id, other in self._grids.items():
+                if other.drop_disposable():
+                    self._measure(other_id, other)
+                    if self._total <= self.budget_bytes:
+                        break
+        # Evict from the cold end; the entry just used sits at the hot end and is always kept
+        while self._total > self.budget_bytes and len(self._grids) > 1:
+            self._drop(next(iter(self._grids)))
+
+    def _drop(self, maze_id: str) -> None:
+        del self._grids[maze_id]
+        for key in self._memory.pop(maze_id):
+            self._release(key)
+
+    def _measure(self, maze_id: str, grid: Grid) -> None:
+        old = self._memory[maze_id]
+        new = grid.memory()
+        for key in old.keys() - new.keys():
+            self._release(key)
+        for key, (_, size) in new.items():
+            if key not in old:
+                self._holders[key] = self._holders.get(key, 0) + 1
+            self._total += size - self._charged.get(key, 0)
+            self._charged[key] = size
+        self._memory[maze_id] = new
+
+    def _release(self, key: int) -> None:
+        self._holders[key] -= 1
+        if not self._holders[key]:
+            del self._holders[key]
+            self._total -= self._charged.pop(key)
+
+_default_registry: Optional[MazeRegistry] = None
+_default_pid: Optional[int] = None
+
+def default_registry() -> MazeRegistry:
+    """Returns this process's registry, sized by the MAZE_CACHE_MB environment variable (default 256)."""
+    global _default_registry, _default_pid
+    # Forked workers inherit the parent's registry; give each process its own
+    if _default_registry is None or _default_pid != os.getpid():
+        budget = int(float(os.environ.get("MAZE_CACHE_MB", 256)) * 1024 * 1024)
+        _default_registry = MazeRegistry(budget)
+        _default_pid = os.getpid()
+    return _default_registry
@@ -1,29 +1,48 @@
 from typing import List, Dict, Any
 from utils import Pair
+from grid import Grid
 
 # Import all algorithms
 from algorithms.bfs import bfs
+from algorithms.bfs_vectorized import bfs_vectorized
 from algorithms.dfs import dfs
 from algorithms.dijkstra import dijkstra
 from algorithms.astar import astar
 from algorithms.iterative_deepening import iterative_deepening
+from algorithms.ida_star import ida_star
 from algorithms.bidirectional import bidirectional_search
+from algorithms.bidirectional_astar import bidirectional_dijkstra, bidirectional_astar
 from algorithms.local_beam import local_beam_search
-from algorithms.rrt import rrt
+from algorithms.rrt import rrt, rrt_star, rrt_connect
 from algorithms.greedy_best_first import greedy_best_first
 from algorithms.ucs import ucs
+from algorithms.jps import jps
+from algorithms.hpa import hpa, refine_path
+from algorithms.dstar_lite import dstar_lite, DStarLite
 
 # Re-export all algorithms and types
 __all__ = [
     'Pair',
+    'Grid',
     'bfs',
+    'bfs_vectorized',
     'dfs',
     'dijkstra',
     'astar',
     'iterative_deepening',
+    'ida_star',
     'bidirectional_search',
+    'bidirectional_dijkstra',
+    'bidirectional_astar',
     'local_beam_search',
     'rrt',
+    'rrt_star',
+    'rrt_connect',
     'greedy_best_first',
-    'ucs'
+    'ucs',
+    'jps',
+    'hpa',
+    'refine_path',
+    'dstar_lite',
+    'DStarLite'
 ] 
\ No newline at end of file
@@ -0,0 +1,63 @@
+"""Independent runs of the sampling planners.
+
+RRT finds a path with some probability within its iteration budget, and the
+path it finds depends on its samples. Growing several trees with different
+seeds at once, one per solver worker, raises the chance of success and lowers
+the expected time to the first path: the caller keeps either the cheapest path
+of all runs ("best") or the first path found ("first"). Every run is seeded
+from one base seed, so the whole set can be replayed.
+"""
+
+import secrets
+from typing import Any, Dict, List, Optional, Sequence
+
+# Solvers whose result depends on their random seed
+SAMPLING_SOLVERS = ("rrt", "rrt_star", "rrt_connect")
+PICK_MODES = ("best", "first")
+
+def run_seeds(seed: Optional[int], runs: int) -> List[int]:
+    """Returns the seeds of runs consecutive runs, drawing the base seed when none is given."""
+    if seed is None:
+        seed = secrets.randbits(32)
+    return [seed + i for i in range(runs)]
+
+def combine_runs(results: Sequence[Optional[Dict[str, Any]]], seeds: Sequence[int], pick: str,
+                 finished: Sequence[int]) -> Dict[str, Any]:
+    """Picks the result of one run and adds metrics describing all of them.
+
+    Args:
+        results (Sequence[Optional[Dict[str, Any]]]): Result of every run, None for runs stopped before finishing
+        seeds (Sequence[int]): Seed of every run
+        pick (str): "best" keeps the path with the smallest path_cost, "first" the path that finished first
+        finished (Sequence[int]): Indices of the finished runs, in the order they finished
+
+    Returns:
+        Dict[str, Any]: The picked result (the first finished run if none found a path), whose
+            metrics also contain:
+            - runs: Number of runs started
+            - completed_runs: Number of runs that finished
+            - successful_runs: Number of runs that found a path
+            - success_rate: successful_runs / completed_runs
+            - run_iterations: Iterations of every run (None if stopped before finishing)
+            - run_seeds: Seed of every run
+            - picked_run: Index of the picked run
+    """
+    successful = [i for i in finished if results[i]["path"] is not None]
+    if not successful:
+        picked = finished[0]
+    elif pick == "first":
+        picked = successful[0]
+    else:
+        picked = min(successful, key=lambda i: (results[i]["metrics"]["path_cost"], i))
+
+    result = results[picked]
+    result["metrics"].update({
+        "runs": len(seeds),
+        "completed_runs": len(finished),
+        "successful_runs": len(successful),
+        "success_rate": len(successful) / len(finished),
+        "run_iterations": [r["metrics"]["iterations"] if r is not None else None for r in results],
+        "run_seeds": list(seeds),
+        "picked_run": picked
+    })
+    return result
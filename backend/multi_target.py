@@ -0,0 +1,121 @@
+"""Shortest paths from one source to many targets with a single search.
+
+Batches often ask for routes that share a start cell. For the exact
+single-source solvers (bfs, bfs_vectorized, dijkstra, ucs) all of those routes
+can be read off one search tree that keeps growing until every target has been
+settled, instead of searching from scratch once per target.
+"""
+
+import time
+from array import array
+from typing import Any, Dict, Optional, Sequence, Tuple
+from frontier import make_frontier
+from grid import Grid, reconstruct_path, new_parent_array
+from distance_field import distance_field, path_from_field, reached_count
+from instrumentation import elapsed_ms
+
+# Solvers whose answer is a shortest path in steps, and in total cost
+STEP_SOLVERS = ("bfs", "bfs_vectorized")
+COST_SOLVERS = ("dijkstra", "ucs")
+
+def search_kind(algorithm: str, grid: Grid) -> str:
+    """Returns "steps" or "cost" for the solvers that multi_target can stand in for, "" otherwise.
+
+    On a grid without weights, cheapest and shortest paths are the same, so all of
+    them share one kind.
+    """
+    if algorithm in STEP_SOLVERS or (algorithm in COST_SOLVERS and grid.weights is None):
+        return "steps"
+    if algorithm in COST_SOLVERS:
+        return "cost"
+    return ""
+
+def multi_target(source: int, targets: Sequence[int], grid: Grid, directions: int, kind: str) -> Dict[int, Dict[str, Any]]:
+    """Finds the shortest paths from source to every target with one search.
+
+    Args:
+        source (int): Starting cell id shared by all queries
+        targets (Sequence[int]): Goal cell ids
+        grid (Grid): Flattened maze (blocked cells and optional weights)
+        directions (int): Number of possible movement directions (4 or 8)
+        kind (str): "steps" to minimize the number of steps, "cost" to minimize the sum of weights
+
+    Returns:
+        Dict[int, Dict[str, Any]]: A solver result for every target, see dijkstra. The
+            exploration order is left empty and explored_size and time_taken_ms describe
+            the shared search; metrics["shared_search"] is the number of targets it served.
+    """
+    start_time = time.perf_counter_ns()
+    if kind == "steps":
+        distance = distance_field(grid, source, directions, targets=targets)
+        explored_size = reached_count(distance)
+        paths = {target: path_from_field(grid, distance, source, target, directions) for target in targets}
+    else:
+        _, parent, explored_size = cost_tree(source, grid, directions, targets)
+        paths = {target: reconstruct_path(parent, target) if target == source or parent[target] != -1 else None
+                 for target in targets}
+    time_taken_ms = elapsed_ms(start_time)
+
+    results = {}
+    for target, path in paths.items():
+        results[target] = {
+            "path": path,
+            "exploration_order": [],
+            "metrics": {
+                "explored_size": explored_size,
+                "frontier_size": 0,
+                "time_taken_ms": time_taken_ms,
+                "path_length": len(path) - 1 if path is not None else 0,
+                "total_cost": (grid.path_cost(path) if kind == "cost" else len(path) - 1) if path is not None else 0,
+                "shared_search": len(paths)
+            }
+        }
+    return results
+
+def cost_tree(source: int, grid: Grid, directions: int, targets: Optional[Sequence[int]] = None,
+              frontier: str = "heap") -> Tuple[array, array, int]:
+    """Runs Dijkstra from source until every target is settled, or the whole component without targets.
+
+    Args:
+        source (int): Source cell id
+        grid (Grid): Flattened maze (blocked cells and optional weights)
+        directions (int): Number of possible movement directions (4 or 8)
+        targets (Sequence[int], optional): Cell ids to stop after. Defaults to None
+        frontier (str, optional): Priority queue of the search, "heap" or "bucket". Defaults to "heap"
+
+    Returns:
+        Tuple[array, array, int]: Cost from source and parent cell id of every cell (-1 for
+            unreached cells, and as the parent of the source), and the number of cells
+            settled. Entries of cells that were reached but not settled are provisional.
+    """
+    blocked = grid.blocked
+    weights = grid.weights
+    offsets = grid.offsets(directions)
+    visited = bytearray(len(blocked))
+    parent = new_parent_array(grid)
+    distance = array('q', [-1]) * len(blocked)
+    pending = set(targets) if targets is not None else None
+    if pending is not None:
+        pending.discard(source)
+    pq = make_frontier(frontier, len(blocked))
+    pq.push(source, 0)
+    distance[source] = 0
+    settled = 0
+
+    while pq and (pending is None or pending):
+        current = pq.pop()
+        visited[current] = 1
+        settled += 1
+        if pending is not None:
+            pending.discard(current)
+
+        for offset in offsets:
+            neighbor = current + offset
+            if not visited[neighbor] and not blocked[neighbor]:
+                new_distance = distance[current] + (weights[neighbor] if weights is not None else 1)
+                if distance[neighbor] == -1 or new_distance < distance[neighbor]:
+                    distance[neighbor] = new_distance
+                    parent[neighbor] = current
+                    pq.push(neighbor, new_distance)
+
+    return distance, parent, settled
@@ -0,0 +1,89 @@
+"""Replanning sessions.
+
+A session keeps a D* Lite planner alive between requests so that a client
+editing a few walls and solving again only pays for repairing the affected
+part of the search. Planners hold per-cell tables (some 40 to 80 bytes per
+cell), so both the number of live sessions and their total number of cells
+are bounded: least recently used sessions are dropped once a bound is
+exceeded, and a maze larger than the cell bound is refused outright.
+
+Sessions live in the server process (a planner cannot follow requests around
+the solver pool); their searches run on a thread so the event loop stays free.
+Requests to the same session are serialized.
+"""
+
+import os
+import threading
+import uuid
+from collections import OrderedDict
+from typing import Optional, Tuple
+from algorithms.dstar_lite import DStarLite
+
+class ReplanningSessions:
+    """LRU-bounded store of D* Lite planners keyed by session id.
+
+    Args:
+        max_sessions (int): Maximum number of live sessions
+        max_cells (int): Maximum number of maze cells over all live sessions
+    """
+    def __init__(self, max_sessions: int, max_cells: int):
+        self.max_sessions = max_sessions
+        self.max_cells = max_cells
+        self.cells = 0
+        self._sessions: 'OrderedDict[str, Tuple[DStarLite, threading.Lock]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def check_size(self, size: int) -> None:
+        """Raises ValueError if a session for a size x size maze would exceed the cell bound on its own."""
+        if size * size > self.max_cells:
+            raise ValueError(f"A {size}x{size} maze is too large for a replanning session "
+                             f"(at most {self.max_cells} cells)")
+
+    def create(self, planner: DStarLite) -> str:
+        """Stores a planner and returns its new session id.
+
+        Raises:
+            ValueError: If the maze of the planner exceeds the cell bound on its own
+        """
+        self.check_size(planner.grid.size)
+        session_id = uuid.uuid4().hex
+        with self._lock:
+            self._sessions[session_id] = (planner, threading.Lock())
+            self.cells += planner.grid.size * planner.grid.size
+            while len(self._sessions) > max(1, self.max_sessions) or self.cells > self.max_cells:
+                self._drop(next(iter(self._sessions)))
+        return session_id
+
+    def get(self, session_id: str) -> Optional[Tuple[DStarLite, threading.Lock]]:
+        """Returns the planner of a session and the lock serializing its use, or None."""
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is not None:
+                self._sessions.move_to_end(session_id)
+            return session
+
+    def remove(self, session_id: str) -> bool:
+        """Drops a session. Returns False if it did not exist."""
+        with self._lock:
+            return self._drop(session_id)
+
+    def _drop(self, session_id: str) -> bool:
+        session = self._sessions.pop(session_id, None)
+        if session is None:
+            return False
+        self.cells -= session[0].grid.size * session[0].grid.size
+        return True
+
+_sessions: Optional[ReplanningSessions] = None
+
+def default_sessions() -> ReplanningSessions:
+    """Returns the process-wide session store, sized by REPLAN_MAX_SESSIONS (default 32) and
+    REPLAN_MAX_CELLS (default 2,000,000)."""
+    global _sessions
+    if _sessions is None:
+        _sessions = ReplanningSessions(int(os.environ.get("REPLAN_MAX_SESSIONS", 32)),
+                                       int(os.environ.get("REPLAN_MAX_CELLS", 2_000_000)))
+    return _sessions
@@ -1,11 +1,32 @@
-from fastapi import FastAPI
+import asyncio
+import base64
+import json
+import queue
+import threading
+import time
+from fastapi import BackgroundTasks, FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
 from pydantic import BaseModel
-from typing import List, Optional
-from maze_solver import Pair, bfs, dfs, dijkstra, astar, iterative_deepening, bidirectional_search, local_beam_search, rrt, greedy_best_first, ucs
+from typing import Any, Dict, List, Optional, Tuple
+from executor import SolverExecutor, SolverOverloaded, SolverTimeout, SolveCancelled
+from grid_codec import decode_grid, grid_from_buffers
+from exploration import make_trace, pack_trace
+from maze_registry import default_registry
+from components import components, reachable
+from multi_target import multi_target, search_kind
+from distance_map import distance_map, encode_distance_map
+from replanning import default_sessions
+from multi_run import SAMPLING_SOLVERS, PICK_MODES, run_seeds, combine_runs
+from instrumentation import RequestTimer, default_metrics, elapsed_ms, memory_profile, record_phase
+from maze_solver import Grid, bfs, bfs_vectorized, dfs, dijkstra, astar, iterative_deepening, bidirectional_search, bidirectional_dijkstra, bidirectional_astar, local_beam_search, rrt, rrt_star, rrt_connect, greedy_best_first, ucs, jps, hpa, refine_path, dstar_lite, DStarLite, ida_star
 
 app = FastAPI()
 
+ALGORITHMS = ("bfs", "dfs", "dijkstra", "astar", "iterative_deepening", "bidirectional", "local_beam", "rrt",
+              "greedy_best_first", "ucs", "jps", "jps_plus", "hpa", "bfs_vectorized",
+              "dstar_lite", "ida_star", "rrt_star", "rrt_connect", "bidirectional_dijkstra", "bidirectional_astar")
+
 # Enable CORS
 app.add_middleware(
     CORSMiddleware,
@@ -14,89 +35,920 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# Stamps requests with their arrival time for the parse phase and records their duration (see instrumentation)
+app.add_middleware(RequestTimer, on_finish=default_metrics().record_request)
+
+# Solvers are CPU-bound; run them in a process pool so the event loop stays responsive
+solver_executor = SolverExecutor.from_env()
+
+default_metrics().gauge("solver_pending_calls", "Solver calls queued or running", lambda: solver_executor.pending)
+default_metrics().gauge("solver_max_pending_calls", "Bound on queued plus running solver calls",
+                        lambda: solver_executor.max_pending)
+default_metrics().gauge("solver_workers", "Solver worker processes", lambda: solver_executor.max_workers)
+default_metrics().gauge("registered_mazes", "Mazes held by the maze registry", lambda: len(default_registry()))
+default_metrics().gauge("replanning_sessions", "Live replanning sessions", lambda: len(default_sessions()))
 
-# Direction constants
-DX_4D = [0, 1, 0, -1]
-DY_4D = [1, 0, -1, 0]
-DX_8D = [0, 1, 1, 1, 0, -1, -1, -1]
-DY_8D = [1, 1, 0, -1, -1, -1, 0, 1]
+@app.on_event("shutdown")
+def shutdown_executor():
+    solver_executor.shutdown()
+
+class MazeUpload(BaseModel):
+    blocks: Optional[List[List[bool]]] = None
+    weights: Optional[List[List[int]]] = None
+    blocks_bitmap: Optional[str] = None
+    weights_raster: Optional[str] = None
+    weights_dtype: Optional[str] = "uint8"
+    size: int
+
+class MazeInfo(BaseModel):
+    maze_id: str
+    size: int
+    weighted: bool
 
 class SolveRequest(BaseModel):
     start: List[int]
     end: List[int]
-    blocks: List[List[bool]]
+    # Id returned by POST /mazes; replaces blocks/weights/blocks_bitmap/weights_raster
+    maze_id: Optional[str] = None
+    blocks: Optional[List[List[bool]]] = None
     weights: Optional[List[List[int]]] = None
-    size: int
+    # Compact alternative to blocks/weights: base64 bit-packed blocks and weight raster (see grid_codec)
+    blocks_bitmap: Optional[str] = None
+    weights_raster: Optional[str] = None
+    weights_dtype: Optional[str] = "uint8"
+    size: Optional[int] = None
     directions: int
     algorithm: str
+    # Index into utils.get_heuristic, or 7 for landmarks (ALT, see landmarks.py) with astar, greedy_best_first,
+    # local_beam, ida_star, jps and bidirectional_astar
     heuristic_type: Optional[int] = 0
     beam_width: Optional[int] = 5
     is_weighted: Optional[bool] = False
+    # "full" (list of [x, y]), "none", "packed" (base64 delta/run-length buffer, see exploration.pack_trace)
+    exploration: Optional[str] = "full"
+    stream_batch_size: Optional[int] = 500
+    # hpa: cluster side length, and whether to refine the abstract waypoints into cells (see /solve/refine)
+    cluster_size: Optional[int] = 16
+    refine: Optional[bool] = True
+    # iterative_deepening: resume every iteration from the previous boundary instead of restarting
+    resume: Optional[bool] = True
+    # iterative_deepening, ida_star: maximum number of exploration entries (defaults to the number of cells)
+    max_trace: Optional[int] = None
+    # rrt, rrt_star, rrt_connect: number of samples, maximum distance per step and random seed
+    # (a fresh seed is drawn and reported in the metrics when omitted)
+    max_iterations: Optional[int] = 1000
+    step_size: Optional[float] = 1.0
+    seed: Optional[int] = None
+    # rrt, rrt_star, rrt_connect on /solve: number of independent runs spread over the solver workers
+    # (seeded seed, seed + 1, ...), keeping the cheapest path ("best") or the first one found ("first")
+    runs: Optional[int] = 1
+    pick: Optional[str] = "best"
+    # Trace allocations during the search (tracemalloc) and report metrics["peak_memory_bytes"]; slows the solver
+    profile_memory: Optional[bool] = False
+    # dijkstra, ucs, astar: priority queue of the search, "heap" or "bucket" (Dial's bucket queue, for the
+    # integer weights of the mazes; astar rounds the heuristic down)
+    frontier: Optional[str] = "heap"
+
+class RefineRequest(BaseModel):
+    maze_id: str
+    # Waypoints returned by an unrefined hpa solve, or any consecutive sub-list of them
+    waypoints: List[List[int]]
+    directions: int
+    is_weighted: Optional[bool] = False
+    heuristic_type: Optional[int] = 0
+    cluster_size: Optional[int] = 16
+
+class DistanceMapRequest(BaseModel):
+    source: List[int]
+    # The maze is given as in SolveRequest
+    maze_id: Optional[str] = None
+    blocks: Optional[List[List[bool]]] = None
+    weights: Optional[List[List[int]]] = None
+    blocks_bitmap: Optional[str] = None
+    weights_raster: Optional[str] = None
+    weights_dtype: Optional[str] = "uint8"
+    size: Optional[int] = None
+    directions: int
+    # Distances are sums of cell weights (Dijkstra) instead of step counts (BFS)
+    is_weighted: Optional[bool] = False
 
 class SolveResponse(BaseModel):
     path: Optional[List[List[int]]]
     exploration_order: List[List[int]]
+    exploration_packed: Optional[str] = None
     error: Optional[str] = None
+    maze_id: Optional[str] = None
     metrics: dict
 
+class ReplanRequest(BaseModel):
+    start: List[int]
+    end: List[int]
+    # The maze is given as in SolveRequest
+    maze_id: Optional[str] = None
+    blocks: Optional[List[List[bool]]] = None
+    weights: Optional[List[List[int]]] = None
+    blocks_bitmap: Optional[str] = None
+    weights_raster: Optional[str] = None
+    weights_dtype: Optional[str] = "uint8"
+    size: Optional[int] = None
+    directions: int
+    heuristic_type: Optional[int] = 0
+    is_weighted: Optional[bool] = False
+    # "full", "none" or "packed"; only the cells expanded by this call are reported
+    exploration: Optional[str] = "full"
+
+class CellChange(BaseModel):
+    x: int
+    y: int
+    # Properties left as None are unchanged
+    blocked: Optional[bool] = None
+    weight: Optional[int] = None
+
+class ReplanUpdate(BaseModel):
+    changes: List[CellChange] = []
+    # New position of the agent, e.g. after following part of the last path
+    start: Optional[List[int]] = None
+    exploration: Optional[str] = "full"
+
+class ReplanResponse(SolveResponse):
+    session_id: str
+
+class BatchQuery(BaseModel):
+    start: List[int]
+    end: List[int]
+    # Defaults to the algorithm of the batch
+    algorithm: Optional[str] = None
+
+class BatchRequest(BaseModel):
+    queries: List[BatchQuery]
+    # The maze and solver options are given once for the whole batch, as in SolveRequest
+    maze_id: Optional[str] = None
+    blocks: Optional[List[List[bool]]] = None
+    weights: Optional[List[List[int]]] = None
+    blocks_bitmap: Optional[str] = None
+    weights_raster: Optional[str] = None
+    weights_dtype: Optional[str] = "uint8"
+    size: Optional[int] = None
+    directions: int
+    algorithm: Optional[str] = "bfs"
+    heuristic_type: Optional[int] = 0
+    beam_width: Optional[int] = 5
+    is_weighted: Optional[bool] = False
+    cluster_size: Optional[int] = 16
+    refine: Optional[bool] = True
+    frontier: Optional[str] = "heap"
+
+class BatchResponse(BaseModel):
+    maze_id: str
+    # One entry per query, in request order; exploration is never returned for batches
+    results: List[SolveResponse]
+    metrics: dict
+
+def dispatch(algorithm: str, start: int, end: int, grid: Grid, directions: int, options: Dict[str, Any],
+             stream_queue=None) -> Dict[str, Any]:
+    """Runs the requested algorithm. Executed inside a solver worker process.
+
+    In "stream" exploration mode, batches of explored [x, y] cells are put on
+    stream_queue while the solver runs.
+    """
+    if algorithm not in ALGORITHMS:
+        raise ValueError(f"Unknown algorithm: {algorithm}")
+    # Reuse this worker's copy of the maze, if any, so derived data survives between calls
+    grid = default_registry().intern(grid)
+    mode = options.get("exploration", "full")
+    sink = None
+    if stream_queue is not None:
+        sink = lambda batch: stream_queue.put(grid.to_coordinates(batch))
+    trace = make_trace(mode, sink, options.get("stream_batch_size", 500))
+
+    phase_start = time.perf_counter_ns()
+    with memory_profile(options.get("profile_memory", False)) as memory:
+        result = run_algorithm(algorithm, start, end, grid, directions, options, trace)
+    metrics = result["metrics"]
+    phase_start = record_phase(metrics, "search", phase_start)
+    metrics.update(memory)
+    metrics.setdefault("counters", {}).setdefault("expansions", metrics["explored_size"])
+
+    if mode == "stream":
+        # Early exits return their own short list instead of using the trace
+        if result["exploration_order"] is not trace:
+            trace.extend(result["exploration_order"])
+        trace.flush()
+        result["exploration_order"] = []
+    else:
+        finish_exploration(result, mode, grid)
+    record_phase(metrics, "exploration", phase_start)
+    return result
+
+def run_algorithm(algorithm: str, start: int, end: int, grid: Grid, directions: int, options: Dict[str, Any],
+                  trace: List[int]) -> Dict[str, Any]:
+    """Calls the solver of an algorithm with its options."""
+    if reachable(grid, start, end, directions, build=False) is False:
+        # Start and end are in different components; no solver can connect them
+        result = unreachable_result()
+    elif algorithm == "bfs":
+        result = bfs(start, end, grid, directions, trace=trace)
+    elif algorithm == "dfs":
+        result = dfs(start, end, grid, directions, trace=trace)
+    elif algorithm == "dijkstra":
+        result = dijkstra(start, end, grid, directions, options.get("frontier", "heap"), trace=trace)
+    elif algorithm == "astar":
+        result = astar(start, end, grid, directions, options["heuristic_type"], options.get("frontier", "heap"),
+                       trace=trace)
+    elif algorithm == "iterative_deepening":
+        result = iterative_deepening(start, end, grid, directions, options.get("resume", True),
+                                     options.get("max_trace"), trace=trace)
+    elif algorithm == "bidirectional":
+        result = bidirectional_search(start, end, grid, directions, trace=trace)
+    elif algorithm == "bidirectional_dijkstra":
+        result = bidirectional_dijkstra(start, end, grid, directions, trace=trace)
+    elif algorithm == "bidirectional_astar":
+        result = bidirectional_astar(start, end, grid, directions, options["heuristic_type"], trace=trace)
+    elif algorithm == "local_beam":
+        result = local_beam_search(start, end, grid, directions, options["beam_width"], options["heuristic_type"],
+                                   trace=trace)
+    elif algorithm == "rrt":
+        result = rrt(start, end, grid, directions, options.get("step_size", 1.0), options.get("max_iterations", 1000),
+                     seed=options.get("seed"), trace=trace)
+    elif algorithm == "rrt_star":
+        result = rrt_star(start, end, grid, directions, options.get("step_size", 1.0),
+                          options.get("max_iterations", 1000), seed=options.get("seed"), trace=trace)
+    elif algorithm == "rrt_connect":
+        result = rrt_connect(start, end, grid, directions, options.get("step_size", 1.0),
+                             options.get("max_iterations", 1000), seed=options.get("seed"), trace=trace)
+    elif algorithm == "greedy_best_first":
+        result = greedy_best_first(start, end, grid, directions, options["heuristic_type"], trace=trace)
+    elif algorithm == "ucs":
+        result = ucs(start, end, grid, directions, options.get("frontier", "heap"), trace=trace)
+    elif algorithm == "jps":
+        result = jps(start, end, grid, directions, options["heuristic_type"], trace=trace)
+    elif algorithm == "jps_plus":
+        result = jps(start, end, grid, directions, options["heuristic_type"], plus=True, trace=trace)
+    elif algorithm == "hpa":
+        result = hpa(start, end, grid, directions, options["heuristic_type"], options.get("cluster_size", 16),
+                     options.get("refine", True), trace=trace)
+    elif algorithm == "bfs_vectorized":
+        result = bfs_vectorized(start, end, grid, directions, trace=trace)
+    elif algorithm == "dstar_lite":
+        result = dstar_lite(start, end, grid, directions, options["heuristic_type"], trace=trace)
+    elif algorithm == "ida_star":
+        result = ida_star(start, end, grid, directions, options["heuristic_type"], options.get("max_trace"), trace=trace)
+    else:
+        raise ValueError(f"Unknown algorithm: {algorithm}")
+    return result
+
+def finish_exploration(result: Dict[str, Any], mode: str, grid: Grid) -> None:
+    """Applies the "none" and "packed" exploration modes to a finished solver result."""
+    if mode == "none":
+        result["exploration_order"] = []
+    elif mode == "packed":
+        result["exploration_packed"] = pack_trace(result["exploration_order"], grid)
+        result["exploration_order"] = []
+
+def refine_waypoints(grid: Grid, directions: int, waypoints: List[int], options: Dict[str, Any]) -> Dict[str, Any]:
+    """Expands hpa waypoints into cells. Executed inside a solver worker process."""
+    grid = default_registry().intern(grid)
+    path = refine_path(grid, directions, waypoints, options["heuristic_type"], options["cluster_size"])
+    return {
+        "path": path,
+        "exploration_order": [],
+        "metrics": {
+            "explored_size": 0,
+            "frontier_size": 0,
+            "time_taken_ms": 0,
+            "path_length": len(path) - 1,
+            "total_cost": grid.path_cost(path),
+            "refined": True
+        }
+    }
+
+def solve_batch(grid: Grid, directions: int, units: List[Tuple[str, int, List[Tuple[int, int]]]],
+                options: Dict[str, Any]) -> Dict[str, Any]:
+    """Solves a share of a batch. Executed inside a solver worker process.
+
+    Every unit is (algorithm, start, [(query index, end), ...]). Units with several
+    ends whose algorithm multi_target can stand in for are answered by one shared
+    search; all other queries are dispatched one by one.
+
+    Returns:
+        Dict[str, Any]: "results" as (query index, solver result) pairs, where a failed
+            query's result is {"error": message}, plus the number of "searches" run and
+            their summed "explored_size" and "time_taken_ms"
+    """
+    grid = default_registry().intern(grid)
+    results = []
+    searches = explored_size = 0
+    time_taken_ms = 0.0
+    for algorithm, start, queries in units:
+        kind = search_kind(algorithm, grid)
+        if kind and len(queries) > 1:
+            targets = [end for _, end in queries if reachable(grid, start, end, directions, build=False) is not False]
+            shared = multi_target(start, targets, grid, directions, kind) if targets else {}
+            if shared:
+                metrics = next(iter(shared.values()))["metrics"]
+                searches += 1
+                explored_size += metrics["explored_size"]
+                time_taken_ms += metrics["time_taken_ms"]
+            for index, end in queries:
+                results.append((index, shared.get(end) or unreachable_result()))
+            continue
+        for index, end in queries:
+            try:
+                result = dispatch(algorithm, start, end, grid, directions, options)
+            except SolveCancelled:
+                raise
+            except Exception as e:
+                results.append((index, {"error": str(e)}))
+                continue
+            searches += 1
+            explored_size += result["metrics"]["explored_size"]
+            time_taken_ms += result["metrics"]["time_taken_ms"]
+            results.append((index, result))
+    return {"results": results, "searches": searches, "explored_size": explored_size, "time_taken_ms": time_taken_ms}
+
+def build_distance_map(grid: Grid, source: int, directions: int) -> bytes:
+    """Computes and encodes the distance map of a source. Executed inside a solver worker process."""
+    grid = default_registry().intern(grid)
+    distance, predecessors = distance_map(grid, source, directions, grid.weights is not None)
+    return encode_distance_map(grid, source, directions, distance, predecessors)
+
+def replan(planner: DStarLite, lock, mode: str, changes: List[Tuple[int, Optional[bool], Optional[int]]],
+           start: Optional[int] = None, timeout: Optional[float] = None) -> Dict[str, Any]:
+    """Applies edits to a replanning session and repairs its plan. Executed on a thread of the server process.
+
+    The thread cannot be interrupted, so the search stops by itself once timeout seconds
+    (waiting for the session included) have passed. The edits stay applied and the next
+    replan carries on with the search.
+    """
+    deadline_ns = time.perf_counter_ns() + int(timeout * 1e9) if timeout is not None else None
+    with lock:
+        changed = planner.update_cells(changes)
+        if start is not None:
+            planner.move_start(start)
+        try:
+            result = dstar_lite(planner.start, planner.end, planner.grid, planner.directions, trace=make_trace(mode),
+                                planner=planner, deadline_ns=deadline_ns)
+        except TimeoutError as e:
+            raise SolverTimeout(f"Replanning did not finish within {timeout:g}s: {e}")
+        result["metrics"]["changed_cells"] = changed
+        finish_exploration(result, mode, planner.grid)
+    return result
+
+def unreachable_result() -> Dict[str, Any]:
+    """Result returned without searching when start and end are in different components."""
+    return {
+        "path": None,
+        "exploration_order": [],
+        "metrics": {
+            "explored_size": 0,
+            "frontier_size": 0,
+            "time_taken_ms": 0,
+            "path_length": 0,
+            "total_cost": 0,
+            "unreachable": True
+        }
+    }
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Solve and request metrics of this process in the Prometheus text exposition format.
+
+    Histograms cover solve latency, solver time and explored cells per algorithm, grid
+    size class and direction count, the duration of each solve phase, and HTTP request
+    durations per handler; gauges report the solver queue depth and capacity.
+    """
+    return PlainTextResponse(default_metrics().render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/health")
+async def health():
+    return {"status": "ok", "pending_solves": solver_executor.pending}
+
+class UnknownMaze(LookupError):
+    """Raised when a request refers to a maze id that is not (or no longer) registered."""
+
+def build_grid(request, is_weighted: bool) -> Grid:
+    """Flattens the maze of a request, from either nested lists or the packed encoding.
+
+    Args:
+        request (SolveRequest | MazeUpload): Request carrying the maze
+        is_weighted (bool): Whether to keep the cell weights
+
+    Returns:
+        Grid: The flattened grid
+    """
+    if request.size is None:
+        raise ValueError("size is required")
+    if request.blocks_bitmap is not None:
+        raster = None
+        if is_weighted and request.weights_raster is not None:
+            raster = base64.b64decode(request.weights_raster)
+        return grid_from_buffers(request.size, base64.b64decode(request.blocks_bitmap), raster, request.weights_dtype)
+    if request.blocks is None:
+        raise ValueError("Either blocks or blocks_bitmap is required")
+    weights = request.weights if is_weighted else None
+    return Grid.from_lists(request.blocks, request.size, weights)
+
+def resolve_grid(request: SolveRequest) -> Grid:
+    """Returns the registered grid for a solve request, building and registering it if needed."""
+    registry = default_registry()
+    if request.maze_id is not None:
+        grid = registry.get(request.maze_id)
+        if grid is None:
+            raise UnknownMaze(f"Unknown maze id {request.maze_id}; upload the maze again")
+        if not request.is_weighted:
+            grid = registry.intern(grid.without_weights())
+        return grid
+    return registry.intern(build_grid(request, request.is_weighted))
+
+def parse_point(value: str) -> List[int]:
+    """Parses an "x,y" query parameter."""
+    x, y = value.split(",")
+    return [int(x), int(y)]
+
+NO_PATH = "No path found"
+
+def error_response(message: str) -> SolveResponse:
+    return SolveResponse(
+        path=None,
+        exploration_order=[],
+        error=message,
+        metrics={
+            "explored_size": 0,
+            "frontier_size": 0,
+            "time_taken_ms": 0,
+            "path_length": 0,
+            "total_cost": 0
+        }
+    )
+
+def to_response(result: Dict[str, Any], grid: Grid) -> SolveResponse:
+    """Converts a solver result from cell ids back to the coordinates returned by the API."""
+    metrics = result["metrics"]
+    phase_start = time.perf_counter_ns()
+    path = grid.to_coordinates(result["path"]) if result["path"] is not None else None
+    phase_start = record_phase(metrics, "path", phase_start)
+    packed = result.get("exploration_packed")
+    response = SolveResponse(
+        path=path,
+        exploration_order=grid.to_coordinates(result["exploration_order"]),
+        exploration_packed=base64.b64encode(packed).decode() if packed is not None else None,
+        error=NO_PATH if result["path"] is None else None,
+        maze_id=grid.digest,
+        metrics=metrics
+    )
+    record_phase(response.metrics, "serialization", phase_start)
+    return response
+
+def solve_options(request: SolveRequest) -> Dict[str, Any]:
+    return {
+        "heuristic_type": request.heuristic_type,
+        "beam_width": request.beam_width,
+        "exploration": request.exploration,
+        "stream_batch_size": request.stream_batch_size,
+        "cluster_size": request.cluster_size,
+        "refine": request.refine,
+        "resume": request.resume,
+        "max_trace": request.max_trace,
+        "max_iterations": request.max_iterations,
+        "step_size": request.step_size,
+        "seed": request.seed,
+        "runs": request.runs,
+        "pick": request.pick,
+        "profile_memory": request.profile_memory,
+        "frontier": request.frontier
+    }
+
+async def run_solve(grid: Grid, start_xy: List[int], end_xy: List[int], algorithm: str, directions: int,
+                    options: Dict[str, Any], http_request: Request,
+                    phases: Optional[Dict[str, float]] = None) -> SolveResponse:
+    """Solves one query on an already built grid and converts the result back to coordinates.
+
+    phases holds the durations of the phases that ran before (see instrumentation); they
+    are reported first in metrics["phases_ms"].
+    """
+    try:
+        start = grid.cell(start_xy[0], start_xy[1])
+        end = grid.cell(end_xy[0], end_xy[1])
+    except Exception as e:
+        response = error_response(str(e))
+    else:
+        if algorithm in ALGORITHMS and reachable(grid, start, end, directions, build=False) is False:
+            # Answered from labels already cached in this process, without a worker round-trip
+            response = to_response(unreachable_result(), grid)
+        elif algorithm in SAMPLING_SOLVERS and options.get("runs") not in (None, 1):
+            response = await run_sampling(grid, algorithm, start, end, directions, options, http_request)
+        else:
+            response = await run_in_pool(grid, http_request, dispatch, algorithm, start, end, grid, directions,
+                                         options)
+    if phases:
+        response.metrics["phases_ms"] = {**phases, **response.metrics.get("phases_ms", {})}
+    record_solve(algorithm, grid.size, directions, response)
+    return response
+
+def record_solve(algorithm: str, grid_size: Optional[int], directions: int, response: SolveResponse) -> None:
+    """Adds a solve response to the /metrics totals."""
+    # Unknown names come from clients; keep them out of the label values
+    label = algorithm if algorithm in ALGORITHMS else "unknown"
+    default_metrics().record_solve(label, grid_size, directions, response.metrics,
+                                   response.error if response.error != NO_PATH else None)
+
+async def run_sampling(grid: Grid, algorithm: str, start: int, end: int, directions: int,
+                       options: Dict[str, Any], http_request: Request) -> SolveResponse:
+    """Runs independent, differently seeded runs of a sampling planner in parallel and combines them."""
+    start_time = time.perf_counter_ns()
+    runs, pick = options["runs"], options.get("pick") or "best"
+    if runs < 1:
+        return error_response("runs must be at least 1")
+    if pick not in PICK_MODES:
+        return error_response(f"Unknown pick mode: {pick}")
+    if runs > solver_executor.max_pending - solver_executor.pending:
+        raise HTTPException(status_code=503, detail=f"Not enough solver capacity for {runs} runs")
+
+    seeds = run_seeds(options.get("seed"), runs)
+    tasks = [
+        asyncio.ensure_future(solver_executor.run(dispatch, algorithm, start, end, grid, directions,
+                                                  {**options, "seed": seed},
+                                                  is_disconnected=http_request.is_disconnected))
+        for seed in seeds
+    ]
+    results: List[Optional[Dict[str, Any]]] = [None] * runs
+    finished: List[int] = []
+    try:
+        waiting = set(tasks)
+        while waiting:
+            done, waiting = await asyncio.wait(waiting, return_when=asyncio.FIRST_COMPLETED)
+            for index in sorted(tasks.index(task) for task in done):
+                results[index] = tasks[index].result()
+                finished.append(index)
+            if pick == "first" and any(results[i]["path"] is not None for i in finished):
+                break
+    except Exception as e:
+        raise_pool_error(e)
+        return error_response(str(e))
+    finally:
+        # Stops the runs that are no longer needed
+        for task in tasks:
+            task.cancel()
+
+    result = combine_runs(results, seeds, pick, finished)
+    result["metrics"]["wall_time_ms"] = elapsed_ms(start_time)
+    return to_response(result, grid)
+
+async def run_in_pool(grid: Grid, http_request: Request, fn, *args) -> SolveResponse:
+    """Runs a worker function in the solver pool and converts its result, mapping pool errors to HTTP errors."""
+    try:
+        call_start = time.perf_counter_ns()
+        result = await solver_executor.run(fn, *args, is_disconnected=http_request.is_disconnected)
+        metrics = result["metrics"]
+        # Whatever the call took beyond the phases timed in the worker went to the pool
+        worker_ms = sum(metrics.get("phases_ms", {}).values())
+        record_phase(metrics, "pool", call_start)
+        metrics["phases_ms"]["pool"] = max(0.0, metrics["phases_ms"]["pool"] - worker_ms)
+        return to_response(result, grid)
+    except Exception as e:
+        raise_pool_error(e)
+        return error_response(str(e))
+
+def raise_pool_error(error: Exception) -> None:
+    """Raises the HTTP error for a solver pool failure; returns for errors raised by the solver itself."""
+    if isinstance(error, SolverOverloaded):
+        raise HTTPException(status_code=503, detail=str(error))
+    if isinstance(error, SolverTimeout):
+        raise HTTPException(status_code=504, detail=str(error))
+    if isinstance(error, SolveCancelled):
+        # The client is gone; 499 mirrors nginx's "client closed request"
+        raise HTTPException(status_code=499, detail=str(error))
+
 @app.post("/solve", response_model=SolveResponse)
-async def solve_maze(request: SolveRequest):
+async def solve_maze(request: SolveRequest, http_request: Request):
+    timings: Dict[str, Any] = {}
+    phase_start = record_phase(timings, "parse", received_ns(http_request))
+    try:
+        # Flatten the maze once; solvers work on integer cell ids from here on
+        grid = resolve_grid(request)
+    except UnknownMaze as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        response = error_response(str(e))
+        record_solve(request.algorithm, None, request.directions, response)
+        return response
+    record_phase(timings, "grid_build", phase_start)
+    return await run_solve(grid, request.start, request.end, request.algorithm, request.directions,
+                           solve_options(request), http_request, timings["phases_ms"])
+
+def received_ns(http_request: Request) -> int:
+    """Arrival time of a request stamped by RequestTimer (now if it was not stamped)."""
+    return getattr(http_request.state, "received_ns", None) or time.perf_counter_ns()
+
+@app.post("/solve/stream")
+async def solve_maze_stream(request: SolveRequest, http_request: Request):
+    """Solves a maze and streams the exploration as it happens (NDJSON).
+
+    Emits {"type": "exploration", "cells": [[x, y], ...]} lines while the solver
+    runs, followed by one {"type": "result", ...} line with the SolveResponse fields.
+    """
+    try:
+        solver_executor.check_capacity()
+    except SolverOverloaded as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+    async def events():
+        try:
+            grid = resolve_grid(request)
+            start = grid.cell(request.start[0], request.start[1])
+            end = grid.cell(request.end[0], request.end[1])
+        except Exception as e:
+            yield json.dumps({"type": "result", **error_response(str(e)).model_dump()}) + "\n"
+            return
+
+        options = {**solve_options(request), "exploration": "stream"}
+        batches = solver_executor.create_queue()
+        task = asyncio.ensure_future(solver_executor.run(
+            dispatch, request.algorithm, start, end, grid, request.directions, options, batches
+        ))
+        try:
+            while True:
+                try:
+                    cells = await asyncio.to_thread(batches.get, True, 0.05)
+                except queue.Empty:
+                    if task.done() and batches.empty():
+                        break
+                    continue
+                yield json.dumps({"type": "exploration", "cells": cells}) + "\n"
+
+            try:
+                response = to_response(await task, grid)
+            except Exception as e:
+                response = error_response(str(e))
+            yield json.dumps({"type": "result", **response.model_dump()}) + "\n"
+        finally:
+            # Stops the solver if the client went away mid-stream
+            task.cancel()
+
+    return StreamingResponse(events(), media_type="application/x-ndjson")
+
+@app.post("/solve/refine", response_model=SolveResponse)
+async def refine_solution(request: RefineRequest, http_request: Request):
+    """Refines the waypoints of an hpa solve made with refine=False into cells.
+
+    Clients can show the waypoints right away and refine only the segments they need
+    by sending consecutive sub-lists of them.
+    """
+    try:
+        grid = resolve_grid(request)
+        waypoints = [grid.cell(x, y) for x, y in request.waypoints]
+    except UnknownMaze as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        return error_response(str(e))
+    options = {"heuristic_type": request.heuristic_type, "cluster_size": request.cluster_size}
+    return await run_in_pool(grid, http_request, refine_waypoints, grid, request.directions, waypoints, options)
+
+@app.post("/solve/batch", response_model=BatchResponse)
+async def solve_maze_batch(request: BatchRequest, http_request: Request):
+    """Solves many start/end queries on one maze.
+
+    The maze is resolved once. Queries that share a start cell and use an exact
+    single-source solver (bfs, bfs_vectorized, dijkstra, ucs) are grouped into one
+    multi-target search, and the resulting searches are spread over the solver
+    workers. Invalid queries fail individually without failing the batch.
+    """
+    start_time = time.perf_counter_ns()
+    try:
+        grid = resolve_grid(request)
+    except UnknownMaze as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    directions = request.directions
+    responses: List[Optional[SolveResponse]] = [None] * len(request.queries)
+    units: Dict[Tuple, Tuple[str, int, List[Tuple[int, int]]]] = {}
+    for index, query in enumerate(request.queries):
+        algorithm = query.algorithm or request.algorithm
+        try:
+            start = grid.cell(query.start[0], query.start[1])
+            end = grid.cell(query.end[0], query.end[1])
+            if algorithm not in ALGORITHMS:
+                raise ValueError(f"Unknown algorithm: {algorithm}")
+        except Exception as e:
+            responses[index] = error_response(str(e))
+            continue
+        if reachable(grid, start, end, directions, build=False) is False:
+            responses[index] = to_response(unreachable_result(), grid)
+            continue
+        kind = search_kind(algorithm, grid)
+        key = (kind, start) if kind else (algorithm, start, end)
+        units.setdefault(key, (algorithm, start, []))[2].append((index, end))
+
+    # One share per worker, as far as the pending bound allows
+    shares = max(1, min(solver_executor.max_workers, solver_executor.max_pending - solver_executor.pending, len(units)))
+    ordered = list(units.values())
+    options = {"heuristic_type": request.heuristic_type, "beam_width": request.beam_width, "exploration": "none",
+               "cluster_size": request.cluster_size, "refine": request.refine, "frontier": request.frontier}
+    outcomes = await asyncio.gather(*(
+        solver_executor.run(solve_batch, grid, directions, ordered[i::shares], options,
+                            is_disconnected=http_request.is_disconnected)
+        for i in range(shares if ordered else 0)
+    ), return_exceptions=True)
+
+    searches = explored_size = 0
+    solver_time_ms = 0.0
+    for share, outcome in enumerate(outcomes):
+        if isinstance(outcome, Exception):
+            raise_pool_error(outcome)
+            for _, _, queries in ordered[share::shares]:
+                for index, _ in queries:
+                    responses[index] = error_response(str(outcome))
+            continue
+        for index, result in outcome["results"]:
+            responses[index] = error_response(result["error"]) if "error" in result else to_response(result, grid)
+        searches += outcome["searches"]
+        explored_size += outcome["explored_size"]
+        solver_time_ms += outcome["time_taken_ms"]
+
+    return BatchResponse(
+        maze_id=grid.digest,
+        results=responses,
+        metrics={
+            "queries": len(responses),
+            "solved": sum(1 for response in responses if response.path is not None),
+            "unreachable": sum(1 for response in responses if response.metrics.get("unreachable")),
+            "errors": sum(1 for response in responses if response.path is None and response.error != NO_PATH),
+            "searches": searches,
+            "grouped_queries": sum(len(queries) for algorithm, _, queries in ordered
+                                   if len(queries) > 1 and search_kind(algorithm, grid)),
+            "explored_size": explored_size,
+            "solver_time_ms": solver_time_ms,
+            "time_taken_ms": elapsed_ms(start_time)
+        }
+    )
+
+@app.post("/distance-map")
+async def get_distance_map(request: DistanceMapRequest, http_request: Request):
+    """Returns the distance and predecessor of every cell from one source.
+
+    The body is a binary raster (application/octet-stream, see distance_map for the
+    layout) from which the path to any cell can be read in O(path length). The maze
+    id is returned in the X-Maze-Id header.
+    """
+    try:
+        grid = resolve_grid(request)
+        source = grid.cell(request.source[0], request.source[1])
+        if request.directions not in (4, 8):
+            raise ValueError("directions must be 4 or 8")
+    except UnknownMaze as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
     try:
-        start = Pair(request.start[0], request.start[1])
-        end = Pair(request.end[0], request.end[1])
-        
-        dx = DX_8D if request.directions == 8 else DX_4D
-        dy = DY_8D if request.directions == 8 else DY_4D
-        
-        result = None
-        if request.algorithm == "bfs":
-            result = bfs(start, end, request.blocks, request.size, request.directions, dx, dy)
-        elif request.algorithm == "dfs":
-            result = dfs(start, end, request.blocks, request.size, request.directions, dx, dy)
-        elif request.algorithm == "dijkstra":
-            result = dijkstra(start, end, request.blocks, request.size, request.directions, dx, dy, request.weights, request.is_weighted)
-        elif request.algorithm == "astar":
-            result = astar(start, end, request.blocks, request.size, request.directions, dx, dy, request.heuristic_type, request.weights, request.is_weighted)
-        elif request.algorithm == "iterative_deepening":
-            result = iterative_deepening(start, end, request.blocks, request.size, request.directions, dx, dy)
-        elif request.algorithm == "bidirectional":
-            result = bidirectional_search(start, end, request.blocks, request.size, request.directions, dx, dy)
-        elif request.algorithm == "local_beam":
-            result = local_beam_search(start, end, request.blocks, request.size, request.directions, dx, dy, request.beam_width)
-        elif request.algorithm == "rrt":
-            result = rrt(start, end, request.blocks, request.size, request.directions, dx, dy)
-        elif request.algorithm == "greedy_best_first":
-            result = greedy_best_first(start, end, request.blocks, request.size, request.directions, dx, dy, request.heuristic_type, request.weights, request.is_weighted)
-        elif request.algorithm == "ucs":
-            result = ucs(start, end, request.blocks, request.size, request.directions, dx, dy, request.weights, request.is_weighted)
-        
-        if result["path"] is None:
-            return SolveResponse(
-                path=None, 
-                exploration_order=result["exploration_order"],
-                error="No path found",
-                metrics=result["metrics"]
-            )
-        
-        return SolveResponse(
-            path=[[p.first, p.second] for p in result["path"]],
-            exploration_order=result["exploration_order"],
-            metrics=result["metrics"]
-        )
+        content = await solver_executor.run(build_distance_map, grid, source, request.directions,
+                                            is_disconnected=http_request.is_disconnected)
     except Exception as e:
-        return SolveResponse(
-            path=None,
-            exploration_order=[],
-            error=str(e),
-            metrics={
-                "explored_size": 0,
-                "frontier_size": 0,
-                "time_taken_ms": 0,
-                "path_length": 0,
-                "total_cost": 0
-            }
-        )
+        raise_pool_error(e)
+        raise HTTPException(status_code=400, detail=str(e))
+    return Response(content=content, media_type="application/octet-stream", headers={"X-Maze-Id": grid.digest})
+
+def check_replan_exploration(mode: str) -> None:
+    if mode == "stream":
+        raise ValueError("Replanning sessions do not stream their exploration")
+    make_trace(mode)
+
+@app.post("/replan", response_model=ReplanResponse)
+async def create_replanning_session(request: ReplanRequest):
+    """Plans a path with D* Lite and keeps the planner as a session.
+
+    Later edits to the maze are sent to /replan/{session_id}, which repairs the
+    previous search instead of solving from scratch.
+    """
+    try:
+        grid = resolve_grid(request)
+        start = grid.cell(request.start[0], request.start[1])
+        end = grid.cell(request.end[0], request.end[1])
+        check_replan_exploration(request.exploration)
+        default_sessions().check_size(grid.size)
+        planner = DStarLite(grid, start, end, request.directions, request.heuristic_type)
+    except UnknownMaze as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    # Only a planner whose first plan completed becomes a session
+    try:
+        result = await solver_executor.run_thread(replan, planner, threading.Lock(), request.exploration, [],
+                                                  None, solver_executor.timeout)
+    except Exception as e:
+        raise_pool_error(e)
+        raise HTTPException(status_code=400, detail=str(e))
+    session_id = default_sessions().create(planner)
+    return ReplanResponse(session_id=session_id, **to_response(result, planner.grid).model_dump())
+
+@app.post("/replan/{session_id}", response_model=ReplanResponse)
+async def update_replanning_session(session_id: str, request: ReplanUpdate):
+    """Edits the maze of a replanning session and returns the repaired path.
+
+    Only the cells whose cost-to-goal is affected by the changed cells are expanded
+    again; metrics.explored_size counts them.
+    """
+    session = default_sessions().get(session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail=f"Unknown replanning session {session_id}")
+    planner, lock = session
+    try:
+        grid = planner.grid
+        changes = [(grid.cell(change.x, change.y), change.blocked, change.weight) for change in request.changes]
+        start = grid.cell(request.start[0], request.start[1]) if request.start is not None else None
+        check_replan_exploration(request.exploration)
+        result = await solver_executor.run_thread(replan, planner, lock, request.exploration, changes, start,
+                                                  solver_executor.timeout)
+    except Exception as e:
+        raise_pool_error(e)
+        raise HTTPException(status_code=400, detail=str(e))
+    return ReplanResponse(session_id=session_id, **to_response(result, planner.grid).model_dump())
+
+@app.delete("/replan/{session_id}")
+async def delete_replanning_session(session_id: str):
+    if not default_sessions().remove(session_id):
+        raise HTTPException(status_code=404, detail=f"Unknown replanning session {session_id}")
+    return {"session_id": session_id, "deleted": True}
+
+@app.post("/solve/binary", response_model=SolveResponse)
+async def solve_maze_binary(http_request: Request, algorithm: str, start: str, end: str, directions: int = 4,
+                            heuristic_type: int = 0, beam_width: int = 5, is_weighted: bool = False,
+                            exploration: str = "full", frontier: str = "heap"):
+    """Solves a maze uploaded as a raw packed body (application/octet-stream, see grid_codec).
+
+    Solver options are passed as query parameters; start and end are given as "x,y".
+    As with /solve, a weight raster in the body is only used when is_weighted is set.
+    """
+    timings: Dict[str, Any] = {}
+    try:
+        body = await http_request.body()
+        phase_start = record_phase(timings, "parse", received_ns(http_request))
+        grid, has_weights = decode_grid(body)
+        if has_weights and not is_weighted:
+            grid = grid.without_weights()
+        grid = default_registry().intern(grid)
+        start_xy, end_xy = parse_point(start), parse_point(end)
+        record_phase(timings, "grid_build", phase_start)
+    except Exception as e:
+        return error_response(str(e))
+    options = {"heuristic_type": heuristic_type, "beam_width": beam_width, "exploration": exploration,
+               "frontier": frontier}
+    return await run_solve(grid, start_xy, end_xy, algorithm, directions, options, http_request, timings["phases_ms"])
+
+def maze_info(grid: Grid) -> MazeInfo:
+    return MazeInfo(maze_id=grid.digest, size=grid.size, weighted=grid.weights is not None)
+
+def label_maze(grid: Grid) -> None:
+    """Builds the component labels of a registered maze. Executed on a thread after an upload.
+
+    Solve requests only use labels that are already cached (labelling a large maze
+    takes longer than most searches on it), so this is what lets them answer
+    unreachable queries of an uploaded maze without a search.
+    """
+    # Unweighted solves of the maze use the registered grid with the same blocked cells
+    unweighted = default_registry().intern(grid.without_weights())
+    for directions in (4, 8):
+        labels = components(grid, directions)
+        unweighted.derived(("components", directions), lambda: labels)
+
+@app.post("/mazes", response_model=MazeInfo)
+async def upload_maze(request: MazeUpload, background_tasks: BackgroundTasks):
+    """Registers a maze so that solve requests can refer to it by maze_id.
+
+    Weights are kept whenever they are given; solve requests still choose whether
+    to use them with is_weighted. Uploading the same content twice returns the
+    same id. The connected components of the maze are labelled in the background
+    after the response is sent.
+    """
+    try:
+        grid = build_grid(request, True)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    grid = default_registry().intern(grid)
+    background_tasks.add_task(label_maze, grid)
+    return maze_info(grid)
+
+@app.post("/mazes/binary", response_model=MazeInfo)
+async def upload_maze_binary(http_request: Request, background_tasks: BackgroundTasks):
+    """Registers a maze uploaded as a raw packed body (application/octet-stream, see grid_codec).
+
+    As with /mazes, the maze is labelled in the background.
+    """
+    try:
+        grid, _ = decode_grid(await http_request.body())
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    grid = default_registry().intern(grid)
+    background_tasks.add_task(label_maze, grid)
+    return maze_info(grid)
+
+@app.delete("/mazes/{maze_id}")
+async def delete_maze(maze_id: str):
+    if not default_registry().remove(maze_id):
+        raise HTTPException(status_code=404, detail=f"Unknown maze id {maze_id}")
+    return {"maze_id": maze_id, "deleted": True}
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000) 
\ No newline at end of file
+    uvicorn.run(app, host="0.0.0.0", port=8000)
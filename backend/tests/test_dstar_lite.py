@@ -0,0 +1,87 @@
+import random
+import pytest
+from grid import Grid
+from algorithms.dijkstra import dijkstra
+from algorithms.dstar_lite import DStarLite, consistent_heuristic, dstar_lite
+
+def random_maze(rng: random.Random, size: int, weighted: bool) -> Grid:
+    blocks = [[rng.random() < 0.25 for _ in range(size)] for _ in range(size)]
+    blocks[0][0] = blocks[size - 1][size - 1] = False
+    weights = None
+    if weighted:
+        weights = [[rng.randint(1, 9) for _ in range(size)] for _ in range(size)]
+    return Grid.from_lists(blocks, size, weights)
+
+def assert_matches_dijkstra(planner: DStarLite, result) -> None:
+    expected = dijkstra(planner.start, planner.end, planner.grid, planner.directions)
+    assert (result["path"] is None) == (expected["path"] is None)
+    if result["path"] is not None:
+        assert result["path"][0] == planner.start and result["path"][-1] == planner.end
+        assert result["metrics"]["total_cost"] == expected["metrics"]["total_cost"]
+
+@pytest.mark.parametrize("seed", range(100))
+def test_replanning_matches_dijkstra(seed):
+    rng = random.Random(seed)
+    size = rng.randint(4, 10)
+    directions = rng.choice((4, 8))
+    weighted = rng.random() < 0.5
+    grid = random_maze(rng, size, weighted)
+    # Every heuristic, including the inconsistent ones the planner has to replace
+    planner = DStarLite(grid, grid.cell(0, 0), grid.cell(size - 1, size - 1), directions, rng.randrange(7))
+    result = dstar_lite(0, 0, grid, directions, planner=planner)
+    assert_matches_dijkstra(planner, result)
+    for _ in range(25):
+        changes = []
+        for _ in range(rng.randint(1, 3)):
+            cell = grid.cell(rng.randrange(size), rng.randrange(size))
+            if cell in (planner.start, planner.end):
+                continue
+            blocked = rng.choice((None, True, False))
+            weight = rng.randint(1, 9) if weighted and rng.random() < 0.5 else None
+            changes.append((cell, blocked, weight))
+        planner.update_cells(changes)
+        path = result["path"]
+        if path is not None and len(path) > 2 and rng.random() < 0.3:
+            # The agent walks part of the way before the next plan
+            planner.move_start(path[rng.randrange(1, len(path) - 1)])
+        result = dstar_lite(0, 0, planner.grid, directions, planner=planner)
+        assert_matches_dijkstra(planner, result)
+
+def test_replanning_repairs_around_a_new_wall():
+    rows = ["...##", ".....", ".#...", ".#...", "...#."]
+    grid = Grid.from_lists([[ch == "#" for ch in row] for row in rows], 5)
+    planner = DStarLite(grid, grid.cell(0, 0), grid.cell(4, 4), 8)
+    assert dstar_lite(0, 0, grid, 8, planner=planner)["metrics"]["total_cost"] == 4
+    planner.update_cells([(grid.cell(2, 2), True, None)])
+    result = dstar_lite(0, 0, planner.grid, 8, planner=planner)
+    assert result["metrics"]["total_cost"] == 5
+
+def test_inconsistent_heuristics_are_replaced():
+    assert [consistent_heuristic(h, 4) for h in range(7)] == [0, 1, 2, 3, 4, 0, 6]
+    assert [consistent_heuristic(h, 8) for h in range(7)] == [3] * 7
+
+def test_invalid_edits_leave_the_maze_untouched():
+    grid = Grid.from_lists([[False] * 4 for _ in range(4)], 4, [[1] * 4 for _ in range(4)])
+    planner = DStarLite(grid, grid.cell(0, 0), grid.cell(3, 3), 4)
+    blocked, weights = bytes(planner.blocked), planner.weights.tobytes()
+    for changes in ([(grid.cell(1, 1), True, None), (grid.cell(2, 2), None, 70000)],
+                    [(grid.cell(1, 1), True, None), (grid.cell(2, 2), None, 0)],
+                    [(grid.cell(1, 1), True, None), (0, True, None)]):
+        with pytest.raises(ValueError):
+            planner.update_cells(changes)
+        assert bytes(planner.blocked) == blocked and planner.weights.tobytes() == weights
+
+def test_zero_weights_are_rejected():
+    weights = [[1] * 4 for _ in range(4)]
+    weights[2][1] = 0
+    grid = Grid.from_lists([[False] * 4 for _ in range(4)], 4, weights)
+    with pytest.raises(ValueError):
+        DStarLite(grid, grid.cell(0, 0), grid.cell(3, 3), 4)
+
+def test_search_stopped_at_its_deadline_carries_on_later():
+    rng = random.Random(7)
+    grid = random_maze(rng, 40, True)
+    planner = DStarLite(grid, grid.cell(0, 0), grid.cell(39, 39), 4)
+    with pytest.raises(TimeoutError):
+        dstar_lite(0, 0, grid, 4, planner=planner, deadline_ns=0)
+    assert_matches_dijkstra(planner, dstar_lite(0, 0, grid, 4, planner=planner))
@@ -0,0 +1,26 @@
+import asyncio
+import threading
+import pytest
+from executor import SolverExecutor, SolverOverloaded, SolverTimeout
+
+def test_thread_mode_keeps_the_slot_of_a_timed_out_call_until_it_returns():
+    release = threading.Event()
+
+    async def scenario():
+        executor = SolverExecutor(0, max_pending=2, timeout=0.05)
+        for _ in range(2):
+            with pytest.raises(SolverTimeout):
+                await executor.run(release.wait)
+        # Both threads still run, so the bound is reached
+        assert executor.pending == 2
+        with pytest.raises(SolverOverloaded):
+            await executor.run(sum, [1, 2])
+        release.set()
+        while executor.pending:
+            await asyncio.sleep(0.01)
+        assert await executor.run(sum, [1, 2]) == 3
+        with pytest.raises(ValueError):
+            await executor.run(int, "x")
+        assert executor.pending == 0
+
+    asyncio.run(scenario())
@@ -0,0 +1,43 @@
+import random
+import pytest
+from grid import Grid
+from exploration import pack_trace, unpack_trace
+
+def open_grid(size: int) -> Grid:
+    return Grid.from_lists([[False] * size for _ in range(size)], size)
+
+def coordinates(grid: Grid, cells):
+    return [[cell // grid.width - 1, cell % grid.width - 1] for cell in cells]
+
+def test_empty_trace():
+    grid = open_grid(4)
+    assert pack_trace([], grid) == b""
+    assert unpack_trace(b"", grid.size) == []
+
+def test_single_cell_at_origin():
+    # The first delta is taken from index 0, so it is 0 here
+    grid = open_grid(3)
+    cells = [grid.cell(0, 0)]
+    assert unpack_trace(pack_trace(cells, grid), grid.size) == [[0, 0]]
+
+@pytest.mark.parametrize("size", [1, 2, 5, 64, 300])
+def test_random_round_trip(size):
+    rng = random.Random(size)
+    grid = open_grid(size)
+    # Revisits, backward jumps and far jumps (multi-byte varints of both signs)
+    cells = [grid.cell(rng.randrange(size), rng.randrange(size)) for _ in range(500)]
+    assert unpack_trace(pack_trace(cells, grid), size) == coordinates(grid, cells)
+
+def test_runs_are_run_length_encoded():
+    size = 200
+    grid = open_grid(size)
+    # A row-major scan is a delta of 0 (to the origin) and then 1 repeated size * size - 1 times
+    cells = [grid.cell(x, y) for x in range(size) for y in range(size)]
+    data = pack_trace(cells, grid)
+    assert data == bytes([0, 1, 2]) + bytes([0xBF, 0xB8, 0x02])
+    assert unpack_trace(data, size) == coordinates(grid, cells)
+
+def test_repeated_cell():
+    grid = open_grid(5)
+    cells = [grid.cell(2, 3)] * 10 + [grid.cell(0, 0)] + [grid.cell(4, 4)] * 3
+    assert unpack_trace(pack_trace(cells, grid), grid.size) == coordinates(grid, cells)
@@ -0,0 +1,98 @@
+import random
+import pytest
+from frontier import BucketQueue, IndexedHeap, make_frontier
+
+CAPACITY = 64
+
+def smallest(reference):
+    """Entry (priority, tiebreak, cell) with the smallest key in a reference {cell: (priority, tiebreak)}."""
+    return min((priority, tiebreak, cell) for cell, (priority, tiebreak) in reference.items())
+
+@pytest.mark.parametrize("seed", range(20))
+def test_indexed_heap_matches_reference_sort(seed):
+    rng = random.Random(seed)
+    heap = IndexedHeap(CAPACITY)
+    reference = {}
+    for _ in range(2000):
+        operation = rng.random()
+        cell = rng.randrange(CAPACITY)
+        # Few distinct keys, so ties on priority and tiebreak are exercised too
+        key = (rng.randrange(20), rng.randrange(3))
+        if operation < 0.4:
+            lowered = cell not in reference or key < reference[cell]
+            assert heap.push(cell, *key) == lowered
+            if lowered:
+                reference[cell] = key
+        elif operation < 0.55:
+            heap.update(cell, *key)
+            reference[cell] = key
+        elif operation < 0.65:
+            if cell in reference:
+                heap.remove(cell)
+                del reference[cell]
+        elif reference:
+            expected = smallest(reference)
+            assert heap.peek() == expected
+            assert heap.pop() == expected[2]
+            del reference[expected[2]]
+        assert len(heap) == len(reference)
+        assert all((cell in heap) == (cell in reference) for cell in range(CAPACITY))
+    while reference:
+        expected = smallest(reference)
+        assert heap.pop() == expected[2]
+        del reference[expected[2]]
+    assert len(heap) == 0
+
+def test_indexed_heap_counters():
+    heap = IndexedHeap(8)
+    heap.push(1, 5)
+    heap.push(2, 3)
+    heap.push(1, 4)      # decrease-key
+    heap.push(1, 9)      # not lower, ignored
+    heap.update(2, 7)    # increase-key
+    heap.remove(2)
+    assert heap.pop() == 1
+    assert heap.counters() == {"pushes": 2, "pops": 2, "relaxations": 4, "peak_frontier": 2}
+
+@pytest.mark.parametrize("seed", range(20))
+def test_bucket_queue_matches_reference_sort(seed):
+    rng = random.Random(seed)
+    queue = BucketQueue(CAPACITY, span=rng.choice((1, 4, 16)))
+    reference = {}
+    base = 0
+    for _ in range(2000):
+        cell = rng.randrange(CAPACITY)
+        if rng.random() < 0.6:
+            # Mostly small steps above the last pop; some far ones grow the window, some below it are clamped
+            priority = base + rng.choice((rng.randrange(8), rng.randrange(200), -rng.randrange(1, 4)))
+            clamped = max(priority, base)
+            lowered = cell not in reference or clamped < reference[cell]
+            assert queue.push(cell, priority) == lowered
+            if lowered:
+                reference[cell] = clamped
+        elif reference:
+            cell = queue.pop()
+            # Any cell with the smallest priority may come out
+            assert reference[cell] == min(reference.values())
+            base = reference.pop(cell)
+        assert len(queue) == len(reference)
+        assert all((cell in queue) == (cell in reference) for cell in range(CAPACITY))
+    while reference:
+        cell = queue.pop()
+        assert reference[cell] == min(reference.values())
+        del reference[cell]
+    with pytest.raises(IndexError):
+        queue.pop()
+
+def test_bucket_queue_pops_last_pushed_first_within_a_priority():
+    queue = BucketQueue(8)
+    for cell in (3, 1, 2):
+        queue.push(cell, 5)
+    queue.push(4, 6)
+    assert [queue.pop() for _ in range(4)] == [2, 1, 3, 4]
+
+def test_make_frontier():
+    assert isinstance(make_frontier("heap", 4), IndexedHeap)
+    assert isinstance(make_frontier("bucket", 4), BucketQueue)
+    with pytest.raises(ValueError):
+        make_frontier("fibonacci", 4)
@@ -0,0 +1,81 @@
+import random
+import pytest
+from grid import Grid
+from grid_codec import HEADER, MAGIC, VERSION, decode_grid, encode_grid, pack_bitmap, unpack_bitmap
+
+def random_grid(size: int, rng: random.Random, weights_max: int = 0) -> Grid:
+    blocks = [[rng.random() < 0.3 for _ in range(size)] for _ in range(size)]
+    weights = None
+    if weights_max:
+        weights = [[rng.randint(0, weights_max) for _ in range(size)] for _ in range(size)]
+    return Grid.from_lists(blocks, size, weights)
+
+def assert_same_grid(actual: Grid, expected: Grid) -> None:
+    assert actual.size == expected.size
+    assert actual.blocked == expected.blocked
+    assert actual.weights == expected.weights
+
+# Sizes whose cell counts do and do not fill the last bitmap byte
+@pytest.mark.parametrize("size", [1, 2, 3, 4, 7, 8, 9, 16, 17])
+def test_round_trip_without_weights(size):
+    grid = random_grid(size, random.Random(size))
+    data = encode_grid(grid)
+    assert len(data) == HEADER.size + (size * size + 7) // 8
+    decoded, weighted = decode_grid(data)
+    assert not weighted
+    assert_same_grid(decoded, grid)
+
+@pytest.mark.parametrize("size", [1, 3, 8, 13])
+@pytest.mark.parametrize("dtype, weights_max, itemsize", [("uint8", 255, 1), ("uint16", 65535, 2)])
+def test_round_trip_with_weights(size, dtype, weights_max, itemsize):
+    grid = random_grid(size, random.Random(size), weights_max)
+    data = encode_grid(grid, dtype)
+    assert len(data) == HEADER.size + (size * size + 7) // 8 + itemsize * size * size
+    decoded, weighted = decode_grid(data)
+    assert weighted
+    assert_same_grid(decoded, grid)
+
+@pytest.mark.parametrize("dtype, edges", [("uint8", [0, 1, 254, 255]), ("uint16", [0, 1, 255, 256, 65534, 65535])])
+def test_weight_dtype_edges(dtype, edges):
+    grid = Grid.from_lists([[False] * len(edges)] * len(edges), len(edges), [edges] * len(edges))
+    decoded, _ = decode_grid(encode_grid(grid, dtype))
+    assert_same_grid(decoded, grid)
+
+def test_uint8_rejects_wider_weights():
+    grid = Grid.from_lists([[False, False], [False, False]], 2, [[1, 256], [1, 1]])
+    with pytest.raises(ValueError):
+        encode_grid(grid, "uint8")
+
+def test_padding_bits_are_zero_and_ignored():
+    # 3x3 cells leave 7 unused bits in the second bitmap byte
+    grid = Grid.from_lists([[True] * 3] * 3, 3)
+    data = bytearray(encode_grid(grid))
+    assert data[HEADER.size:] == b"\xff\x01"
+    data[-1] |= 0xFE
+    decoded, _ = decode_grid(bytes(data))
+    assert_same_grid(decoded, grid)
+
+def test_bitmap_is_lsb_first():
+    cells = bytes([1, 0, 0, 0, 0, 0, 0, 0, 0, 1])
+    assert pack_bitmap(cells) == b"\x01\x02"
+    assert unpack_bitmap(b"\x01\x02", len(cells)) == cells
+    with pytest.raises(ValueError):
+        unpack_bitmap(b"\x01", len(cells))
+
+def test_header_fields():
+    data = encode_grid(random_grid(5, random.Random(0), 9), "uint16")
+    assert HEADER.unpack_from(data) == (MAGIC, VERSION, 2, 0, 5, 5)
+
+@pytest.mark.parametrize("mutate", [
+    lambda data: data[:HEADER.size - 1],
+    lambda data: b"MAZX" + data[4:],
+    lambda data: data[:4] + bytes([VERSION + 1]) + data[5:],
+    lambda data: data[:5] + bytes([3]) + data[6:],
+    lambda data: data[:-1],
+    lambda data: data + b"\x00",
+    lambda data: HEADER.pack(MAGIC, VERSION, 0, 0, 4, 5) + data[HEADER.size:],
+])
+def test_malformed_payloads_are_rejected(mutate):
+    data = encode_grid(random_grid(4, random.Random(1)))
+    with pytest.raises(ValueError):
+        decode_grid(mutate(data))
@@ -0,0 +1,42 @@
+import pickle
+from grid import Grid
+from components import components
+from maze_registry import MazeRegistry
+
+def weighted_grid(size: int) -> Grid:
+    blocks = [[(x * 7 + y * 3) % 5 == 0 for y in range(size)] for x in range(size)]
+    return Grid.from_lists(blocks, size, [[1 + (x + y) % 9 for y in range(size)] for x in range(size)])
+
+def test_derived_data_is_charged_when_added():
+    registry = MazeRegistry(1 << 30)
+    grid = registry.intern(weighted_grid(40))
+    before = registry.total_bytes
+    labels = components(grid, 4)
+    assert registry.total_bytes == before + labels.itemsize * len(labels)
+
+def test_objects_shared_with_the_unweighted_view_are_charged_once():
+    registry = MazeRegistry(1 << 30)
+    grid = registry.intern(weighted_grid(40))
+    components(grid, 4)
+    view = registry.intern(grid.without_weights())
+    assert view.blocked is grid.blocked
+    assert registry.total_bytes == grid.nbytes()
+    # The view keeps the blocked buffer and the labels alive after the weighted maze is gone
+    registry.remove(grid.digest)
+    assert registry.total_bytes == view.nbytes() == len(view.blocked) + 4 * len(view.blocked)
+    registry.remove(view.digest)
+    assert registry.total_bytes == 0
+
+def test_growth_over_the_budget_evicts_the_coldest_maze():
+    cold, hot = weighted_grid(40), weighted_grid(41)
+    registry = MazeRegistry(cold.nbytes() + hot.nbytes() + 1000)
+    registry.intern(cold)
+    hot = registry.intern(hot)
+    components(hot, 8)
+    assert cold.digest not in registry and hot.digest in registry
+    assert registry.total_bytes == hot.nbytes()
+
+def test_copies_sent_to_workers_belong_to_no_registry():
+    registry = MazeRegistry(1 << 30)
+    grid = registry.intern(weighted_grid(10))
+    assert pickle.loads(pickle.dumps(grid)).on_grow is None